@@ -1,27 +1,200 @@
 from django.contrib import admin
-from .models import Screening, MoodEntry, ChatMessage, WellnessTip
+from django.contrib.auth.admin import UserAdmin
+from datetime import date, timedelta
+
+from django.contrib.auth.models import User
+from django.db.models.functions import Substr
+from django.http import StreamingHttpResponse
+from django.template.response import TemplateResponse
+from django.urls import path
+from django.utils import timezone
+
+from .models import (
+    Screening, MoodEntry, ChatMessage, ChatJob, ChatArchiveSegment, ChatResponse, WellnessTip, WellnessSummary,
+    DailyScreeningRollup, DailyMoodRollup, RollupWatermark,
+)
+from .utils import export, fulltext, rollups
+from .utils.estimates import EstimatedCountPaginator
+
+PREVIEW_CHARS = 80
+
+
+class LargeTableAdmin(admin.ModelAdmin):
+    """Changelist defaults for tables that grow with every user action."""
+    list_select_related = ("user",)
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    fulltext_kind = None  # "chat" / "mood": search text through utils.fulltext
+
+    def get_search_results(self, request, queryset, search_term):
+        results, may_have_duplicates = super().get_search_results(request, queryset, search_term)
+        if search_term and self.fulltext_kind:
+            results = results | fulltext.filter_queryset(queryset, self.fulltext_kind, search_term)
+        return results, may_have_duplicates
+
+
+def _preview(text):
+    text = text or ""
+    return text if len(text) < PREVIEW_CHARS else text[:PREVIEW_CHARS - 1] + "…"
 
 
 @admin.register(Screening)
-class ScreeningAdmin(admin.ModelAdmin):
+class ScreeningAdmin(LargeTableAdmin):
     list_display = ("user", "screening_type", "score", "severity", "date_taken")
     list_filter = ("screening_type", "severity", "date_taken")
 
 
 @admin.register(MoodEntry)
-class MoodEntryAdmin(admin.ModelAdmin):
+class MoodEntryAdmin(LargeTableAdmin):
     list_display = ("user", "mood", "date_logged")
-    search_fields = ("user__username", "notes")
+    search_fields = ("=user__username",)
+    fulltext_kind = "mood"
 
 
 @admin.register(ChatMessage)
-class ChatMessageAdmin(admin.ModelAdmin):
-    list_display = ("user", "message", "response", "timestamp")
-    search_fields = ("user__username", "message")
+class ChatMessageAdmin(LargeTableAdmin):
+    list_display = ("user", "message_preview", "response_preview", "timestamp")
+    search_fields = ("=user__username",)
+    fulltext_kind = "chat"
+
+    def get_queryset(self, request):
+        # the changelist only needs the first PREVIEW_CHARS of each text column
+        return super().get_queryset(request).annotate(
+            message_head=Substr("message", 1, PREVIEW_CHARS),
+            response_head=Substr("response", 1, PREVIEW_CHARS),
+        ).defer("message", "response")
+
+    @admin.display(description="Message")
+    def message_preview(self, obj):
+        return _preview(obj.message_head)
+
+    @admin.display(description="Response")
+    def response_preview(self, obj):
+        return _preview(obj.response_head)
+
+
+@admin.register(ChatJob)
+class ChatJobAdmin(admin.ModelAdmin):
+    """The chat queue; status "dead" is the dead-letter list."""
+    list_display = ("chat_id", "status", "priority", "attempts", "available_at", "locked_by", "error_preview", "created_at")
+    list_filter = ("status",)
+    list_select_related = ("chat",)
+    readonly_fields = ("chat", "attempts", "locked_by", "locked_at", "last_error", "created_at", "finished_at")
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    actions = ["requeue"]
+
+    @admin.display(description="Last error")
+    def error_preview(self, obj):
+        return _preview(obj.last_error)
+
+    @admin.action(description="Requeue selected jobs (attempts reset)")
+    def requeue(self, request, queryset):
+        count = queryset.exclude(status=ChatJob.RUNNING).update(
+            status=ChatJob.QUEUED, attempts=0, available_at=timezone.now(), locked_by="", locked_at=None,
+        )
+        self.message_user(request, f"Requeued {count} job(s).")
+
+
+@admin.register(ChatArchiveSegment)
+class ChatArchiveSegmentAdmin(admin.ModelAdmin):
+    list_display = ("user", "first_timestamp", "last_timestamp", "message_count", "created_at")
+    search_fields = ("user__username",)
+    exclude = ("payload",)
 
 
 @admin.register(WellnessTip)
 class WellnessTipAdmin(admin.ModelAdmin):
     list_display = ("title", "language")
+    list_filter = ("language",)
     search_fields = ("title", "content")
 
+
+@admin.register(ChatResponse)
+class ChatResponseAdmin(admin.ModelAdmin):
+    """Keyword-fallback replies; saves reload the in-memory catalog (utils/catalog.py)."""
+    list_display = ("intent", "language", "text_preview", "updated_at")
+    list_filter = ("language",)
+    search_fields = ("intent", "text")
+    ordering = ("intent", "language")
+
+    @admin.display(description="Text")
+    def text_preview(self, obj):
+        return _preview(obj.text)
+
+
+@admin.register(WellnessSummary)
+class WellnessSummaryAdmin(admin.ModelAdmin):
+    list_display = ("user", "wellness_score", "mood_count", "last_screening_score", "updated_at")
+    search_fields = ("user__username",)
+    readonly_fields = ("updated_at",)
+
+
+@admin.register(DailyScreeningRollup)
+class DailyScreeningRollupAdmin(admin.ModelAdmin):
+    list_display = ("day", "screening_type", "severity", "count", "mean_score")
+    list_filter = ("screening_type", "severity")
+    date_hierarchy = "day"
+    change_list_template = "admin/population_rollup_change_list.html"
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def get_urls(self):
+        report = self.admin_site.admin_view(self.report_view)
+        return [path("report/", report, name="population_report")] + super().get_urls()
+
+    def report_view(self, request):
+        """Population report over ``?start=YYYY-MM-DD&end=YYYY-MM-DD`` (default: last 30 days)."""
+        today = timezone.localdate()
+        try:
+            end = date.fromisoformat(request.GET.get("end") or today.isoformat())
+            start = date.fromisoformat(request.GET.get("start") or (end - timedelta(days=29)).isoformat())
+        except ValueError:
+            end, start = today, today - timedelta(days=29)
+        context = {
+            **self.admin_site.each_context(request),
+            "title": "Population report",
+            "opts": self.model._meta,
+            "start": start,
+            "end": end,
+            "watermarks": RollupWatermark.objects.order_by("name"),
+            **rollups.report(start, end),
+        }
+        return TemplateResponse(request, "admin/population_report.html", context)
+
+
+@admin.register(DailyMoodRollup)
+class DailyMoodRollupAdmin(admin.ModelAdmin):
+    list_display = ("day", "mood", "count", "mean_score")
+    list_filter = ("mood",)
+    date_hierarchy = "day"
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
+admin.site.unregister(User)
+
+
+@admin.register(User)
+class MindscopeUserAdmin(UserAdmin):
+    actions = ["export_data"]
+
+    @admin.action(description="Export selected users' data (gzipped NDJSON)")
+    def export_data(self, request, queryset):
+        # "Select all" covers every user; rows are streamed, never held in memory
+        users = queryset.order_by("pk").iterator(chunk_size=500)
+        response = StreamingHttpResponse(
+            export.response_body(request, export.iter_export(users, "ndjson", compress=True)),
+            content_type=export.content_type("ndjson", True),
+        )
+        name = export.filename(f"mindscope-export-{timezone.now():%Y%m%d-%H%M%S}", "ndjson", True)
+        response["Content-Disposition"] = f'attachment; filename="{name}"'
+        return response
@@ -1,6 +1,16 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_delete, post_save
 
 
 class MindscopeConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'Mindscope'
+
+    def ready(self):
+        from .models import ChatResponse, WellnessTip
+        from .utils import catalog
+
+        # edits to the localized catalog reload the in-process copy everywhere
+        for model in (ChatResponse, WellnessTip):
+            post_save.connect(catalog.invalidate, sender=model, dispatch_uid=f"catalog-save-{model.__name__}")
+            post_delete.connect(catalog.invalidate, sender=model, dispatch_uid=f"catalog-delete-{model.__name__}")
@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+
+from Mindscope.utils.retention import archive_old_chats, retention_settings
+
+
+class Command(BaseCommand):
+    help = (
+        "Move chat messages older than the retention window into compressed archive "
+        "segments. Safe to run repeatedly, e.g. nightly from cron."
+    )
+
+    def add_arguments(self, parser):
+        config = retention_settings()
+        parser.add_argument("--older-than-days", type=int, default=config["HOT_DAYS"])
+        parser.add_argument("--segment-size", type=int, default=config["SEGMENT_SIZE"])
+
+    def handle(self, *args, **options):
+        def on_user(user_id, archived):
+            self.stdout.write(f"user {user_id}: archived {archived} messages")
+
+        total = archive_old_chats(options["older_than_days"], options["segment_size"], on_user)
+        self.stdout.write(self.style.SUCCESS(f"Archived {total} chat messages."))
@@ -0,0 +1,55 @@
+import json
+import random
+import time
+
+from django.core.management.base import BaseCommand
+
+from Mindscope.utils.fallback_responses import get_fallback_response
+from Mindscope.utils.intent_matcher import RULES, classify
+
+FILLER = (
+    "today really just feel like the and it was this week my so very kind of "
+    "download thinking everything something about again lately honestly"
+).split()
+
+
+def build_corpus(size, seed=0):
+    """Messages mixing filler words with terms from every rule, plus misses."""
+    rng = random.Random(seed)
+    terms = [term.rstrip("*") for rule in RULES for term in rule.terms]
+    corpus = []
+    for _ in range(size):
+        words = rng.choices(FILLER, k=rng.randint(3, 40))
+        if rng.random() < 0.8:
+            words.insert(rng.randrange(len(words) + 1), rng.choice(terms))
+        corpus.append(" ".join(words).capitalize() + rng.choice([".", "!", "?", ""]))
+    return corpus
+
+
+class Command(BaseCommand):
+    help = "Measure intent classification throughput over a synthetic message corpus."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--messages", type=int, default=100_000)
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument("--output", help="Write results as JSON to this file")
+
+    def handle(self, *args, **options):
+        corpus = build_corpus(options["messages"], options["seed"])
+        results = {"messages": len(corpus), "avg_chars": round(sum(map(len, corpus)) / len(corpus), 1)}
+
+        for name, fn in (("classify", classify), ("get_fallback_response", get_fallback_response)):
+            start = time.perf_counter()
+            for message in corpus:
+                fn(message)
+            elapsed = time.perf_counter() - start
+            results[name] = {
+                "seconds": round(elapsed, 3),
+                "messages_per_sec": round(len(corpus) / elapsed),
+                "us_per_message": round(elapsed / len(corpus) * 1e6, 2),
+            }
+            self.stdout.write(f"{name}: {results[name]}")
+
+        if options["output"]:
+            with open(options["output"], "w") as fh:
+                json.dump(results, fh, indent=2)
@@ -0,0 +1,103 @@
+import json
+import statistics
+import threading
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from Mindscope.utils.batcher import QueueFull, RequestBatcher
+from Mindscope.utils.local_ai import DEFAULT_MODEL, LocalAIChat
+
+PROMPTS = [
+    "I'm feeling anxious about tomorrow",
+    "I can't sleep at night",
+    "Work has been really stressful lately",
+    "I feel lonely since I moved",
+    "How do I deal with anger?",
+    "I had a good day today",
+]
+
+
+def _percentile(values, pct):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+class Command(BaseCommand):
+    help = (
+        "Drive the local model with concurrent requests, once unbatched and once through "
+        "the RequestBatcher, and report p50/p99 latency and tokens/sec."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--model", default=DEFAULT_MODEL)
+        parser.add_argument("--requests", type=int, default=64)
+        parser.add_argument("--concurrency", type=int, default=16)
+        parser.add_argument("--max-batch", type=int, default=8)
+        parser.add_argument("--window-ms", type=float, default=10)
+        parser.add_argument("--timeout", type=float, default=60, help="Per-request deadline in seconds")
+        parser.add_argument("--output", help="Write results as JSON to this file")
+
+    def handle(self, *args, **options):
+        chat = LocalAIChat(options["model"])
+        if not chat.load():
+            raise CommandError(f"Could not load {options['model']}: {chat.load_error}")
+        chat.generate_batch(PROMPTS[:1])  # warm-up
+
+        results = {}
+        for label, max_batch in (("unbatched", 1), ("batched", options["max_batch"])):
+            results[label] = self.run(chat, max_batch, options)
+            self.stdout.write(f"{label}: {json.dumps(results[label])}")
+
+        if options["output"]:
+            with open(options["output"], "w") as fh:
+                json.dump(results, fh, indent=2)
+
+    def run(self, chat, max_batch, options):
+        batcher = RequestBatcher(
+            chat.generate_batch, max_batch, options["window_ms"] / 1000, max_queue=options["requests"]
+        ).start()
+        latencies, tokens, failures = [], [], []
+        lock = threading.Lock()
+        remaining = iter(range(options["requests"]))
+
+        def client():
+            while True:
+                with lock:
+                    i = next(remaining, None)
+                if i is None:
+                    return
+                start = time.perf_counter()
+                try:
+                    reply = batcher.submit(PROMPTS[i % len(PROMPTS)], options["timeout"])
+                except QueueFull:
+                    reply = None
+                elapsed = time.perf_counter() - start
+                with lock:
+                    if reply is None:
+                        failures.append(i)
+                    else:
+                        latencies.append(elapsed)
+                        tokens.append(len(chat.chatbot.tokenizer.encode(reply)))
+
+        started = time.perf_counter()
+        threads = [threading.Thread(target=client) for _ in range(options["concurrency"])]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        wall = time.perf_counter() - started
+
+        if not latencies:
+            return {"failed": len(failures)}
+        return {
+            "max_batch": max_batch,
+            "completed": len(latencies),
+            "failed": len(failures),
+            "p50_ms": round(statistics.median(latencies) * 1000, 1),
+            "p99_ms": round(_percentile(latencies, 99) * 1000, 1),
+            "tokens_per_sec": round(sum(tokens) / wall, 1),
+            "requests_per_sec": round(len(latencies) / wall, 2),
+            "avg_batch": batcher.stats()["avg_batch"],
+        }
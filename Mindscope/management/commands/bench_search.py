@@ -0,0 +1,123 @@
+import json
+import random
+import statistics
+import time
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+
+from Mindscope.models import ChatMessage
+from Mindscope.utils import fulltext
+from Mindscope.utils.benchmarking import percentile, throwaway_databases
+
+BENCH_PREFIX = "bench_search_"
+TARGET_MS = 50
+FILLER = (
+    "i the to and feel a my of it is in that me so about but not have with just this was "
+    "really today like been what do can how when because at much again all some more"
+).split()
+TOPICS = (
+    "anxious worried sleep tired exams work family friends lonely stressed calm happy breathing "
+    "walk therapy panic deadline headache motivation weekend music journal meditation appetite "
+    "argument relationship confidence focus routine exercise nightmare overwhelmed grateful hopeful"
+).split()
+# natural-language word frequencies are roughly Zipfian: filler words first, then
+# topic words, then a long tail of rarer terms
+VOCABULARY = FILLER + TOPICS + [f"term{i}" for i in range(5000)]
+WEIGHTS = [1 / rank for rank in range(1, len(VOCABULARY) + 1)]
+QUERIES = {
+    "filler_word": "feel",
+    "topic_word": "anxious",
+    "rare_topic": "nightmare",
+    "two_words": "sleep exams",
+    "tail_word": "term4000",
+    "no_match": "xylophone",
+}
+
+
+def _percentiles(samples):
+    samples = sorted(samples)
+    return {
+        "p50": round(statistics.median(samples), 3),
+        "p95": round(percentile(samples, 0.95), 3),
+        "max": round(samples[-1], 3),
+    }
+
+
+class Command(BaseCommand):
+    help = (
+        "Seed a large chat table with Zipf-distributed words and time ranked full-text "
+        f"searches for single users (target: p95 under {TARGET_MS} ms), alongside the "
+        "icontains scan it replaces."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=1_000_000, help="Chat rows seeded")
+        parser.add_argument("--users", type=int, default=1000, help="Users the rows are spread across")
+        parser.add_argument("--samples", type=int, default=50, help="Searches per query (random users)")
+        parser.add_argument("--output", help="Write results as JSON to this file")
+        parser.add_argument("--keep", action="store_true", help="Keep the throwaway database and its rows for the next run")
+
+    def handle(self, *args, **options):
+        # seed and measure in a throwaway copy of the schema, never the configured database
+        with throwaway_databases(keep=options["keep"]):
+            self.run(options)
+
+    def run(self, options):
+        users = self.seed(options["rows"], options["users"])
+        rng = random.Random(7)
+        results = {
+            "rows": options["rows"],
+            "users": options["users"],
+            "vendor": connection.vendor,
+            "backend": fulltext.backend(),
+            "target_ms": TARGET_MS,
+            "queries": {},
+        }
+        for name, term in QUERIES.items():
+            timings = {"page_1": [], "page_5": [], "icontains": []}
+            for _ in range(options["samples"]):
+                user = rng.choice(users)
+                for page in (1, 5):
+                    start = time.perf_counter()
+                    fulltext.search(user, term, ("chat",), page)
+                    timings[f"page_{page}"].append((time.perf_counter() - start) * 1000)
+                start = time.perf_counter()
+                list(ChatMessage.objects.filter(user=user, message__icontains=term).order_by("-timestamp")[:20])
+                timings["icontains"].append((time.perf_counter() - start) * 1000)
+            results["queries"][name] = {key: _percentiles(values) for key, values in timings.items()}
+            self.stdout.write(f"{name} ({term!r}): {json.dumps(results['queries'][name])}")
+
+        slowest = max(q["page_1"]["p95"] for q in results["queries"].values())
+        style = self.style.SUCCESS if slowest < TARGET_MS else self.style.WARNING
+        self.stdout.write(style(f"Slowest first-page p95: {slowest} ms (target {TARGET_MS} ms)"))
+
+        if options["output"]:
+            with open(options["output"], "w") as fh:
+                json.dump(results, fh, indent=2)
+            self.stdout.write(self.style.SUCCESS(f"Results written to {options['output']}"))
+
+    def seed(self, rows, user_count, batch_size=10_000):
+        users = [
+            User.objects.get_or_create(username=f"{BENCH_PREFIX}{i}")[0]
+            for i in range(user_count)
+        ]
+        existing = ChatMessage.objects.filter(user__username__startswith=BENCH_PREFIX).count()
+        if existing >= rows:
+            return users
+
+        self.stdout.write(f"Seeding {rows - existing} chat rows across {user_count} users...")
+        rng = random.Random(42)
+        for offset in range(existing, rows, batch_size):
+            count = min(batch_size, rows - offset)
+            with transaction.atomic():
+                ChatMessage.objects.bulk_create([
+                    ChatMessage(
+                        user=users[(offset + i) % user_count],
+                        message=" ".join(rng.choices(VOCABULARY, WEIGHTS, k=12)),
+                        response=" ".join(rng.choices(VOCABULARY, WEIGHTS, k=20)),
+                    )
+                    for i in range(count)
+                ])
+        return users
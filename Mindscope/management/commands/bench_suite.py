@@ -0,0 +1,288 @@
+import json
+import os
+import platform
+import random
+import threading
+import time
+from datetime import datetime, timezone
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, connections
+from django.test import Client, override_settings
+
+from Mindscope.models import ChatJob, MoodEntry, WellnessSummary
+from Mindscope.utils import benchmarking, chat_queue, crisis
+from Mindscope.utils.benchmarking import BENCH_PREFIX, HuggingFaceStub, latency_summary, measure, sentence
+from Mindscope.utils.fallback_responses import get_fallback_response
+from Mindscope.utils.inference_client import reset_inference_client
+from Mindscope.utils.openai_client import build_conversation_context
+from Mindscope.utils.screening_engine import COMPILED
+
+# (name, method, path, form data or None); run in order by every virtual user
+SCENARIO = [
+    ("landing", "get", "/", None),
+    ("home", "get", "/home/", None),
+    ("dashboard", "get", "/dashboard/", None),
+    ("log_mood", "post", "/mood-tracker/", "mood"),
+    ("mood_history_api", "get", "/api/mood-history/", None),
+    ("moods_api", "get", "/api/moods/", None),
+    ("screening_phq9", "post", "/screening/phq9/", "phq9"),
+    ("chat_page", "get", "/chat/", None),
+    ("chat_send", "post", "/chat/", "chat"),
+    ("search_api", "get", "/api/search/?q=sleep", None),
+]
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark suite: micro-benchmarks of the hot helpers (crisis check, fallback responses, "
+        "conversation context, screening scoring, wellness summary) and a threaded load "
+        "test of the main routes with the Hugging Face endpoints replaced by a local stub. "
+        "Runs in a throwaway test database it seeds itself, writes JSON, and with "
+        "--baseline fails on regressions."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--only", choices=["micro", "load"], help="Run one part of the suite")
+        parser.add_argument("--users", type=int, default=20, help="Seeded users (micro) and virtual users (load)")
+        parser.add_argument("--rows-per-user", type=int, default=500, help="Mood entries per seeded user; chats and screenings scale from it")
+        parser.add_argument("--iterations", type=int, default=5, help="Scenario passes per virtual user")
+        parser.add_argument("--stub-latency-ms", type=float, default=50.0, help="Latency of the stub inference endpoint")
+        parser.add_argument("--host", default="localhost", help="Host header for load-test requests (must be in ALLOWED_HOSTS)")
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument("--output", help="Write results as JSON to this file")
+        parser.add_argument("--baseline", help="Results JSON from an earlier run to compare against")
+        parser.add_argument(
+            "--threshold", type=float, default=benchmarking.DEFAULT_THRESHOLD,
+            help="Relative slowdown that counts as a regression (0.15 = 15%%)",
+        )
+
+    def handle(self, *args, **options):
+        baseline = None
+        if options["baseline"]:
+            try:
+                with open(options["baseline"]) as fh:
+                    baseline = json.load(fh)
+            except (OSError, ValueError) as e:
+                raise CommandError(f"Cannot read baseline {options['baseline']}: {e}")
+
+        results = {"meta": self.meta(options)}
+        # seed, hammer and drop a throwaway copy of the schema, never the configured database
+        self.stdout.write("Creating a throwaway test database...")
+        with benchmarking.throwaway_databases():
+            if options["only"] in (None, "micro"):
+                results["micro"] = self.run_micro(options)
+            if options["only"] in (None, "load"):
+                results["load"] = self.run_load(options)
+
+        self.stdout.write(json.dumps(results, indent=2, default=str))
+        if options["output"]:
+            with open(options["output"], "w") as fh:
+                json.dump(results, fh, indent=2, default=str)
+            self.stdout.write(self.style.SUCCESS(f"Results written to {options['output']}"))
+
+        if baseline is not None:
+            self.report(results, baseline, options["threshold"])
+
+    def meta(self, options):
+        return {
+            "started": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "database": connection.vendor,
+            "users": options["users"],
+            "rows_per_user": options["rows_per_user"],
+            "iterations": options["iterations"],
+            "stub_latency_ms": options["stub_latency_ms"],
+            "chat_queue": chat_queue.queue_settings()["ENABLED"],
+            "seed": options["seed"],
+        }
+
+    def run_micro(self, options):
+        rng = random.Random(options["seed"])
+        rows = options["rows_per_user"]
+        self.stdout.write(f"Seeding {options['users']} users x {rows} mood entries...")
+        users = benchmarking.seed_dataset(options["users"], rows, max(1, rows // 10), max(1, rows // 2), options["seed"])
+
+        messages = [sentence(rng) for _ in range(1000)]
+        history = []
+        for _ in range(10):
+            history += [{"role": "user", "content": sentence(rng, 10, 40)}, {"role": "assistant", "content": sentence(rng, 20, 60)}]
+        answers = {
+            code: [{f"q{i}": str(rng.randint(0, instrument.max_answer)) for i in range(1, instrument.items + 1)} for _ in range(100)]
+            for code, instrument in COMPILED.items()
+        }
+        cycle = {"message": 0, "answer": 0, "user": 0}
+
+        def fallback():
+            cycle["message"] = (cycle["message"] + 1) % len(messages)
+            get_fallback_response(messages[cycle["message"]])
+
+        def context():
+            cycle["message"] = (cycle["message"] + 1) % len(messages)
+            build_conversation_context(messages[cycle["message"]], history)
+
+        def scoring(code):
+            instrument = COMPILED[code]
+
+            def run():
+                cycle["answer"] = (cycle["answer"] + 1) % 100
+                instrument.band(instrument.score_form(answers[code][cycle["answer"]]))
+            return run
+
+        def next_user():
+            cycle["user"] = (cycle["user"] + 1) % len(users)
+            return users[cycle["user"]]
+
+        summaries = [WellnessSummary.for_user(user) for user in users]
+
+        def refresh():
+            cycle["user"] = (cycle["user"] + 1) % len(summaries)
+            summaries[cycle["user"]].refresh_wellness()
+
+        def crisis_check():
+            cycle["message"] = (cycle["message"] + 1) % len(messages)
+            crisis.detect(messages[cycle["message"]])
+
+        benches = {
+            "crisis_detect": crisis_check,
+            "get_fallback_response": fallback,
+            "build_conversation_context": context,
+            **{f"screening_score_{code.lower()}": scoring(code) for code in COMPILED},
+            "wellness_refresh": refresh,
+            "wellness_for_user": lambda: WellnessSummary.for_user(next_user()),
+            "wellness_rebuild": lambda: WellnessSummary.rebuild(next_user()),
+        }
+        micro = {}
+        for name, fn in benches.items():
+            micro[name] = measure(fn)
+            self.stdout.write(f"  {name}: {micro[name]['median_us']} µs")
+        return micro
+
+    def run_load(self, options):
+        rng = random.Random(options["seed"])
+        moods = [choice for choice, _label in MoodEntry.MOOD_CHOICES]
+        phq9 = COMPILED["PHQ9"]
+        vus = options["users"]
+
+        def form(kind, i):
+            if kind == "mood":
+                return {"mood": moods[i % len(moods)], "notes": sentence(rng), "influencers": ["Work"]}
+            if kind == "phq9":
+                return {f"q{n}": str(rng.randint(0, phq9.max_answer)) for n in range(1, phq9.items + 1)}
+            # distinct messages so the response cache does not hide the inference path
+            return {"message": f"{sentence(rng)} ({i})"}
+
+        samples = {name: [] for name, *_ in [("signup",)] + SCENARIO}
+        errors = {name: 0 for name in samples}
+        lock = threading.Lock()
+
+        def hit(client, name, method, path, data):
+            start = time.perf_counter()
+            try:
+                response = getattr(client, method)(path, data) if data is not None else getattr(client, method)(path)
+                failed = response.status_code >= 500
+            except Exception:
+                failed = True
+            elapsed = (time.perf_counter() - start) * 1000
+            with lock:
+                samples[name].append(elapsed)
+                errors[name] += failed
+
+        def virtual_user(index):
+            client = Client(HTTP_HOST=options["host"], raise_request_exception=False)
+            try:
+                password = "bench-password"
+                hit(client, "signup", "post", "/signup/", {
+                    "full_name": f"{BENCH_PREFIX}load_{index}", "password": password, "confirm_password": password,
+                })
+                for i in range(options["iterations"]):
+                    for name, method, path, kind in SCENARIO:
+                        hit(client, name, method, path, form(kind, index * 1000 + i) if kind else None)
+            finally:
+                connections.close_all()
+
+        stub = HuggingFaceStub(options["stub_latency_ms"])
+        backends = {name: {"url": stub.url} for name in ("hf_large", "hf_small")}
+        previous_key = os.environ.get("HUGGINGFACE_API_KEY")
+        os.environ["HUGGINGFACE_API_KEY"] = "bench-stub"
+        self.stdout.write(f"Load test: {vus} virtual users x {options['iterations']} passes, stub at {stub.url}")
+        try:
+            with stub, override_settings(INFERENCE_BACKENDS={**settings.INFERENCE_BACKENDS, **backends}):
+                reset_inference_client()
+                # with the queue on, chat replies come from its workers, so run them alongside the virtual users
+                queued = chat_queue.queue_settings()["ENABLED"]
+                stop = threading.Event()
+                workers = [
+                    threading.Thread(target=chat_queue.run_worker, args=(f"bench-{i}", stop))
+                    for i in range(chat_queue.queue_settings()["WORKERS"] if queued else 0)
+                ]
+                threads = [threading.Thread(target=virtual_user, args=(i,)) for i in range(vus)]
+                started = time.perf_counter()
+                for thread in workers + threads:
+                    thread.start()
+                for thread in threads:
+                    thread.join()
+                elapsed = time.perf_counter() - started
+                pending = ChatJob.objects.filter(chat__user__username__startswith=BENCH_PREFIX, status__in=[ChatJob.QUEUED, ChatJob.RUNNING])
+                deadline = time.monotonic() + 60
+                while pending.exists() and time.monotonic() < deadline:
+                    time.sleep(0.1)
+                stop.set()
+                for thread in workers:
+                    thread.join()
+        finally:
+            reset_inference_client()
+            if previous_key is None:
+                os.environ.pop("HUGGINGFACE_API_KEY", None)
+            else:
+                os.environ["HUGGINGFACE_API_KEY"] = previous_key
+
+        # POST to stored reply: queue wait plus generation (chat_send covers it when inline)
+        jobs = ChatJob.objects.filter(chat__user__username__startswith=BENCH_PREFIX)
+        reply_ms = [
+            (finished - created).total_seconds() * 1000
+            for created, finished in jobs.filter(finished_at__isnull=False).values_list("chat__timestamp", "finished_at")
+        ]
+        total = sum(len(values) for values in samples.values())
+        load = {
+            "total": {
+                "requests": total,
+                "seconds": round(elapsed, 2),
+                "requests_per_sec": round(total / elapsed, 1) if elapsed else None,
+                "errors": sum(errors.values()),
+                "stub_calls": len(stub.calls),
+            },
+            "routes": {name: {**latency_summary(values), "errors": errors[name]} for name, values in samples.items()},
+        }
+        if queued:
+            load["chat_reply"] = {
+                **latency_summary(reply_ms),
+                "unfinished": jobs.filter(finished_at__isnull=True).count(),
+                "dead": jobs.filter(status=ChatJob.DEAD).count(),
+            }
+        return load
+
+    def report(self, results, baseline, threshold):
+        # meta only describes the run; differing parameters make the comparison unreliable
+        changed = [
+            key for key in ("database", "users", "rows_per_user", "iterations", "stub_latency_ms", "chat_queue")
+            if baseline.get("meta", {}).get(key) != results["meta"][key]
+        ]
+        if changed:
+            self.stdout.write(self.style.WARNING(f"Baseline was run with different {', '.join(changed)}"))
+        sections = ("micro", "load")
+        rows = benchmarking.compare(
+            {key: results[key] for key in sections if key in results},
+            {key: baseline[key] for key in sections if key in baseline},
+            threshold,
+        )
+        regressions = [row for row in rows if row[4]]
+        self.stdout.write(f"\nCompared {len(rows)} metrics against the baseline (threshold {threshold:.0%}):")
+        for metric, old, new, change, regressed in rows:
+            line = f"  {metric}: {old} -> {new} ({change:+.1%})"
+            self.stdout.write(self.style.ERROR(line + "  REGRESSION") if regressed else line)
+        if regressions:
+            raise CommandError(f"{len(regressions)} metric(s) regressed by more than {threshold:.0%}")
+        self.stdout.write(self.style.SUCCESS("No regressions."))
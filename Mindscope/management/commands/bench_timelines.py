@@ -0,0 +1,115 @@
+import json
+import time
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+
+from Mindscope.models import ChatMessage, MoodEntry, Screening
+from Mindscope.utils.benchmarking import throwaway_databases
+from Mindscope.utils.pagination import encode_cursor, keyset_page, keyset_queryset
+
+BENCH_PREFIX = "bench_timelines_"
+PAGE_SIZE = 20
+
+
+def _timed(fn, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return round(best * 1000, 3)
+
+
+class Command(BaseCommand):
+    help = (
+        "Seed large mood/screening/chat timelines and record query plans and timings "
+        "for first-page, OFFSET and keyset pagination."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=1_000_000, help="Total rows seeded per table")
+        parser.add_argument("--users", type=int, default=50, help="Users the rows are spread across")
+        parser.add_argument("--repeat", type=int, default=5, help="Runs per timing (best is kept)")
+        parser.add_argument("--output", help="Write results as JSON to this file")
+        parser.add_argument("--keep", action="store_true", help="Keep the throwaway database and its rows for the next run")
+
+    def handle(self, *args, **options):
+        # seed and measure in a throwaway copy of the schema, never the configured database
+        with throwaway_databases(keep=options["keep"]):
+            self.run(options)
+
+    def run(self, options):
+        users = self.seed(options["rows"], options["users"])
+        target = users[0]
+        timelines = [
+            ("mood", MoodEntry, "date_logged"),
+            ("screening", Screening, "date_taken"),
+            ("chat", ChatMessage, "timestamp"),
+        ]
+
+        results = {"rows": options["rows"], "users": options["users"], "vendor": connection.vendor, "timelines": {}}
+        for name, model, field in timelines:
+            results["timelines"][name] = self.measure(model, field, target, options["repeat"])
+            self.stdout.write(f"{name}: {json.dumps(results['timelines'][name]['timings_ms'])}")
+
+        if options["output"]:
+            with open(options["output"], "w") as fh:
+                json.dump(results, fh, indent=2)
+            self.stdout.write(self.style.SUCCESS(f"Results written to {options['output']}"))
+
+    def seed(self, rows, user_count, batch_size=10_000):
+        users = [
+            User.objects.get_or_create(username=f"{BENCH_PREFIX}{i}")[0]
+            for i in range(user_count)
+        ]
+        existing = MoodEntry.objects.filter(user__username__startswith=BENCH_PREFIX).count()
+        if existing >= rows:
+            return users
+
+        self.stdout.write(f"Seeding {rows} rows per table across {user_count} users...")
+        moods = [choice for choice, _label in MoodEntry.MOOD_CHOICES]
+        # bulk_create skips MoodEntry.save, so the score is filled in here
+        for offset in range(0, rows, batch_size):
+            count = min(batch_size, rows - offset)
+            with transaction.atomic():
+                MoodEntry.objects.bulk_create([
+                    MoodEntry(
+                        user=users[(offset + i) % user_count],
+                        mood=moods[i % len(moods)],
+                        score=MoodEntry.MOOD_SCORES[moods[i % len(moods)]],
+                    )
+                    for i in range(count)
+                ])
+                Screening.objects.bulk_create([
+                    Screening(user=users[(offset + i) % user_count], screening_type="PHQ9", score=i % 28, severity="Mild")
+                    for i in range(count)
+                ])
+                ChatMessage.objects.bulk_create([
+                    ChatMessage(user=users[(offset + i) % user_count], message="benchmark message", response="ok")
+                    for i in range(count)
+                ])
+        return users
+
+    def measure(self, model, field, user, repeat):
+        queryset = model.objects.filter(user=user)
+        total = queryset.count()
+        deep_offset = max(0, total - PAGE_SIZE)
+        ordered = queryset.order_by(f"-{field}", "-pk")
+
+        anchor = ordered.values_list(field, "pk")[deep_offset - 1] if deep_offset else None
+        deep_cursor = encode_cursor(*anchor) if anchor else None
+        return {
+            "user_rows": total,
+            "timings_ms": {
+                "first_page": _timed(lambda: keyset_page(queryset, field, None, PAGE_SIZE), repeat),
+                "deep_offset": _timed(lambda: list(ordered[deep_offset:deep_offset + PAGE_SIZE]), repeat),
+                "deep_keyset": _timed(lambda: keyset_page(queryset, field, deep_cursor, PAGE_SIZE), repeat),
+            },
+            "plans": {
+                "deep_offset": ordered[deep_offset:deep_offset + PAGE_SIZE].explain(),
+                "deep_keyset": keyset_queryset(queryset, field, deep_cursor)[:PAGE_SIZE + 1].explain(),
+            },
+        }
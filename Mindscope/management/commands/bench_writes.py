@@ -0,0 +1,120 @@
+import json
+import statistics
+import threading
+import time
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import OperationalError, connection, connections
+
+from Mindscope.models import ChatMessage, MoodEntry, WellnessSummary
+from Mindscope.utils.benchmarking import percentile, throwaway_databases
+
+BENCH_PREFIX = "bench_writes_"
+
+
+class Command(BaseCommand):
+    help = (
+        "Concurrent write load test: worker threads log moods (with the wellness summary "
+        "update) and chat messages while reader threads load dashboard data. Run once per "
+        "database profile (e.g. SQLITE_WAL=0, the default, MINDSCOPE_DB_PROFILE=postgres) "
+        "and compare the JSON results."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--writers", type=int, default=8)
+        parser.add_argument("--readers", type=int, default=2)
+        parser.add_argument("--seconds", type=float, default=10.0, help="Duration of the run")
+        parser.add_argument("--label", default="", help="Name for this run in the output")
+        parser.add_argument("--output", help="Write results as JSON to this file")
+
+    def handle(self, *args, **options):
+        # write to a throwaway copy of the schema, never the configured database
+        with throwaway_databases():
+            self.run(options)
+
+    def run(self, options):
+        users = [User.objects.get_or_create(username=f"{BENCH_PREFIX}{i}")[0] for i in range(options["writers"])]
+        for user in users:
+            WellnessSummary.for_user(user)
+        connections.close_all()
+
+        stop = threading.Event()
+        latencies, errors, reads = [], [], [0]
+        lock = threading.Lock()
+
+        def writer(user):
+            moods = [choice for choice, _label in MoodEntry.MOOD_CHOICES]
+            i = 0
+            try:
+                while not stop.is_set():
+                    start = time.perf_counter()
+                    try:
+                        MoodEntry.objects.create(user=user, mood=moods[i % len(moods)], notes="load test")
+                        ChatMessage.objects.create(user=user, message="load test", response="ok")
+                    except OperationalError as e:
+                        with lock:
+                            errors.append(str(e))
+                        continue
+                    finally:
+                        i += 1
+                    with lock:
+                        latencies.append((time.perf_counter() - start) * 1000)
+            finally:
+                connections.close_all()
+
+        def reader(user):
+            try:
+                while not stop.is_set():
+                    try:
+                        list(MoodEntry.objects.filter(user=user).order_by("-date_logged")[:10])
+                        WellnessSummary.objects.filter(user=user).first()
+                    except OperationalError as e:
+                        with lock:
+                            errors.append(str(e))
+                        continue
+                    with lock:
+                        reads[0] += 1
+            finally:
+                connections.close_all()
+
+        threads = [threading.Thread(target=writer, args=(user,)) for user in users]
+        threads += [threading.Thread(target=reader, args=(users[i % len(users)],)) for i in range(options["readers"])]
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        time.sleep(options["seconds"])
+        stop.set()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - started
+
+        db = settings.DATABASES["default"]
+        profile = {"vendor": connection.vendor, "conn_max_age": db.get("CONN_MAX_AGE", 0), "options": db.get("OPTIONS", {})}
+        if connection.vendor == "sqlite":
+            with connection.cursor() as cursor:
+                cursor.execute("PRAGMA journal_mode")
+                profile["journal_mode"] = cursor.fetchone()[0]
+        latencies.sort()
+        results = {
+            "label": options["label"] or connection.vendor,
+            "profile": profile,
+            "writers": options["writers"],
+            "readers": options["readers"],
+            "seconds": round(elapsed, 2),
+            # one operation = a mood entry (plus its summary update) and a chat message
+            "write_ops_per_sec": round(len(latencies) / elapsed, 1),
+            "reads_per_sec": round(reads[0] / elapsed, 1),
+            "latency_ms": {
+                "p50": round(statistics.median(latencies), 2) if latencies else None,
+                "p95": round(percentile(latencies, 0.95), 2) if latencies else None,
+            },
+            "errors": len(errors),
+            "error_samples": sorted(set(errors))[:3],
+        }
+        self.stdout.write(json.dumps(results, indent=2, default=str))
+        if options["output"]:
+            with open(options["output"], "w") as fh:
+                json.dump(results, fh, indent=2, default=str)
+            self.stdout.write(self.style.SUCCESS(f"Results written to {options['output']}"))
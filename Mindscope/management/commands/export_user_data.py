@@ -0,0 +1,38 @@
+import sys
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+
+from Mindscope.utils.export import iter_export
+
+
+class Command(BaseCommand):
+    help = "Stream one user's (or every user's) moods, screenings and chats to a file as NDJSON or CSV."
+
+    def add_arguments(self, parser):
+        target = parser.add_mutually_exclusive_group(required=True)
+        target.add_argument("--user", help="Username to export")
+        target.add_argument("--all", action="store_true", help="Export every user")
+        parser.add_argument("--format", choices=["ndjson", "csv"], default="ndjson")
+        parser.add_argument("--gzip", action="store_true")
+        parser.add_argument("--output", help="File to write (default: stdout)")
+
+    def handle(self, *args, **options):
+        if options["all"]:
+            users = User.objects.order_by("pk").iterator(chunk_size=500)
+        else:
+            users = list(User.objects.filter(username=options["user"]))
+            if not users:
+                raise CommandError(f"No user named {options['user']!r}")
+
+        chunks = iter_export(users, options["format"], options["gzip"])
+        if options["output"]:
+            mode = "wb" if options["gzip"] else "w"
+            with open(options["output"], mode, **({} if options["gzip"] else {"encoding": "utf-8", "newline": ""})) as fh:
+                for chunk in chunks:
+                    fh.write(chunk)
+            self.stderr.write(self.style.SUCCESS(f"Export written to {options['output']}"))
+        else:
+            out = sys.stdout.buffer if options["gzip"] else sys.stdout
+            for chunk in chunks:
+                out.write(chunk)
@@ -0,0 +1,53 @@
+import json
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from Mindscope.utils.screening_import import DEFAULT_CHUNK_SIZE, import_screenings, iter_records
+
+
+class Command(BaseCommand):
+    help = (
+        "Stream PHQ-9/GAD-7/PSS-10 results from a CSV or JSONL file, score them with the "
+        "screening engine and bulk-insert them in chunks. Resumes from a checkpoint file."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("path")
+        parser.add_argument("--format", choices=["csv", "jsonl"], help="Defaults to the file extension")
+        parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+        parser.add_argument(
+            "--checkpoint",
+            help="File recording the last committed line (default: <path>.progress); delete it to start over",
+        )
+        parser.add_argument("--dry-run", action="store_true", help="Validate and score without writing")
+
+    def handle(self, *args, **options):
+        path = Path(options["path"])
+        if not path.exists():
+            raise CommandError(f"{path} does not exist")
+        fmt = options["format"] or path.suffix.lstrip(".").lower()
+        if fmt not in ("csv", "jsonl"):
+            raise CommandError("Cannot infer the format; pass --format csv or --format jsonl")
+
+        checkpoint = Path(options["checkpoint"] or f"{path}.progress")
+        skip = int(checkpoint.read_text()) if checkpoint.exists() and not options["dry_run"] else 0
+        if skip:
+            self.stdout.write(f"Resuming after line {skip}")
+
+        def on_chunk(stats):
+            if not options["dry_run"]:
+                checkpoint.write_text(str(stats["last_line"]))
+            self.stdout.write(
+                f"line {stats['last_line']}: {stats['imported']} imported, "
+                f"{stats['invalid']} invalid, {stats['rows_per_sec']} rows/sec"
+            )
+
+        with path.open(newline="", encoding="utf-8") as fh:
+            stats = import_screenings(
+                iter_records(fh, fmt), options["chunk_size"], skip, options["dry_run"], on_chunk
+            )
+
+        for error in stats["errors"]:
+            self.stderr.write(f"line {error['line']}: {error['error']}")
+        self.stdout.write(self.style.SUCCESS(json.dumps({k: v for k, v in stats.items() if k != "errors"})))
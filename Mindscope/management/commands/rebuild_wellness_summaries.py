@@ -0,0 +1,23 @@
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+
+from Mindscope.models import WellnessSummary
+
+
+class Command(BaseCommand):
+    help = "Rebuild every user's dashboard wellness summary from the mood and screening history."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--user", help="Only rebuild the summary for this username")
+
+    def handle(self, *args, **options):
+        users = User.objects.order_by("pk")
+        if options["user"]:
+            users = users.filter(username=options["user"])
+
+        rebuilt = 0
+        for user in users.iterator(chunk_size=500):
+            WellnessSummary.rebuild(user)
+            rebuilt += 1
+
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {rebuilt} wellness summaries."))
@@ -0,0 +1,20 @@
+import json
+
+from django.core.management.base import BaseCommand
+
+from Mindscope.utils.screening_import import DEFAULT_CHUNK_SIZE, rescore_screenings
+
+
+class Command(BaseCommand):
+    help = "Recompute the severity of every stored screening after the severity bands change."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+        parser.add_argument("--dry-run", action="store_true", help="Only count rows that would change")
+
+    def handle(self, *args, **options):
+        def on_chunk(stats):
+            self.stdout.write(f"{stats['scanned']} scanned, {stats['updated']} changed, {stats['rows_per_sec']} rows/sec")
+
+        stats = rescore_screenings(options["chunk_size"], options["dry_run"], on_chunk)
+        self.stdout.write(self.style.SUCCESS(json.dumps(stats)))
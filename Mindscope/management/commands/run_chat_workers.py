@@ -0,0 +1,46 @@
+import signal
+import threading
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from Mindscope.utils import catalog, chat_queue, conversation
+
+
+class Command(BaseCommand):
+    help = (
+        "Run chat queue workers: threads that claim queued chat messages, generate the "
+        "reply and store it (see CHAT_QUEUE in settings). Run one or more of these "
+        "processes next to the web server."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--workers", type=int, help="Worker threads (default: CHAT_QUEUE['WORKERS'])")
+        parser.add_argument("--drain", action="store_true", help="Exit once no job is ready instead of polling")
+
+    def handle(self, *args, **options):
+        count = options["workers"] or chat_queue.queue_settings()["WORKERS"]
+        catalog.preload()
+        conversation.preload()
+        # the main thread only waits from here on; the workers open their own connections
+        connections.close_all()
+        stop = threading.Event()
+
+        def shutdown(signum, frame):
+            self.stdout.write("Stopping after the current jobs...")
+            stop.set()
+
+        signal.signal(signal.SIGTERM, shutdown)
+        signal.signal(signal.SIGINT, shutdown)
+
+        threads = [
+            threading.Thread(target=chat_queue.run_worker, args=(chat_queue.worker_name(i), stop, options["drain"]))
+            for i in range(count)
+        ]
+        self.stdout.write(f"Running {count} chat worker(s)")
+        for thread in threads:
+            thread.start()
+        # join with a timeout so the main thread keeps receiving signals
+        while any(thread.is_alive() for thread in threads):
+            for thread in threads:
+                thread.join(0.5)
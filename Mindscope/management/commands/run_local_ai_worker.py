@@ -0,0 +1,35 @@
+import json
+import sys
+
+from django.core.management.base import BaseCommand
+
+from Mindscope.utils import local_worker
+from Mindscope.utils.local_ai import DEFAULT_MODEL, LocalAIChat
+
+
+class Command(BaseCommand):
+    help = "Run the shared local DialoGPT worker that Django processes query over a local socket."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--model", default=DEFAULT_MODEL)
+        parser.add_argument(
+            "--probe", action="store_true",
+            help="Query a running worker and exit 0 if it is ready (for readiness checks)",
+        )
+
+    def handle(self, *args, **options):
+        if options["probe"]:
+            status = local_worker.health()
+            self.stdout.write(json.dumps(status))
+            sys.exit(0 if status.get("status") == "ready" else 1)
+
+        config = local_worker.worker_settings()
+        worker = local_worker.LocalAIWorker(
+            LocalAIChat(options["model"]),
+            max_batch_size=config["MAX_BATCH_SIZE"],
+            batch_window=config["BATCH_WINDOW_MS"] / 1000,
+            max_queue=config["MAX_QUEUE"],
+            max_urgent=config["MAX_URGENT_QUEUE"],
+        )
+        self.stdout.write(f"Serving {options['model']} on {config['ADDRESS']}")
+        worker.serve_forever(config["ADDRESS"], config["AUTHKEY"])
@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand
+
+from Mindscope.utils.rollups import DEFAULT_CHUNK_SIZE, DEFAULT_SETTLE_SECONDS, update_all
+
+
+class Command(BaseCommand):
+    help = (
+        "Fold screenings and mood entries added since the last run into the daily rollup "
+        "tables behind the admin report. Rows are folded once they are --settle-seconds "
+        "old, so new rows show up one run later. Schedule it (e.g. every 15 minutes from cron)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+        parser.add_argument(
+            "--rebuild", action="store_true",
+            help="Recompute from scratch (needed after rescore_screenings or deletions)",
+        )
+        parser.add_argument(
+            "--settle-seconds", type=int, default=DEFAULT_SETTLE_SECONDS,
+            help="Only fold rows whose pk was already visible this long ago; 0 folds everything now "
+                 "(safe only while nothing else writes)",
+        )
+
+    def handle(self, *args, **options):
+        for name, processed in update_all(options["chunk_size"], options["rebuild"], options["settle_seconds"]).items():
+            self.stdout.write(f"{name}: {processed} new rows")
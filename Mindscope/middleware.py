@@ -0,0 +1,63 @@
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.signals import request_started
+from django.db.backends.signals import connection_created
+
+from .utils import metrics
+
+DEFAULTS = {
+    "SERVER_TIMING": True,
+    "TOKEN": None,  # bearer token for /metrics; without one only staff may read it
+}
+
+
+def metrics_settings():
+    return {**DEFAULTS, **getattr(settings, "PERFORMANCE_METRICS", {})}
+
+
+class PerformanceMiddleware:
+    """
+    Times every request (see utils/metrics.py): wall time, database queries,
+    template render and inference backends. Adds a Server-Timing header and
+    records histograms for /metrics. Put it first in MIDDLEWARE so the other
+    middleware is included in the total. For streaming responses the total
+    stops when the response object is returned, not when the stream ends.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+        self.server_timing = metrics_settings()["SERVER_TIMING"]
+        connection_created.connect(metrics.install_db_wrapper, dispatch_uid="mindscope-performance-metrics")
+        request_started.connect(metrics.install_on_open_connections, dispatch_uid="mindscope-performance-metrics")
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        timings, token = metrics.start_request()
+        try:
+            response = self.get_response(request)
+        finally:
+            metrics.end_request(token)
+        return self.finish(request, response, timings)
+
+    async def __acall__(self, request):
+        timings, token = metrics.start_request()
+        try:
+            response = await self.get_response(request)
+        finally:
+            metrics.end_request(token)
+        return self.finish(request, response, timings)
+
+    def finish(self, request, response, timings):
+        total = timings.elapsed()
+        match = getattr(request, "resolver_match", None)
+        view = match.view_name if match else "unresolved"
+        metrics.record(view, request.method, timings, total)
+        if self.server_timing:
+            response["Server-Timing"] = metrics.server_timing(timings, total)
+        return response
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.18 on 2026-10-18 15:54
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Mindscope', '0002_moodentry_score'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='WellnessSummary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('mood_sum', models.IntegerField(default=0)),
+                ('mood_count', models.IntegerField(default=0)),
+                ('latest_screenings', models.JSONField(blank=True, default=dict)),
+                ('last_screening_score', models.IntegerField(blank=True, null=True)),
+                ('wellness_score', models.FloatField(default=5.0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='wellness_summary', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+    ]
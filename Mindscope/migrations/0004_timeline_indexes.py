@@ -0,0 +1,27 @@
+# Generated by Django 5.2.18 on 2026-10-18 15:55
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Mindscope', '0003_wellnesssummary'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='chatmessage',
+            index=models.Index(fields=['user', 'timestamp'], name='chat_user_ts_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='moodentry',
+            index=models.Index(fields=['user', 'date_logged'], name='mood_user_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='screening',
+            index=models.Index(fields=['user', 'date_taken'], name='screening_user_date_idx'),
+        ),
+    ]
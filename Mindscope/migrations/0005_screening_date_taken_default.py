@@ -0,0 +1,19 @@
+# Generated by Django 5.2.18 on 2026-10-18 16:06
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Mindscope', '0004_timeline_indexes'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='screening',
+            name='date_taken',
+            field=models.DateTimeField(default=django.utils.timezone.now, editable=False),
+        ),
+    ]
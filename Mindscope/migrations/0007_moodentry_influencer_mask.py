@@ -0,0 +1,39 @@
+# Generated by Django 5.2.18 on 2026-10-18 16:08
+
+from django.db import migrations, models
+
+# frozen copy of MoodEntry.INFLUENCERS at the time of this migration
+INFLUENCERS = [
+    "Work", "Family", "Exercise", "Sleep", "Social",
+    "Health", "Weather", "Money", "Travel", "Learning"
+]
+
+
+def backfill_influencer_mask(apps, schema_editor):
+    MoodEntry = apps.get_model("Mindscope", "MoodEntry")
+    last_pk = 0
+    while True:
+        entries = list(MoodEntry.objects.filter(pk__gt=last_pk).exclude(influencers="").order_by("pk")[:1000])
+        if not entries:
+            break
+        for entry in entries:
+            names = {name.strip() for name in entry.influencers.split(",")}
+            entry.influencer_mask = sum(1 << i for i, name in enumerate(INFLUENCERS) if name in names)
+        MoodEntry.objects.bulk_update(entries, ["influencer_mask"])
+        last_pk = entries[-1].pk
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Mindscope', '0006_chatarchivesegment'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='moodentry',
+            name='influencer_mask',
+            field=models.IntegerField(default=0, help_text='Bitmask of INFLUENCERS, kept in sync on save'),
+        ),
+        migrations.RunPython(backfill_influencer_mask, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,49 @@
+# Generated by Django 5.2.18 on 2026-10-18 16:09
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Mindscope', '0007_moodentry_influencer_mask'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RollupWatermark',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=50, unique=True)),
+                ('last_pk', models.BigIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='DailyMoodRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('mood', models.CharField(choices=[('😊', 'Happy'), ('😢', 'Sad'), ('😡', 'Angry'), ('😌', 'Calm'), ('😴', 'Tired'), ('😟', 'Anxious')], max_length=10)),
+                ('count', models.IntegerField(default=0)),
+                ('score_sum', models.BigIntegerField(default=0)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('day', 'mood'), name='mood_rollup_key')],
+            },
+        ),
+        migrations.CreateModel(
+            name='DailyScreeningRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('screening_type', models.CharField(choices=[('PHQ9', 'Depression (PHQ-9)'), ('GAD7', 'Anxiety (GAD-7)'), ('PSS10', 'Stress (PSS-10)')], max_length=10)),
+                ('severity', models.CharField(max_length=50)),
+                ('count', models.IntegerField(default=0)),
+                ('score_sum', models.BigIntegerField(default=0)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('day', 'screening_type', 'severity'), name='screening_rollup_key')],
+            },
+        ),
+    ]
@@ -0,0 +1,92 @@
+# Full-text indexes for chat messages and mood notes (see Mindscope/utils/fulltext.py).
+# SQLite: FTS5 external-content tables kept in sync by triggers, so bulk_create,
+# queryset.update() and queryset.delete() stay covered.
+# PostgreSQL: GIN expression indexes on to_tsvector(); nothing to keep in sync.
+# SQLite drops a table's triggers when a migration remakes it (AlterField and
+# friends copy the table and drop the old one), so a later migration that does
+# that to ChatMessage or MoodEntry must re-create them (current definitions in 0010).
+import logging
+
+from django.db import migrations
+from django.db.utils import OperationalError
+
+logger = logging.getLogger(__name__)
+
+# (fts table, content table, indexed columns)
+SQLITE_SOURCES = [
+    ("mindscope_chat_fts", "Mindscope_chatmessage", ["message", "response"]),
+    ("mindscope_mood_fts", "Mindscope_moodentry", ["notes"]),
+]
+
+POSTGRES_INDEXES = [
+    ("chat_fulltext_idx", "Mindscope_chatmessage",
+     "to_tsvector('english', coalesce(message, '') || ' ' || coalesce(response, ''))"),
+    ("mood_fulltext_idx", "Mindscope_moodentry", "to_tsvector('english', coalesce(notes, ''))"),
+]
+
+
+def sqlite_statements(fts, content, columns):
+    cols = ", ".join(columns + ["user_id"])
+    new = ", ".join(f"new.{c}" for c in columns + ["user_id"])
+    old = ", ".join(f"old.{c}" for c in columns + ["user_id"])
+    return [
+        f"CREATE VIRTUAL TABLE {fts} USING fts5({', '.join(columns)}, user_id UNINDEXED, "
+        f"content='{content}', content_rowid='id', tokenize='porter unicode61')",
+        f"CREATE TRIGGER {fts}_ai AFTER INSERT ON \"{content}\" BEGIN "
+        f"INSERT INTO {fts}(rowid, {cols}) VALUES (new.id, {new}); END",
+        f"CREATE TRIGGER {fts}_ad AFTER DELETE ON \"{content}\" BEGIN "
+        f"INSERT INTO {fts}({fts}, rowid, {cols}) VALUES ('delete', old.id, {old}); END",
+        f"CREATE TRIGGER {fts}_au AFTER UPDATE ON \"{content}\" BEGIN "
+        f"INSERT INTO {fts}({fts}, rowid, {cols}) VALUES ('delete', old.id, {old}); "
+        f"INSERT INTO {fts}(rowid, {cols}) VALUES (new.id, {new}); END",
+        f"INSERT INTO {fts}({fts}) VALUES ('rebuild')",
+    ]
+
+
+def fts5_available(connection):
+    with connection.cursor() as cursor:
+        try:
+            cursor.execute("CREATE VIRTUAL TABLE temp.mindscope_fts5_probe USING fts5(x)")
+        except OperationalError:
+            return False
+        cursor.execute("DROP TABLE temp.mindscope_fts5_probe")
+    return True
+
+
+def create_indexes(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == "sqlite":
+        # checked once up front: every source gets its table and triggers, or none does
+        if not fts5_available(schema_editor.connection):
+            # SQLite built without FTS5: search falls back to icontains
+            logger.warning("SQLite has no FTS5; full-text search will use icontains")
+            return
+        for fts, content, columns in SQLITE_SOURCES:
+            for statement in sqlite_statements(fts, content, columns):
+                schema_editor.execute(statement)
+    elif vendor == "postgresql":
+        for name, table, expression in POSTGRES_INDEXES:
+            schema_editor.execute(f'CREATE INDEX IF NOT EXISTS {name} ON "{table}" USING gin ({expression})')
+
+
+def drop_indexes(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == "sqlite":
+        for fts, content, columns in SQLITE_SOURCES:
+            for suffix in ("ai", "ad", "au"):
+                schema_editor.execute(f"DROP TRIGGER IF EXISTS {fts}_{suffix}")
+            schema_editor.execute(f"DROP TABLE IF EXISTS {fts}")
+    elif vendor == "postgresql":
+        for name, table, expression in POSTGRES_INDEXES:
+            schema_editor.execute(f"DROP INDEX IF EXISTS {name}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Mindscope', '0008_daily_rollups'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_indexes, drop_indexes),
+    ]
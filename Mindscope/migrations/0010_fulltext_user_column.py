@@ -0,0 +1,56 @@
+# Re-create the SQLite FTS5 tables with user_id as an indexed column, so a
+# per-user search intersects the user's doclist in the index instead of
+# filtering every match of the term. PostgreSQL is unchanged.
+from django.db import migrations
+
+SQLITE_SOURCES = [
+    ("mindscope_chat_fts", "Mindscope_chatmessage", ["message", "response"]),
+    ("mindscope_mood_fts", "Mindscope_moodentry", ["notes"]),
+]
+
+
+def sqlite_statements(fts, content, columns, user_id_option):
+    cols = ", ".join(columns + ["user_id"])
+    new = ", ".join(f"new.{c}" for c in columns + ["user_id"])
+    old = ", ".join(f"old.{c}" for c in columns + ["user_id"])
+    statements = [f"DROP TRIGGER IF EXISTS {fts}_{suffix}" for suffix in ("ai", "ad", "au")]
+    return statements + [
+        f"DROP TABLE IF EXISTS {fts}",
+        f"CREATE VIRTUAL TABLE {fts} USING fts5({', '.join(columns)}, user_id{user_id_option}, "
+        f"content='{content}', content_rowid='id', tokenize='porter unicode61')",
+        f"CREATE TRIGGER {fts}_ai AFTER INSERT ON \"{content}\" BEGIN "
+        f"INSERT INTO {fts}(rowid, {cols}) VALUES (new.id, {new}); END",
+        f"CREATE TRIGGER {fts}_ad AFTER DELETE ON \"{content}\" BEGIN "
+        f"INSERT INTO {fts}({fts}, rowid, {cols}) VALUES ('delete', old.id, {old}); END",
+        f"CREATE TRIGGER {fts}_au AFTER UPDATE ON \"{content}\" BEGIN "
+        f"INSERT INTO {fts}({fts}, rowid, {cols}) VALUES ('delete', old.id, {old}); "
+        f"INSERT INTO {fts}(rowid, {cols}) VALUES (new.id, {new}); END",
+        f"INSERT INTO {fts}({fts}) VALUES ('rebuild')",
+    ]
+
+
+def recreate(user_id_option):
+    def run(apps, schema_editor):
+        if schema_editor.connection.vendor != "sqlite":
+            return
+        with schema_editor.connection.cursor() as cursor:
+            cursor.execute("SELECT 1 FROM sqlite_master WHERE name = 'mindscope_chat_fts'")
+            if cursor.fetchone() is None:
+                return  # built without FTS5 (see 0009)
+        # FTS5 is known to work here, so any error aborts (and rolls back) the migration
+        # instead of leaving one source dropped and the other re-created
+        for fts, content, columns in SQLITE_SOURCES:
+            for statement in sqlite_statements(fts, content, columns, user_id_option):
+                schema_editor.execute(statement)
+    return run
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Mindscope', '0009_fulltext_index'),
+    ]
+
+    operations = [
+        migrations.RunPython(recreate(""), recreate(" UNINDEXED")),
+    ]
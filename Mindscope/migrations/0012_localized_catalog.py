@@ -0,0 +1,122 @@
+# Generated by Django 5.2.18 on 2026-10-18 16:58
+# Moves the chatbot's keyword replies from the FALLBACK_RESPONSES dict into
+# ChatResponse rows (English plus Bengali), switches WellnessTip.language from
+# names ("English") to LANGUAGES codes, and seeds tips when there are none.
+
+from django.db import migrations, models
+
+RESPONSES = {
+    "en": {
+        "greeting": "Hello! 👋 I'm here to provide emotional support and guidance. How are you feeling today?",
+        "how_are_you": "I'm here and ready to listen! I'm an AI designed to provide mental health support. How can I help you today?",
+        "name": "I'm your mental health support assistant! You can call me MindHelper. 😊",
+        "help": "I'm here to listen and provide emotional support. You can share how you're feeling, ask for coping strategies, or discuss anything that's on your mind. What would you like to talk about?",
+        "thanks": "You're very welcome! I'm glad I could help. Remember I'm here whenever you need someone to talk to. 💙",
+        "goodbye": "Take care of yourself! Remember to practice self-care and reach out if you need more support. I'll be here when you return. 🌟",
+        "exercise": "Great question! Here are some helpful exercises:\n\n• **Deep Breathing**: 4-7-8 technique (inhale 4s, hold 7s, exhale 8s)\n• **Walking**: 15-20 minute brisk walk\n• **Yoga**: Child's pose or gentle stretches\n• **Progressive Muscle Relaxation**: Tense and release each muscle group\n• **Mindful Movement**: Gentle stretching with focus on breath",
+        "anxious": "I understand feeling anxious can be really difficult. 😔 Try taking some deep breaths - inhale for 4 seconds, hold for 4, exhale for 6. Would you like to talk about what's making you feel this way?",
+        "sleep": "Trouble sleeping can be so challenging. 😴 Establishing a regular bedtime routine, limiting screen time before bed, and creating a comfortable sleep environment can help. Would you like more specific suggestions?",
+        "stress": "Stress management is so important for wellbeing. 🧘‍♀️ Try breaking tasks into smaller steps, taking short breaks, or practicing mindfulness. What's causing you stress right now?",
+        "lonely": "Feeling lonely can be really tough. 💔 Reaching out to friends, joining community activities, or even volunteering can help create connections. Would you like to explore ways to feel more connected?",
+        "work": "Work stress is common. 💼 Setting boundaries, prioritizing tasks, and taking regular breaks can help manage this. What aspect of work is most challenging for you?",
+        "relationship": "Relationship issues can be complex. 💑 Clear communication and setting healthy boundaries are often helpful. Would you like to talk more about your specific situation?",
+        "sad": "I'm sorry you're feeling sad. 😔 Remember that it's okay to feel this way. Sometimes talking about it, writing in a journal, or doing something you enjoy can help.",
+        "angry": "Feeling angry is a natural emotion. 😠 Taking a walk, deep breathing, or counting to ten can help manage intense feelings. Would you like to talk about what's making you feel this way?",
+        "overwhelm": "When feeling overwhelmed, try breaking things down into smaller steps. 📝 Focus on one thing at a time and remember to take breaks. What's feeling overwhelming right now?",
+        "default": "Thank you for sharing. I'm here to listen and support you. How has your day been going? 💭",
+    },
+    "bn": {
+        "greeting": "হ্যালো! 👋 আমি আপনাকে মানসিক সহায়তা ও পরামর্শ দিতে এখানে আছি। আজ আপনি কেমন অনুভব করছেন?",
+        "how_are_you": "আমি এখানে আছি এবং শুনতে প্রস্তুত! আমি মানসিক স্বাস্থ্য সহায়তার জন্য তৈরি একটি এআই। আজ আমি আপনাকে কীভাবে সাহায্য করতে পারি?",
+        "name": "আমি আপনার মানসিক স্বাস্থ্য সহায়ক! আমাকে MindHelper বলে ডাকতে পারেন। 😊",
+        "help": "আমি আপনার কথা শুনতে এবং মানসিক সহায়তা দিতে এখানে আছি। আপনি কেমন অনুভব করছেন তা বলতে পারেন, মোকাবিলার কৌশল জানতে চাইতে পারেন, বা মনে যা আছে তা নিয়ে কথা বলতে পারেন। আপনি কী নিয়ে কথা বলতে চান?",
+        "thanks": "আপনাকেও ধন্যবাদ! সাহায্য করতে পেরে আমি খুশি। যখনই কারো সাথে কথা বলার দরকার হবে, আমি এখানে আছি। 💙",
+        "goodbye": "নিজের যত্ন নেবেন! নিজের প্রতি খেয়াল রাখুন, আর আরও সহায়তা দরকার হলে যোগাযোগ করুন। আপনি ফিরে এলে আমি এখানেই থাকব। 🌟",
+        "exercise": "চমৎকার প্রশ্ন! কিছু সহায়ক অনুশীলন:\n\n• **গভীর শ্বাস**: ৪-৭-৮ পদ্ধতি (৪ সেকেন্ড শ্বাস নিন, ৭ সেকেন্ড ধরে রাখুন, ৮ সেকেন্ডে ছাড়ুন)\n• **হাঁটা**: ১৫-২০ মিনিট দ্রুত হাঁটা\n• **যোগব্যায়াম**: চাইল্ডস পোজ বা হালকা স্ট্রেচিং\n• **প্রগ্রেসিভ মাসল রিলাক্সেশন**: প্রতিটি পেশি একবার টানটান করে তারপর শিথিল করুন\n• **সচেতন নড়াচড়া**: শ্বাসে মনোযোগ রেখে হালকা স্ট্রেচিং",
+        "anxious": "উদ্বেগ অনুভব করা সত্যিই কঠিন হতে পারে, আমি বুঝি। 😔 কয়েকবার গভীর শ্বাস নিন: ৪ সেকেন্ড শ্বাস নিন, ৪ সেকেন্ড ধরে রাখুন, ৬ সেকেন্ডে ছাড়ুন। কী কারণে এমন লাগছে, সে বিষয়ে কথা বলতে চান?",
+        "sleep": "ঘুমের সমস্যা খুবই কষ্টদায়ক হতে পারে। 😴 নিয়মিত ঘুমানোর রুটিন, ঘুমের আগে স্ক্রিন কম দেখা এবং আরামদায়ক পরিবেশ সাহায্য করতে পারে। আরও নির্দিষ্ট পরামর্শ চান?",
+        "stress": "ভালো থাকার জন্য মানসিক চাপ সামলানো খুব গুরুত্বপূর্ণ। 🧘‍♀️ কাজগুলো ছোট ছোট ধাপে ভাগ করুন, মাঝে মাঝে বিরতি নিন বা মাইন্ডফুলনেস চর্চা করুন। এই মুহূর্তে কী আপনাকে চাপ দিচ্ছে?",
+        "lonely": "একাকীত্ব সত্যিই কঠিন হতে পারে। 💔 বন্ধুদের সাথে যোগাযোগ, কমিউনিটির কাজে অংশ নেওয়া বা স্বেচ্ছাসেবা সম্পর্ক গড়তে সাহায্য করতে পারে। আরও সংযুক্ত অনুভব করার উপায় নিয়ে ভাবতে চান?",
+        "work": "কাজের চাপ খুবই সাধারণ। 💼 সীমা ঠিক করা, কাজের অগ্রাধিকার নির্ধারণ এবং নিয়মিত বিরতি নেওয়া সাহায্য করতে পারে। কাজের কোন দিকটি আপনার কাছে সবচেয়ে কঠিন?",
+        "relationship": "সম্পর্কের সমস্যা জটিল হতে পারে। 💑 স্পষ্ট যোগাযোগ এবং সুস্থ সীমা নির্ধারণ প্রায়ই সাহায্য করে। আপনার পরিস্থিতি নিয়ে আরও কথা বলতে চান?",
+        "sad": "আপনার মন খারাপ শুনে আমি দুঃখিত। 😔 এমন অনুভব করা স্বাভাবিক। কখনও কখনও কারো সাথে কথা বলা, ডায়েরি লেখা বা পছন্দের কিছু করা সাহায্য করে।",
+        "angry": "রাগ একটি স্বাভাবিক অনুভূতি। 😠 একটু হাঁটা, গভীর শ্বাস নেওয়া বা দশ পর্যন্ত গোনা তীব্র অনুভূতি সামলাতে সাহায্য করতে পারে। কী কারণে এমন লাগছে, সে বিষয়ে কথা বলতে চান?",
+        "overwhelm": "সবকিছু বেশি মনে হলে কাজগুলো ছোট ছোট ধাপে ভাগ করুন। 📝 একবারে একটি বিষয়ে মন দিন এবং বিরতি নিতে ভুলবেন না। এই মুহূর্তে কোন বিষয়টি বেশি ভারী লাগছে?",
+        "default": "শেয়ার করার জন্য ধন্যবাদ। আমি আপনার কথা শুনতে ও পাশে থাকতে এখানে আছি। আপনার দিনটি কেমন কাটছে? 💭",
+    },
+}
+
+TIPS = {
+    "en": [
+        ("Breathe slowly", "Inhale for 4 seconds, hold for 4, and exhale for 6. A few rounds can calm a racing mind."),
+        ("Keep a sleep routine", "Go to bed and wake up at the same time every day, and put screens away an hour before sleep."),
+        ("Move a little", "A 15-minute walk lifts mood and eases stress, especially outdoors."),
+        ("Reach out", "Send a message to a friend or family member today. Connection is a strong buffer against stress."),
+    ],
+    "bn": [
+        ("ধীরে শ্বাস নিন", "৪ সেকেন্ড শ্বাস নিন, ৪ সেকেন্ড ধরে রাখুন, ৬ সেকেন্ডে ছাড়ুন। কয়েকবার করলে অস্থির মন শান্ত হয়।"),
+        ("ঘুমের রুটিন মেনে চলুন", "প্রতিদিন একই সময়ে ঘুমাতে যান ও উঠুন, আর ঘুমের এক ঘণ্টা আগে স্ক্রিন সরিয়ে রাখুন।"),
+        ("একটু নড়াচড়া করুন", "১৫ মিনিট হাঁটলে মন ভালো হয় ও চাপ কমে, বিশেষ করে খোলা জায়গায়।"),
+        ("যোগাযোগ করুন", "আজ কোনো বন্ধু বা পরিবারের কাউকে একটি বার্তা পাঠান। সম্পর্ক চাপের বিরুদ্ধে শক্ত ঢাল।"),
+    ],
+}
+
+# old free-text WellnessTip.language values -> LANGUAGES codes
+LANGUAGE_NAMES = {"english": "en", "bengali": "bn", "bangla": "bn", "বাংলা": "bn"}
+
+
+def seed_catalog(apps, schema_editor):
+    ChatResponse = apps.get_model("Mindscope", "ChatResponse")
+    WellnessTip = apps.get_model("Mindscope", "WellnessTip")
+    for name, code in LANGUAGE_NAMES.items():
+        WellnessTip.objects.filter(language__iexact=name).update(language=code)
+    ChatResponse.objects.bulk_create(
+        [ChatResponse(intent=intent, language=language, text=text)
+         for language, texts in RESPONSES.items() for intent, text in texts.items()],
+        ignore_conflicts=True,
+    )
+    if not WellnessTip.objects.exists():
+        WellnessTip.objects.bulk_create(
+            [WellnessTip(title=title, content=content, language=language)
+             for language, tips in TIPS.items() for title, content in tips]
+        )
+
+
+def unseed_language_codes(apps, schema_editor):
+    WellnessTip = apps.get_model("Mindscope", "WellnessTip")
+    WellnessTip.objects.filter(language="en").update(language="English")
+    WellnessTip.objects.filter(language="bn").update(language="Bengali")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Mindscope', '0011_chatjob'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='chatjob',
+            name='language',
+            field=models.CharField(blank=True, help_text='Active language when queued', max_length=20),
+        ),
+        migrations.AlterField(
+            model_name='wellnesstip',
+            name='language',
+            field=models.CharField(choices=[('en', 'English'), ('bn', 'বাংলা')], default='en', max_length=20),
+        ),
+        migrations.CreateModel(
+            name='ChatResponse',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('intent', models.CharField(max_length=50)),
+                ('language', models.CharField(choices=[('en', 'English'), ('bn', 'বাংলা')], default='en', max_length=20)),
+                ('text', models.TextField()),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('intent', 'language'), name='chat_response_key')],
+            },
+        ),
+        migrations.RunPython(seed_catalog, unseed_language_codes),
+    ]
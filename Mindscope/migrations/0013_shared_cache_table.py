@@ -0,0 +1,21 @@
+# Creates the DatabaseCache table behind the "shared" cache alias
+# (Mindscope/utils/shared_cache.py), so `migrate` is all a deploy needs.
+# createcachetable skips aliases that are not DatabaseCaches (e.g. Redis).
+
+from django.core.management import call_command
+from django.db import migrations
+
+
+def create_cache_tables(apps, schema_editor):
+    call_command("createcachetable", database=schema_editor.connection.alias, verbosity=0)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Mindscope', '0012_localized_catalog'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_cache_tables, migrations.RunPython.noop),
+    ]
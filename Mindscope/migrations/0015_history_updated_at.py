@@ -0,0 +1,36 @@
+# updated_at on MoodEntry and Screening, for the dashboard/mood tracker ETags.
+# Added to the database as a plain nullable column: with auto_now (or any
+# default) SQLite remakes the table instead of using ALTER TABLE ADD COLUMN,
+# and that would drop MoodEntry's full-text triggers (0009).
+from django.db import migrations, models
+
+
+def add_updated_at(model_name):
+    return migrations.SeparateDatabaseAndState(
+        database_operations=[
+            migrations.AddField(
+                model_name=model_name,
+                name='updated_at',
+                field=models.DateTimeField(blank=True, null=True),
+            ),
+        ],
+        state_operations=[
+            migrations.AddField(
+                model_name=model_name,
+                name='updated_at',
+                field=models.DateTimeField(auto_now=True, blank=True, null=True),
+            ),
+        ],
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Mindscope', '0014_rollupwatermark_seen'),
+    ]
+
+    operations = [
+        add_updated_at('moodentry'),
+        add_updated_at('screening'),
+    ]
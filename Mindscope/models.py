@@ -1,5 +1,35 @@
-from django.db import models
+import json
+import zlib
+from collections import namedtuple
+from datetime import datetime
+
+from django.conf import settings
+from django.db import models, transaction
+from django.db.models import Count, Sum
 from django.contrib.auth.models import User
+from django.utils import timezone
+
+from .utils.commit_hooks import on_commit_once
+from .utils.shared_cache import shared_cache
+
+
+class HistoryQuerySet(models.QuerySet):
+    """
+    For MoodEntry and Screening: ``delete()`` tells the model which users lost
+    rows (``history_changed``). This stands in for post_delete receivers, which
+    would make Django load and signal every row instead of deleting in bulk.
+    Deleting a user cascades past it; their summary goes with them.
+    """
+    def delete(self):
+        with transaction.atomic(using=self.db):
+            user_ids = set(self.order_by().values_list("user_id", flat=True).distinct())
+            result = super().delete()
+            for user_id in user_ids:
+                self.model.history_changed(user_id)
+        return result
+
+    delete.alters_data = True
+    delete.queryset_only = True
 
 
 class Screening(models.Model):
@@ -12,7 +42,35 @@ class Screening(models.Model):
     screening_type = models.CharField(max_length=10, choices=SCREENING_TYPES)
     score = models.IntegerField()
     severity = models.CharField(max_length=50)
-    date_taken = models.DateTimeField(auto_now_add=True)
+    # default rather than auto_now_add so imported results keep their original date
+    date_taken = models.DateTimeField(default=timezone.now, editable=False)
+    # null for rows from before the column (see migration 0015)
+    updated_at = models.DateTimeField(auto_now=True, null=True, blank=True)
+
+    objects = HistoryQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["user", "date_taken"], name="screening_user_date_idx"),
+        ]
+
+    def save(self, *args, **kwargs):
+        is_new = self._state.adding
+        super().save(*args, **kwargs)
+        # keep the dashboard summary in step with new and edited results
+        if is_new:
+            WellnessSummary.record_screening(self)
+        else:
+            WellnessSummary.schedule_rebuild(self.user_id)
+
+    def delete(self, *args, **kwargs):
+        result = super().delete(*args, **kwargs)
+        self.history_changed(self.user_id)
+        return result
+
+    @classmethod
+    def history_changed(cls, user_id):
+        WellnessSummary.schedule_rebuild(user_id)
 
     def __str__(self):
         return f"{self.user.username} - {self.screening_type} ({self.score})"
@@ -37,17 +95,69 @@ class MoodEntry(models.Model):
         "😟": 4,
     }
 
+    # Bit i of influencer_mask is INFLUENCERS[i]; only ever append to this list
+    INFLUENCERS = [
+        "Work", "Family", "Exercise", "Sleep", "Social",
+        "Health", "Weather", "Money", "Travel", "Learning"
+    ]
+
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="mood_entries")
     mood = models.CharField(max_length=10, choices=MOOD_CHOICES)
     score = models.IntegerField(default=5)  # ✅ new field
     influencers = models.TextField(blank=True, help_text="Factors affecting mood")
+    influencer_mask = models.IntegerField(default=0, help_text="Bitmask of INFLUENCERS, kept in sync on save")
     notes = models.TextField(blank=True, null=True)
     date_logged = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True, null=True, blank=True)
+
+    objects = HistoryQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["user", "date_logged"], name="mood_user_date_idx"),
+        ]
 
     def save(self, *args, **kwargs):
         # ✅ auto-assign score whenever a mood is saved
         self.score = self.MOOD_SCORES.get(self.mood, 5)
+        self.influencer_mask = self.mask_for(self.influencers)
+        is_new = self._state.adding
         super().save(*args, **kwargs)
+        if is_new:
+            WellnessSummary.record_mood(self.user, self.score)
+        else:
+            WellnessSummary.schedule_rebuild(self.user_id)
+        self.invalidate_analytics(self.user_id)
+
+    @classmethod
+    def mask_for(cls, influencers):
+        """``"Work, Sleep"`` -> bitmask over INFLUENCERS (unknown names are ignored)."""
+        names = {name.strip() for name in (influencers or "").split(",")}
+        return sum(1 << i for i, name in enumerate(cls.INFLUENCERS) if name in names)
+
+    @staticmethod
+    def analytics_cache_key(user_id):
+        return f"mood-analytics:{user_id}"
+
+    @classmethod
+    def invalidate_analytics(cls, user_id):
+        """
+        Drop the user's cached analytics once the transaction commits, so they are
+        rebuilt on the next read. save() and deletes do this; call it after
+        bulk_create/update(), which bypass both.
+        """
+        key = cls.analytics_cache_key(user_id)
+        on_commit_once(key, lambda: shared_cache().delete(key))
+
+    def delete(self, *args, **kwargs):
+        result = super().delete(*args, **kwargs)
+        self.history_changed(self.user_id)
+        return result
+
+    @classmethod
+    def history_changed(cls, user_id):
+        WellnessSummary.schedule_rebuild(user_id)
+        cls.invalidate_analytics(user_id)
 
     def __str__(self):
         return f"{self.user.username} - {self.mood} ({self.date_logged.date()})"
@@ -59,14 +169,293 @@ class ChatMessage(models.Model):
     response = models.TextField(blank=True, null=True)
     timestamp = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=["user", "timestamp"], name="chat_user_ts_idx"),
+        ]
+
     def __str__(self):
         return f"Chat by {self.user.username} at {self.timestamp}"
 
 
+class ChatJob(models.Model):
+    """
+    Background generation of one ChatMessage's response; claimed and run by
+    ``manage.py run_chat_workers`` (see Mindscope/utils/chat_queue.py).
+    """
+    QUEUED, RUNNING, DONE, DEAD = "queued", "running", "done", "dead"
+    STATUS_CHOICES = [
+        (QUEUED, "Queued"),
+        (RUNNING, "Running"),
+        (DONE, "Done"),
+        (DEAD, "Dead-lettered"),
+    ]
+
+    chat = models.OneToOneField(ChatMessage, on_delete=models.CASCADE, related_name="job")
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=QUEUED)
+    priority = models.SmallIntegerField(default=0, help_text="Higher runs first")
+    attempts = models.PositiveSmallIntegerField(default=0)
+    available_at = models.DateTimeField(default=timezone.now, help_text="Not claimed before this (retry backoff)")
+    language = models.CharField(max_length=20, blank=True, help_text="Active language when queued")
+    locked_by = models.CharField(max_length=100, blank=True)
+    locked_at = models.DateTimeField(blank=True, null=True)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(blank=True, null=True)
+
+    class Meta:
+        indexes = [
+            # partial: only the rows a worker can claim, in claim order
+            models.Index(
+                fields=["-priority", "available_at", "id"], condition=models.Q(status="queued"), name="chatjob_queue_idx",
+            ),
+            models.Index(fields=["locked_at"], condition=models.Q(status="running"), name="chatjob_running_idx"),
+        ]
+
+    def __str__(self):
+        return f"Job for chat {self.chat_id} ({self.status})"
+
+
+ArchivedChat = namedtuple("ArchivedChat", ["id", "timestamp", "message", "response"])
+
+
+class ChatArchiveSegment(models.Model):
+    """
+    A run of old ChatMessage rows for one user, packed into a single
+    zlib-compressed JSON payload by ``manage.py archive_chat_history`` so the
+    hot chat table stays small.
+    """
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="chat_archive_segments")
+    first_timestamp = models.DateTimeField()
+    last_timestamp = models.DateTimeField()
+    message_count = models.IntegerField()
+    payload = models.BinaryField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["user", "last_timestamp"], name="chat_archive_user_ts_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.user.username} archive {self.first_timestamp:%Y-%m-%d}..{self.last_timestamp:%Y-%m-%d} ({self.message_count})"
+
+    @classmethod
+    def pack(cls, user_id, rows):
+        """Build an unsaved segment from ``(id, timestamp, message, response)`` rows in time order."""
+        data = [[pk, timestamp.isoformat(), message, response] for pk, timestamp, message, response in rows]
+        return cls(
+            user_id=user_id,
+            first_timestamp=rows[0][1],
+            last_timestamp=rows[-1][1],
+            message_count=len(rows),
+            payload=zlib.compress(json.dumps(data, ensure_ascii=False).encode("utf-8"), 9),
+        )
+
+    def messages(self):
+        data = json.loads(zlib.decompress(bytes(self.payload)).decode("utf-8"))
+        return [
+            ArchivedChat(pk, datetime.fromisoformat(timestamp), message, response)
+            for pk, timestamp, message, response in data
+        ]
+
+
+# ---------------- localized catalog (served from memory by utils/catalog.py) ----------------
+
 class WellnessTip(models.Model):
     title = models.CharField(max_length=100)
     content = models.TextField()
-    language = models.CharField(max_length=20, default="English")
+    language = models.CharField(max_length=20, choices=settings.LANGUAGES, default="en")
 
     def __str__(self):
         return self.title
+
+
+class ChatResponse(models.Model):
+    """Keyword-fallback chat reply for one intent (see utils/intent_matcher.py) in one language."""
+    intent = models.CharField(max_length=50)
+    language = models.CharField(max_length=20, choices=settings.LANGUAGES, default="en")
+    text = models.TextField()
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["intent", "language"], name="chat_response_key"),
+        ]
+
+    def __str__(self):
+        return f"{self.intent} ({self.language})"
+
+
+class WellnessSummary(models.Model):
+    """
+    Running per-user totals behind the dashboard wellness score.
+
+    Updated incrementally whenever a mood entry or screening is created, so the
+    dashboard reads a single row instead of scanning the user's history. Edits
+    and deletes (admin, shell, queryset.delete()) rebuild it once the
+    transaction commits. Rebuild with ``manage.py rebuild_wellness_summaries``
+    after bulk_create/update(), which send no signals.
+    """
+    NEUTRAL_MOOD = 5
+    NEUTRAL_SCREENING_FACTOR = 5
+
+    user = models.OneToOneField(User, on_delete=models.CASCADE, related_name="wellness_summary")
+    mood_sum = models.IntegerField(default=0)
+    mood_count = models.IntegerField(default=0)
+    # {"PHQ9": {"score": 7, "severity": "Mild", "date_taken": "..."}, ...}
+    latest_screenings = models.JSONField(default=dict, blank=True)
+    last_screening_score = models.IntegerField(blank=True, null=True)
+    wellness_score = models.FloatField(default=5.0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.user.username} - wellness {self.wellness_score}"
+
+    @property
+    def avg_mood(self):
+        if not self.mood_count:
+            return self.NEUTRAL_MOOD
+        return self.mood_sum / self.mood_count
+
+    def refresh_wellness(self):
+        if self.last_screening_score is None:
+            screening_factor = self.NEUTRAL_SCREENING_FACTOR
+        else:
+            # Inverse scaling: higher screening score = lower wellness
+            screening_factor = max(0, 10 - (self.last_screening_score / 3))
+        self.wellness_score = round((self.avg_mood * 0.6) + (screening_factor * 0.4), 1)
+
+    def _apply_screening(self, screening):
+        self.latest_screenings[screening.screening_type] = {
+            "score": screening.score,
+            "severity": screening.severity,
+            "date_taken": screening.date_taken.isoformat(),
+        }
+        self.last_screening_score = screening.score
+
+    @classmethod
+    def for_user(cls, user):
+        """Return the user's summary, building it from history on first access."""
+        summary = cls.objects.filter(user=user).first()
+        if summary is None:
+            summary = cls.rebuild(user)
+        return summary
+
+    @classmethod
+    def record_mood(cls, user, score):
+        with transaction.atomic():
+            summary, created = cls.objects.select_for_update().get_or_create(user=user)
+            if created:
+                # first summary for an existing user: count the entry just saved too
+                return cls.rebuild(user)
+            summary.mood_sum += score
+            summary.mood_count += 1
+            summary.refresh_wellness()
+            summary.save()
+        return summary
+
+    @classmethod
+    def record_screening(cls, screening):
+        with transaction.atomic():
+            summary, created = cls.objects.select_for_update().get_or_create(user=screening.user)
+            if created:
+                return cls.rebuild(screening.user)
+            summary._apply_screening(screening)
+            summary.refresh_wellness()
+            summary.save()
+        return summary
+
+    @classmethod
+    def schedule_rebuild(cls, user_id):
+        """
+        Rebuild ``user_id``'s summary after the current transaction commits (at
+        once outside one); repeated calls in one transaction rebuild once.
+        """
+        def run():
+            user = User.objects.filter(pk=user_id).first()
+            if user is not None:
+                cls.rebuild(user)
+        on_commit_once(f"wellness-rebuild:{user_id}", run)
+
+    @classmethod
+    def rebuild(cls, user):
+        """Recompute the summary for ``user`` from the raw mood/screening tables."""
+        totals = MoodEntry.objects.filter(user=user).aggregate(
+            mood_sum=Sum("score"), mood_count=Count("id")
+        )
+        summary, _ = cls.objects.get_or_create(user=user)
+        summary.mood_sum = totals["mood_sum"] or 0
+        summary.mood_count = totals["mood_count"]
+        summary.latest_screenings = {}
+        summary.last_screening_score = None
+
+        screenings = Screening.objects.filter(user=user).order_by("-date_taken")
+        for screening_type, _label in Screening.SCREENING_TYPES:
+            latest = screenings.filter(screening_type=screening_type).first()
+            if latest:
+                summary._apply_screening(latest)
+        last = screenings.first()
+        if last:
+            summary.last_screening_score = last.score
+
+        summary.refresh_wellness()
+        summary.save()
+        return summary
+
+
+# ---------------- population rollups (filled by `manage.py update_rollups`) ----------------
+
+class DailyScreeningRollup(models.Model):
+    day = models.DateField()
+    screening_type = models.CharField(max_length=10, choices=Screening.SCREENING_TYPES)
+    severity = models.CharField(max_length=50)
+    count = models.IntegerField(default=0)
+    score_sum = models.BigIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["day", "screening_type", "severity"], name="screening_rollup_key"),
+        ]
+
+    @property
+    def mean_score(self):
+        return self.score_sum / self.count if self.count else None
+
+    def __str__(self):
+        return f"{self.day} {self.screening_type} {self.severity}: {self.count}"
+
+
+class DailyMoodRollup(models.Model):
+    day = models.DateField()
+    mood = models.CharField(max_length=10, choices=MoodEntry.MOOD_CHOICES)
+    count = models.IntegerField(default=0)
+    score_sum = models.BigIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["day", "mood"], name="mood_rollup_key"),
+        ]
+
+    @property
+    def mean_score(self):
+        return self.score_sum / self.count if self.count else None
+
+    def __str__(self):
+        return f"{self.day} {self.mood}: {self.count}"
+
+
+class RollupWatermark(models.Model):
+    """
+    Highest source primary key already folded into a rollup table, and the
+    highest one seen at ``seen_at``, which the next run folds up to once it
+    has settled (see utils/rollups.py).
+    """
+    name = models.CharField(max_length=50, unique=True)
+    last_pk = models.BigIntegerField(default=0)
+    seen_pk = models.BigIntegerField(default=0)
+    seen_at = models.DateTimeField(blank=True, null=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.name} @ {self.last_pk}"
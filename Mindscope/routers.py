@@ -0,0 +1,76 @@
+"""
+Read-replica routing.
+
+Views wrapped in ``replica_reads`` send their ORM reads to the replica alias
+(``settings.DATABASE_REPLICA["ALIAS"]``) when it is configured; everything
+else, and every write, goes to ``default``. A session that has just written
+through one of those views is pinned to the primary for ``PIN_SECONDS`` so a
+redirect-after-POST never shows stale replica data.
+"""
+import contextvars
+import time
+from functools import wraps
+
+from django.conf import settings
+
+DEFAULTS = {
+    "ALIAS": "replica",
+    "PIN_SECONDS": 5,
+}
+
+PIN_SESSION_KEY = "_primary_pinned_until"
+_read_alias = contextvars.ContextVar("mindscope_read_alias", default=None)
+
+
+def replica_settings():
+    return {**DEFAULTS, **getattr(settings, "DATABASE_REPLICA", {})}
+
+
+def replica_alias():
+    """The replica alias if one is configured, else None."""
+    alias = replica_settings()["ALIAS"]
+    return alias if alias in settings.DATABASES else None
+
+
+def replica_reads(view):
+    """Route the view's GET/HEAD reads to the replica; pin the session after writes."""
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        alias = replica_alias()
+        if alias is None:
+            return view(request, *args, **kwargs)
+
+        session = getattr(request, "session", None)
+        if request.method not in ("GET", "HEAD"):
+            response = view(request, *args, **kwargs)
+            if session is not None:
+                session[PIN_SESSION_KEY] = time.time() + replica_settings()["PIN_SECONDS"]
+            return response
+
+        if session is not None and session.get(PIN_SESSION_KEY, 0) > time.time():
+            return view(request, *args, **kwargs)
+        token = _read_alias.set(alias)
+        try:
+            return view(request, *args, **kwargs)
+        finally:
+            _read_alias.reset(token)
+    return wrapper
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        # the DatabaseCache table is read from the primary; a lagging copy would serve stale entries
+        if model._meta.app_label == "django_cache":
+            return None
+        return _read_alias.get()
+
+    def db_for_write(self, model, **hints):
+        return "default"
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # the replica mirrors the primary, so objects from either may be related
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # the replica receives schema changes through replication
+        return db != replica_settings()["ALIAS"]
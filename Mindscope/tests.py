@@ -1,3 +1,1056 @@
-from django.test import TestCase
+import asyncio
+import gzip
+import json
+import os
+import socket
+import sys
+import threading
+import time
+from datetime import timedelta
+from unittest import mock
 
-# Create your tests here.
+from django.conf import settings
+from django.core.cache import caches
+from django.db import connection
+from django.http import HttpResponse
+from django.shortcuts import render
+from django.contrib.auth.models import User
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from .models import (
+    ChatArchiveSegment, ChatJob, ChatMessage, DailyMoodRollup, DailyScreeningRollup, MoodEntry, RollupWatermark, Screening, WellnessSummary,
+)
+from .utils import (
+    async_chat, benchmarking, catalog, chat_engine, chat_queue, conversation, crisis, estimates, export, fulltext,
+    intent_matcher, local_worker, metrics, mood_analytics, page_cache, response_cache, retention, rollups,
+    screening_import,
+)
+from .utils.batcher import QueueFull, RequestBatcher
+from .utils.benchmarking import HuggingFaceStub
+from .utils.inference_client import get_inference_client, reset_inference_client
+from .utils.local_ai import LocalAIChat
+from .utils.pagination import InvalidCursor, decode_cursor, encode_cursor
+from .utils.screening_engine import get_instrument
+from .utils.shared_cache import shared_cache
+from .routers import PIN_SESSION_KEY, ReplicaRouter, replica_reads
+from .views import CHAT_PAGE_SIZE
+
+
+class WellnessSummaryTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user("alice", password="pw")
+
+    def summary(self):
+        return WellnessSummary.objects.get(user=self.user)
+
+    def test_create_is_counted(self):
+        MoodEntry.objects.create(user=self.user, mood="😊")
+        MoodEntry.objects.create(user=self.user, mood="😢")
+        self.assertEqual((self.summary().mood_sum, self.summary().mood_count), (11, 2))
+
+    def test_edit_rebuilds(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            entry = MoodEntry.objects.create(user=self.user, mood="😊")
+            entry.mood = "😡"
+            entry.save()
+        self.assertEqual((self.summary().mood_sum, self.summary().mood_count), (2, 1))
+
+    def test_delete_rebuilds(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            keep = MoodEntry.objects.create(user=self.user, mood="😌")
+            MoodEntry.objects.create(user=self.user, mood="😊").delete()
+            Screening.objects.create(user=self.user, screening_type="PHQ9", score=20, severity="Severe")
+            Screening.objects.filter(user=self.user).delete()
+        summary = self.summary()
+        self.assertEqual((summary.mood_sum, summary.mood_count), (keep.score, 1))
+        self.assertIsNone(summary.last_screening_score)
+        self.assertEqual(summary.latest_screenings, {})
+
+    def test_bulk_delete_rebuilds_once_per_user(self):
+        MoodEntry.objects.bulk_create(MoodEntry(user=self.user, mood="😊", score=8) for _ in range(200))
+        with CaptureQueriesContext(connection) as queries:
+            with mock.patch.object(WellnessSummary, "rebuild") as rebuild:
+                with self.captureOnCommitCallbacks(execute=True) as callbacks:
+                    MoodEntry.objects.filter(user=self.user).delete()
+        rebuild.assert_called_once()
+        self.assertEqual(len(callbacks), 2)  # one summary rebuild, one analytics invalidation
+        # the fast path: rows are deleted in bulk, not loaded one by one first
+        self.assertFalse(any('"Mindscope_moodentry"."notes"' in q["sql"] for q in queries))
+
+    def test_deleting_the_user_does_not_recreate_the_summary(self):
+        MoodEntry.objects.create(user=self.user, mood="😊")
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.delete()
+        self.assertFalse(WellnessSummary.objects.exists())
+
+
+class MoodPagesTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user("alice", password="pw")
+        self.client.force_login(self.user)
+        MoodEntry.objects.create(user=self.user, mood="😊", influencers="Work", notes="good day")
+
+    def test_pages_render_the_lazy_chart(self):
+        chart_url = reverse("mood_history_api")
+        for name in ("dashboard", "mood_tracker"):
+            response = self.client.get(reverse(name))
+            self.assertEqual(response.status_code, 200, name)
+            self.assertContains(response, f'data-url="{chart_url}"')
+            self.assertContains(response, "😊")
+
+    def test_chart_endpoint(self):
+        points = self.client.get(reverse("mood_history_api")).json()["points"]
+        self.assertEqual([(point["avg"], point["count"]) for point in points], [(8, 1)])
+
+
+class AsyncChatBreakerTests(TestCase):
+    """stream_intelligent_response against a local stub of the inference API."""
+
+    def setUp(self):
+        # a cached reply would skip the backends under test
+        response_cache._cache().clear()
+
+    def stub(self, **kwargs):
+        stub = HuggingFaceStub(**kwargs)
+        url = stub.__enter__()
+        self.addCleanup(stub.__exit__)
+        backends = {name: {"url": url} for name in ("hf_large", "hf_small")}
+        override = override_settings(INFERENCE_BACKENDS={**settings.INFERENCE_BACKENDS, **backends})
+        override.enable()
+        self.addCleanup(override.disable)
+        reset_inference_client()
+        self.addCleanup(reset_inference_client)
+        return stub
+
+    def breaker(self, name, half_open=False):
+        breaker = get_inference_client().backend(name).breaker
+        if half_open:
+            breaker.opened_at = breaker.clock() - breaker.cooldown
+        return breaker
+
+    def collect(self, message="hello"):
+        async def run():
+            return [chunk async for chunk in async_chat.stream_intelligent_response(message)]
+        return "".join(asyncio.run(run()))
+
+    @mock.patch.dict(os.environ, {"HUGGINGFACE_API_KEY": ""})
+    def test_server_error_trips_the_breaker(self):
+        self.stub(latency_ms=0, status=503)
+        small = self.breaker("hf_small")
+        with self.assertLogs("Mindscope.utils.async_chat", "WARNING"):
+            for _ in range(small.failure_threshold):
+                self.assertTrue(self.collect())  # keyword fallback
+        self.assertEqual(small.state, "open")
+
+    @mock.patch.dict(os.environ, {"HUGGINGFACE_API_KEY": ""})
+    def test_reply_closes_a_half_open_breaker(self):
+        self.stub(latency_ms=0)
+        small = self.breaker("hf_small", half_open=True)
+        self.assertIn("here to listen", self.collect())
+        self.assertEqual(small.state, "closed")
+
+    @mock.patch.dict(os.environ, {"HUGGINGFACE_API_KEY": ""})
+    def test_cancelled_trial_is_released(self):
+        self.stub(latency_ms=500)
+        small = self.breaker("hf_small", half_open=True)
+
+        async def run():
+            stream = async_chat.stream_intelligent_response("hello")
+            task = asyncio.ensure_future(stream.__anext__())
+            await asyncio.sleep(0.1)
+            task.cancel()
+            with self.assertRaises(asyncio.CancelledError):
+                await task
+            await stream.aclose()
+        asyncio.run(run())
+        self.assertEqual(small.state, "half_open")
+        self.assertTrue(small.allow())
+
+    @mock.patch.dict(os.environ, {"HUGGINGFACE_API_KEY": "test"})
+    def test_streamed_reply_is_cached(self):
+        stub = self.stub(latency_ms=0)
+        first = self.collect()
+        self.assertIn("here to listen", first)
+        self.assertEqual(self.collect(), first.strip())
+        self.assertEqual(len(stub.calls), 1)
+
+    @mock.patch.dict(os.environ, {"HUGGINGFACE_API_KEY": ""})
+    def test_local_worker_answers_before_the_keyword_fallback(self):
+        self.stub(latency_ms=0, status=503)
+        with self.assertLogs("Mindscope.utils.async_chat", "WARNING"):
+            with mock.patch("Mindscope.utils.local_worker.generate", return_value="from the local model") as generate:
+                self.assertEqual(self.collect(), "from the local model")
+        generate.assert_called_once_with("hello", False)
+
+    def test_client_is_shared_per_event_loop(self):
+        async def clients():
+            return async_chat.get_async_client(), async_chat.get_async_client()
+        first, again = asyncio.run(clients())
+        self.assertIs(first, again)
+        self.assertIsNot(asyncio.run(clients())[0], first)
+
+    @mock.patch.dict(os.environ, {"HUGGINGFACE_API_KEY": "test"})
+    def test_disconnected_stream_releases_the_trial(self):
+        self.stub(latency_ms=0)
+        large = self.breaker("hf_large", half_open=True)
+
+        async def run():
+            stream = async_chat.stream_intelligent_response("hello")
+            first = await stream.__anext__()
+            await stream.aclose()  # what the server does when the SSE client goes away
+            return first
+        self.assertEqual(asyncio.run(run()), "That ")
+        self.assertTrue(large.allow())
+
+
+class IntentMatcherTests(SimpleTestCase):
+    def test_classify(self):
+        cases = {
+            "I’m feeling anxious": ("anxious", 1.0),  # quick topic button, curly apostrophe
+            "I am so depressed": ("sad", 0.9),  # stem
+            "thanks!": ("thanks", 0.9),
+            # every hit counts toward confidence; the lowest priority number wins
+            "Hi, I can't sleep and I worry": ("greeting", 0.3),
+            "my work is too much": ("work", 0.45),
+        }
+        for message, expected in cases.items():
+            with self.subTest(message=message):
+                self.assertEqual(tuple(intent_matcher.classify(message)), expected)
+
+    def test_whole_words_only(self):
+        for message in ("blueberry", "tiredness", "", None):
+            with self.subTest(message=message):
+                self.assertEqual(intent_matcher.classify(message), intent_matcher.DEFAULT_INTENT)
+
+
+class ConversationHistoryTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user("alice", password="pw")
+
+    def test_history_lives_in_the_shared_cache(self):
+        ChatMessage.objects.create(user=self.user, message="hi", response="hello")
+        self.assertEqual(len(conversation.get_history(self.user)), 2)
+        conversation.append_turn(self.user, "how are you", "fine")
+        # another process reads the same entry rather than rebuilding its own copy
+        cached = shared_cache().get(conversation._cache_key(self.user.pk))
+        self.assertEqual([turn["content"] for turn in cached], ["hi", "hello", "how are you", "fine"])
+
+    def test_token_counts_need_no_download_by_default(self):
+        self.assertIsNone(conversation.context_settings()["TOKENIZER"])
+        self.assertEqual(conversation.count_tokens("I can't sleep."), 6)
+
+
+class ScreeningEngineTests(TestCase):
+    def test_severity_band_edges(self):
+        cases = {
+            "PHQ9": [(0, "Minimal"), (4, "Minimal"), (5, "Mild"), (14, "Moderate"), (19, "Moderately Severe"), (27, "Severe")],
+            "GAD7": [(9, "Mild Anxiety"), (10, "Moderate Anxiety"), (21, "Severe Anxiety")],
+            "PSS10": [(13, "Low"), (14, "Moderate"), (27, "High"), (40, "High")],
+        }
+        for code, bands in cases.items():
+            instrument = get_instrument(code.lower())
+            for score, severity in bands:
+                with self.subTest(code=code, score=score):
+                    self.assertEqual(instrument.severity(score), severity)
+
+    def test_scoring(self):
+        pss = get_instrument("PSS10")
+        self.assertEqual(pss.max_score, 40)
+        # items 4, 5, 7 and 8 are reverse scored
+        self.assertEqual(pss.score([0] * 10), 16)
+        self.assertEqual(pss.score([4] * 10), 24)
+        phq = get_instrument("PHQ9")
+        self.assertEqual(phq.score_form({"q1": "3", "q2": "9", "q3": "-1", "q4": "x", "q5": ""}), 6)
+        with self.assertRaises(KeyError):
+            get_instrument("BDI")
+
+    def test_form_post_stores_the_band(self):
+        user = User.objects.create_user("alice", password="pw")
+        self.client.force_login(user)
+        response = self.client.post(reverse("phq9"), {f"q{i}": 2 for i in range(1, 10)})
+        self.assertEqual((response.context["score"], response.context["severity"]), (18, "Moderately Severe"))
+        self.assertEqual(
+            list(Screening.objects.values_list("screening_type", "score", "severity")), [("PHQ9", 18, "Moderately Severe")],
+        )
+
+
+class ScreeningImportTests(TestCase):
+    def test_malformed_lines_are_reported_not_fatal(self):
+        User.objects.create_user("alice", password="pw")
+        lines = [
+            '[1, 2]',
+            '"PHQ9"',
+            '{"username": ["alice"], "screening_type": "PHQ9", "score": 3}',
+            '{"username": "alice", "screening_type": 7, "score": 3}',
+            '{"username": "alice", "screening_type": "GAD7", "answers": 5}',
+            '{"username": "alice", "screening_type": "GAD7", "answers": {"q1": 1}}',
+            '{"username": "alice", "screening_type": "GAD7", "answers": [1, 1, 1, 1, 1, 1, 1]}',
+        ]
+        stats = screening_import.import_screenings(screening_import.iter_records(lines, "jsonl"))
+        self.assertEqual((stats["imported"], stats["invalid"]), (1, 6))
+        self.assertEqual([error["line"] for error in stats["errors"]], [1, 2, 3, 4, 5, 6])
+        self.assertEqual(Screening.objects.get().score, 7)
+
+
+class ChatArchivePagingTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user("alice", password="pw")
+        self.client.force_login(self.user)
+        start = timezone.now() - timedelta(days=365)
+        rows = [(i, start + timedelta(minutes=i), f"message {i}", f"reply {i}") for i in range(75)]
+        self.old = ChatArchiveSegment.pack(self.user.pk, rows[:5])
+        self.old.save()
+        self.new = ChatArchiveSegment.pack(self.user.pk, rows[5:])
+        self.new.save()
+
+    def test_pages_walk_back_through_segments(self):
+        pages, older = [], (self.new.pk, None)
+        while older is not None:
+            chats, older = retention.archived_page(self.user, *older, page_size=30)
+            pages.append([chat.id for chat in chats])
+        self.assertEqual([len(page) for page in pages], [30, 30, 10, 5])
+        self.assertEqual(pages[0], list(range(45, 75)))
+        self.assertEqual(pages[-1], list(range(5)))
+
+    def test_chat_view_renders_one_page_of_a_segment(self):
+        response = self.client.get(reverse("chat"), {"archive": self.new.pk})
+        self.assertEqual(len(response.context["chats"]), CHAT_PAGE_SIZE)
+        self.assertContains(response, f"?archive={self.new.pk}&amp;before={70 - CHAT_PAGE_SIZE}")
+
+
+class KeysetPaginationTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user("alice", password="pw")
+        self.client.force_login(self.user)
+        now = timezone.now()
+        chats = [ChatMessage.objects.create(user=self.user, message=f"message {i}") for i in range(7)]
+        # three rows share a timestamp, so the cursor has to break ties on pk
+        for i, chat in enumerate(chats):
+            ChatMessage.objects.filter(pk=chat.pk).update(timestamp=now - timedelta(minutes=min(i, 3)))
+        ChatMessage.objects.create(user=User.objects.create_user("bob", password="pw"), message="not yours")
+        self.expected = [chat.pk for chat in chats[:3]] + [chat.pk for chat in reversed(chats[3:])]
+
+    def test_cursor_round_trip(self):
+        stamp = timezone.now()
+        self.assertEqual(decode_cursor(encode_cursor(stamp, 42)), (stamp, 42))
+        for bad in ("", "not a cursor", encode_cursor(stamp, 1)[:-3]):
+            with self.assertRaises(InvalidCursor):
+                decode_cursor(bad)
+
+    def test_pages_cover_every_row_once_newest_first(self):
+        ids, cursor, pages = [], None, 0
+        while True:
+            params = {"page_size": 2, **({"cursor": cursor} if cursor else {})}
+            body = self.client.get(reverse("chat_history_api"), params).json()
+            ids += [row["id"] for row in body["results"]]
+            pages += 1
+            cursor = body["next_cursor"]
+            if cursor is None:
+                break
+        self.assertEqual(pages, 4)
+        self.assertEqual(ids, self.expected)
+
+    def test_bad_cursor_is_rejected(self):
+        response = self.client.get(reverse("chat_history_api"), {"cursor": "garbage"})
+        self.assertEqual(response.status_code, 400)
+
+
+class FulltextSearchTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user("alice", password="pw")
+        self.client.force_login(self.user)
+        ChatMessage.objects.create(user=self.user, message="I keep sleeping badly <b>again</b>", response="Try a routine.")
+        ChatMessage.objects.create(user=self.user, message="Work was fine", response="Glad to hear it.")
+        MoodEntry.objects.create(user=self.user, mood="😴", notes="Slept for four hours")
+        ChatMessage.objects.create(user=User.objects.create_user("bob", password="pw"), message="sleep is hard")
+
+    def search(self, **params):
+        response = self.client.get(reverse("search_api"), params)
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_fts5_index_is_used_on_sqlite(self):
+        self.assertEqual(fulltext.backend(), "fts5")
+
+    def test_stemmed_match_across_kinds_for_this_user_only(self):
+        results = self.search(q="sleep")["results"]
+        self.assertEqual(sorted(hit["type"] for hit in results), ["chat"])
+        self.assertIn("<mark>sleeping</mark>", results[0]["snippet"])
+        self.assertIn("&lt;b&gt;again&lt;/b&gt;", results[0]["snippet"])
+        self.assertEqual([hit["type"] for hit in self.search(q="hours", **{"in": "mood"})["results"]], ["mood"])
+        self.assertEqual(self.search(q="hours", **{"in": "chat"})["results"], [])
+
+    def test_pages(self):
+        for i in range(3):
+            ChatMessage.objects.create(user=self.user, message=f"routine number {i}")
+        first = self.search(q="routine", page_size=3)
+        self.assertEqual((len(first["results"]), first["next_page"]), (3, 2))
+        second = self.search(q="routine", page_size=3, page=2)
+        self.assertEqual((len(second["results"]), second["next_page"]), (1, None))
+        seen = {hit["id"] for hit in first["results"] + second["results"]}
+        self.assertEqual(len(seen), 4)
+
+    def test_bad_parameters(self):
+        self.assertEqual(self.client.get(reverse("search_api"), {"q": "x", "in": "files"}).status_code, 400)
+        self.assertEqual(self.client.get(reverse("search_api"), {"q": "x", "page": 0}).status_code, 400)
+        self.assertEqual(self.search(q="  ")["results"], [])
+
+    def test_plain_fallback(self):
+        with mock.patch.object(fulltext, "backend", return_value=None):
+            hits, has_next = fulltext.search(self.user, "four", page_size=5)
+        self.assertEqual([(hit.kind, has_next) for hit in hits], [("mood", False)])
+        self.assertIn("<mark>four</mark>", hits[0].snippet)
+
+
+class MoodAnalyticsCacheTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user("alice", password="pw")
+
+    def test_deletes_and_bulk_writes_invalidate(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            keep = MoodEntry.objects.create(user=self.user, mood="😊")
+            MoodEntry.objects.create(user=self.user, mood="😢")
+        self.assertEqual(mood_analytics.get_analytics(self.user)["entries"], 2)
+        # cached in the shared cache, where other processes read it
+        self.assertIsNotNone(shared_cache().get(MoodEntry.analytics_cache_key(self.user.pk)))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            MoodEntry.objects.exclude(pk=keep.pk).delete()
+        self.assertEqual(mood_analytics.get_analytics(self.user)["entries"], 1)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            MoodEntry.objects.bulk_create([MoodEntry(user=self.user, mood="😌", score=7)])
+            MoodEntry.invalidate_analytics(self.user.pk)
+        self.assertEqual(mood_analytics.get_analytics(self.user)["entries"], 2)
+
+    def test_streak_ends_at_midnight_without_a_write(self):
+        MoodEntry.objects.create(user=self.user, mood="😊")
+        today = timezone.localdate()
+        self.assertEqual(mood_analytics.get_analytics(self.user)["streaks"]["current_logging_days"], 1)
+        with mock.patch.object(mood_analytics.timezone, "localdate", return_value=today + timedelta(days=1)):
+            self.assertEqual(mood_analytics.get_analytics(self.user)["streaks"]["current_logging_days"], 0)
+
+
+class RollupTests(TestCase):
+    def test_folds_only_rows_that_have_settled(self):
+        user = User.objects.create_user("alice", password="pw")
+        MoodEntry.objects.create(user=user, mood="😊")
+        MoodEntry.objects.create(user=user, mood="😢")
+        # first run only records the high mark: a lower pk might still be uncommitted
+        self.assertEqual(rollups.update_rollup("mood_daily"), 0)
+
+        RollupWatermark.objects.filter(name="mood_daily").update(seen_at=timezone.now() - timedelta(minutes=10))
+        MoodEntry.objects.create(user=user, mood="😌")
+        self.assertEqual(rollups.update_rollup("mood_daily"), 2)
+        self.assertEqual(sum(DailyMoodRollup.objects.values_list("count", flat=True)), 2)
+
+        self.assertEqual(rollups.update_rollup("mood_daily", settle_seconds=0), 1)
+        self.assertEqual(sum(DailyMoodRollup.objects.values_list("count", flat=True)), 3)
+
+    def test_rebuild_inside_the_settle_window_refolds_what_was_folded(self):
+        user = User.objects.create_user("alice", password="pw")
+        MoodEntry.objects.create(user=user, mood="😊")
+        rollups.update_rollup("mood_daily", settle_seconds=0)
+        MoodEntry.objects.create(user=user, mood="😢")  # not settled yet
+        self.assertEqual(rollups.update_rollup("mood_daily", rebuild=True), 1)
+        self.assertEqual(sum(DailyMoodRollup.objects.values_list("count", flat=True)), 1)
+
+    def test_rescore_moves_rollup_severities(self):
+        user = User.objects.create_user("alice", password="pw")
+        Screening.objects.create(user=user, screening_type="GAD7", score=4, severity="Severe")
+        rollups.update_rollup("screening_daily", settle_seconds=0)
+        screening_import.rescore_screenings()
+        self.assertEqual(
+            list(DailyScreeningRollup.objects.values_list("severity", "count")),
+            [(Screening.objects.get().severity, 1)],
+        )
+        self.assertNotEqual(Screening.objects.get().severity, "Severe")
+
+
+class BenchmarkingTests(SimpleTestCase):
+    def test_p95_is_nearest_rank(self):
+        self.assertEqual(benchmarking.percentile(list(range(1, 21)), 0.95), 19)
+        self.assertEqual(benchmarking.percentile([5], 0.95), 5)
+        summary = benchmarking.latency_summary([11.67, 15.37, 19.0])
+        self.assertGreaterEqual(summary["p95_ms"], summary["p50_ms"])
+        self.assertEqual(summary["p95_ms"], 19.0)
+
+
+class ChatPageTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user("alice", password="pw")
+        self.client.force_login(self.user)
+
+    def test_inline_replies_stream(self):
+        response = self.client.get(reverse("chat"))
+        self.assertContains(response, f'data-stream-url="{reverse("chat_stream")}"')
+
+    @override_settings(CHAT_QUEUE={"ENABLED": True})
+    def test_queued_replies_are_polled_instead(self):
+        response = self.client.get(reverse("chat"))
+        self.assertNotContains(response, "data-stream-url=")
+
+
+class ChatStreamViewTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user("alice", password="pw")
+        self.calls = []
+
+    async def fake_stream(self, message, history_messages=None, urgent=False):
+        self.calls.append((message, urgent))
+        for chunk in ("Try a ", "short walk."):
+            yield chunk
+
+    async def post(self, message):
+        await self.async_client.aforce_login(self.user)
+        with mock.patch.object(async_chat, "stream_intelligent_response", self.fake_stream):
+            response = await self.async_client.post(reverse("chat_stream"), {"message": message})
+            body = b"".join([chunk async for chunk in response.streaming_content]).decode()
+        return response, [event for event in body.split("\n\n") if event]
+
+    async def test_reply_is_streamed_then_saved(self):
+        response, events = await self.post("I feel tired")
+        self.assertEqual(response["Content-Type"], "text/event-stream")
+        self.assertEqual(events[:2], ['data: {"token": "Try a "}', 'data: {"token": "short walk."}'])
+        chat = await ChatMessage.objects.aget(user=self.user)
+        self.assertEqual(chat.response, "Try a short walk.")
+        self.assertTrue(events[2].startswith(f'event: done\ndata: {{"id": {chat.pk},'))
+        self.assertEqual(self.calls, [("I feel tired", False)])
+
+    async def test_crisis_message_takes_the_urgent_lane(self):
+        await self.post("I want to kill myself")
+        self.assertEqual(self.calls, [("I want to kill myself", True)])
+
+    async def test_rejects_get_and_empty_messages(self):
+        await self.async_client.aforce_login(self.user)
+        self.assertEqual((await self.async_client.get(reverse("chat_stream"))).status_code, 405)
+        self.assertEqual((await self.async_client.post(reverse("chat_stream"), {"message": " "})).status_code, 400)
+        self.assertFalse(await ChatMessage.objects.aexists())
+
+
+@override_settings(CHAT_QUEUE={"MAX_ATTEMPTS": 3, "RETRY_DELAY": 5, "LEASE_SECONDS": 120, "UNCLAIMED_WARNING": 30})
+class ChatQueueTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user("alice", password="pw")
+
+    def enqueue(self, message="I feel anxious", **fields):
+        job = chat_queue.enqueue(ChatMessage.objects.create(user=self.user, message=message))
+        if fields:
+            ChatJob.objects.filter(pk=job.pk).update(**fields)
+            job.refresh_from_db()
+        return job
+
+    def generate(self, reply):
+        side_effect = reply if isinstance(reply, Exception) else None
+        return mock.patch(
+            "Mindscope.utils.chat_engine.generate_intelligent_response", return_value=reply, side_effect=side_effect,
+        )
+
+    def test_claim_takes_each_job_once(self):
+        first, second = self.enqueue(), self.enqueue()
+        claimed = [chat_queue.claim("a"), chat_queue.claim("b"), chat_queue.claim("c")]
+        self.assertEqual([job.pk if job else None for job in claimed], [first.pk, second.pk, None])
+        self.assertEqual((claimed[0].status, claimed[0].locked_by, claimed[0].attempts), (ChatJob.RUNNING, "a", 1))
+
+    def test_claim_race_loser_moves_on(self):
+        taken, free = self.enqueue(), self.enqueue()
+        # another worker takes the head of the queue between our read and our conditional UPDATE
+        stale_head = ChatJob.objects.filter(pk__in=[taken.pk, free.pk]).order_by("id")
+        ChatJob.objects.filter(pk=taken.pk).update(status=ChatJob.RUNNING, locked_by="other")
+        with mock.patch.object(chat_queue, "_claimable", return_value=stale_head):
+            job = chat_queue.claim("a")
+        self.assertEqual(job.pk, free.pk)
+        self.assertEqual(ChatJob.objects.get(pk=taken.pk).locked_by, "other")
+
+    def test_failed_attempts_back_off(self):
+        job = self.enqueue()
+        delays = []
+        for _ in range(2):
+            ChatJob.objects.filter(pk=job.pk).update(available_at=timezone.now())
+            before = timezone.now()
+            with self.generate(RuntimeError("backend down")):
+                chat_queue.process(chat_queue.claim("a"), "a")
+            job.refresh_from_db()
+            self.assertEqual(job.status, ChatJob.QUEUED)
+            self.assertIsNone(chat_queue.claim("a"))  # not ready until the backoff passes
+            delays.append(round((job.available_at - before).total_seconds()))
+        self.assertEqual(delays, [5, 10])
+        self.assertEqual(job.last_error, "RuntimeError: backend down")
+
+    def test_last_attempt_is_dead_lettered_with_fallback(self):
+        job = self.enqueue(attempts=2)
+        with self.generate(None):
+            chat_queue.process(chat_queue.claim("a"), "a")
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), (ChatJob.DEAD, 3))
+        self.assertIn("GenerationFailed", job.last_error)
+        self.assertTrue(ChatMessage.objects.get(pk=job.chat_id).response)
+
+    def test_success_stores_reply(self):
+        job = self.enqueue()
+        with self.generate("Try a short walk."):
+            chat_queue.process(chat_queue.claim("a"), "a")
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.last_error), (ChatJob.DONE, ""))
+        self.assertEqual(ChatMessage.objects.get(pk=job.chat_id).response, "Try a short walk.")
+
+    def test_expired_lease_is_requeued_and_late_result_dropped(self):
+        job = self.enqueue()
+        claimed = chat_queue.claim("dead-worker")
+        self.assertEqual(chat_queue.requeue_expired(), 0)
+        ChatJob.objects.filter(pk=job.pk).update(locked_at=timezone.now() - timedelta(seconds=121))
+        self.assertEqual(chat_queue.requeue_expired(), 1)
+
+        self.assertEqual(chat_queue.claim("b").pk, job.pk)
+        with self.generate("late reply"):
+            chat_queue.process(claimed, "dead-worker")
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.locked_by, job.attempts), (ChatJob.RUNNING, "b", 2))
+        self.assertIsNone(ChatMessage.objects.get(pk=job.chat_id).response)
+
+    def test_expired_lease_on_last_attempt_is_dead_lettered(self):
+        job = self.enqueue(attempts=2)
+        requeued = self.enqueue()
+        for _ in range(2):
+            chat_queue.claim("dead-worker")
+        ChatJob.objects.update(locked_at=timezone.now() - timedelta(seconds=121))
+        self.assertEqual(chat_queue.requeue_expired(), 2)
+
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts, job.last_error), (ChatJob.DEAD, 3, "lease expired"))
+        self.assertTrue(ChatMessage.objects.get(pk=job.chat_id).response)
+        self.assertEqual(ChatJob.objects.get(pk=requeued.pk).status, ChatJob.QUEUED)
+        self.assertEqual(chat_queue.claim("b").pk, requeued.pk)
+        self.assertIsNone(chat_queue.claim("b"))
+
+    def test_status(self):
+        job = self.enqueue()
+        other = User.objects.create_user("bob", password="pw")
+        self.assertIsNone(chat_queue.status(job.chat_id, other))
+        self.assertEqual(
+            chat_queue.status(job.chat_id, self.user),
+            {"id": job.chat_id, "status": ChatJob.QUEUED, "response": None, "attempts": 0, "stalled": False},
+        )
+
+        ChatJob.objects.filter(pk=job.pk).update(available_at=timezone.now() - timedelta(seconds=31))
+        with self.assertLogs("Mindscope.utils.chat_queue", "WARNING"):
+            self.assertTrue(chat_queue.status(job.chat_id, self.user)["stalled"])
+
+        inline = ChatMessage.objects.create(user=self.user, message="hi", response="hello")
+        self.assertEqual(chat_queue.status(inline.pk, self.user)["status"], ChatJob.DONE)
+        self.assertEqual(chat_queue.status(inline.pk, self.user)["response"], "hello")
+
+
+class CrisisFlagTests(TestCase):
+    def test_flag_is_shared(self):
+        user = User.objects.create_user("alice", password="pw")
+        self.assertEqual(crisis.priority_for(user), 0)
+        crisis.flag_user(user)
+        self.assertEqual(crisis.priority_for(user), crisis.PRIORITY)
+        # stored where every process can read it, not in this process's locmem
+        self.assertTrue(shared_cache().get(crisis._flag_key(user.pk)))
+        self.assertIsNone(caches["default"].get(crisis._flag_key(user.pk)))
+
+
+class RequestBatcherTests(SimpleTestCase):
+    def submit_concurrently(self, batcher, items, timeout=5):
+        results = {}
+
+        def submit(item):
+            results[item] = batcher.submit(item, timeout)
+        threads = [threading.Thread(target=submit, args=(item,)) for item in items]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return results
+
+    def test_concurrent_requests_share_a_batch(self):
+        sizes = []
+
+        def process(items):
+            sizes.append(len(items))
+            return [item.upper() for item in items]
+        batcher = RequestBatcher(process, max_batch_size=3, batch_window=0.2).start()
+        results = self.submit_concurrently(batcher, ["a", "b", "c", "d"])
+        self.assertEqual(results, {"a": "A", "b": "B", "c": "C", "d": "D"})
+        self.assertEqual(sorted(sizes), [1, 3])
+        self.assertEqual(batcher.stats()["avg_batch"], 2)
+
+    def test_expired_items_are_dropped_before_the_batch_runs(self):
+        process = mock.Mock(side_effect=lambda items: items)
+        batcher = RequestBatcher(process, batch_window=0)
+        self.assertIsNone(batcher.submit("too late", 0))
+        batcher.start()
+        self.assertEqual(batcher.submit("on time", 5), "on time")
+        process.assert_called_once_with(["on time"])
+        self.assertEqual(batcher.stats()["expired"], 1)
+
+    def test_failed_batch_answers_none(self):
+        batcher = RequestBatcher(mock.Mock(side_effect=RuntimeError("out of memory")), batch_window=0.05).start()
+        with self.assertLogs("Mindscope.utils.batcher", "ERROR"):
+            self.assertEqual(self.submit_concurrently(batcher, ["a", "b"]), {"a": None, "b": None})
+
+
+class LocalWorkerTests(SimpleTestCase):
+    def test_model_loads_on_first_use_and_failures_stick(self):
+        chat = LocalAIChat()
+        self.assertFalse(chat.ready)
+        with mock.patch.dict(sys.modules, {"transformers": None}), self.assertLogs("Mindscope.utils.local_ai", "WARNING"):
+            self.assertEqual(chat.generate_batch(["hi", "there"]), [None, None])
+        self.assertIsInstance(chat.load_error, ImportError)
+        self.assertFalse(chat.load())  # not retried on every request
+
+    def test_generate_round_trip_through_the_worker(self):
+        chat = mock.Mock(ready=True, load_error=None, model_name="stub")
+        chat.generate_batch.side_effect = lambda messages: [f"echo: {message}" for message in messages]
+        with socket.socket() as probe:
+            probe.bind(("127.0.0.1", 0))
+            address = probe.getsockname()
+        worker = local_worker.LocalAIWorker(chat=chat, batch_window=0)
+        threading.Thread(target=worker.serve_forever, args=(address, b"test-key"), daemon=True).start()
+
+        with override_settings(LOCAL_AI_WORKER={"ENABLED": True, "ADDRESS": list(address), "AUTHKEY": "test-key"}):
+            for _ in range(50):
+                if local_worker.health()["status"] != "down":
+                    break
+                time.sleep(0.05)
+            self.assertEqual(local_worker.health()["status"], "ready")
+            self.assertEqual(local_worker.generate("hello"), "echo: hello")
+        self.assertEqual(worker.batcher.stats()["served"], 1)
+
+    def test_disabled_or_down_worker_means_no_reply(self):
+        with mock.patch.object(local_worker, "_call") as call:
+            self.assertIsNone(local_worker.generate("hello"))
+        call.assert_not_called()
+        with socket.socket() as probe:
+            probe.bind(("127.0.0.1", 0))
+            address = list(probe.getsockname())
+        with override_settings(LOCAL_AI_WORKER={"ENABLED": True, "ADDRESS": address}):
+            with self.assertLogs("Mindscope.utils.local_worker", "WARNING"):
+                self.assertIsNone(local_worker.generate("hello"))
+            self.assertEqual(local_worker.health()["status"], "down")
+
+
+class UrgentLaneTests(SimpleTestCase):
+    def test_urgent_requests_skip_the_full_queue_and_go_first(self):
+        batcher = RequestBatcher(lambda items: items, max_batch_size=2, batch_window=0, max_queue=2, max_urgent=1)
+        batcher.submit("a", 0)
+        batcher.submit("b", 0)
+        with self.assertRaises(QueueFull):
+            batcher.submit("c", 0)
+        batcher.submit("crisis follow-up", 0, urgent=True)
+        with self.assertRaises(QueueFull):
+            batcher.submit("another", 0, urgent=True)
+        self.assertEqual([pending.item for pending in batcher._next_batch()], ["crisis follow-up", "a"])
+        self.assertEqual(batcher.stats()["queued"], 1)
+
+    @override_settings(LOCAL_AI_WORKER={"ENABLED": True})
+    def test_worker_request_carries_the_flag(self):
+        with mock.patch.object(local_worker, "_call", return_value={"response": "ok"}) as call:
+            self.assertEqual(local_worker.generate("hello", urgent=True), "ok")
+        self.assertTrue(call.call_args.args[0]["urgent"])
+
+    def test_worker_routes_urgent_requests_to_the_lane(self):
+        worker = local_worker.LocalAIWorker(chat=mock.Mock(), max_queue=0, max_urgent=1)
+        self.assertEqual(worker.generate("hello", 0), {"error": "busy"})
+        self.assertEqual(worker.generate("hello", 0, urgent=True), {"response": None})  # queued, timed out
+        self.assertEqual(worker.batcher.stats()["urgent_queued"], 1)
+
+
+class CatalogVersionTests(TestCase):
+    def test_invalidate_bumps_shared_version_on_commit(self):
+        before = catalog._shared_version()
+        with self.captureOnCommitCallbacks(execute=True):
+            catalog.invalidate()
+            catalog.invalidate()
+            # readers keep the old version until the edit is visible to them
+            self.assertEqual(catalog._shared_version(), before)
+        self.assertEqual(shared_cache().get(catalog.VERSION_KEY), before + 1)
+        self.assertIsNone(caches["default"].get(catalog.VERSION_KEY))
+
+
+class ExportTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user("alice", password="pw")
+        other = User.objects.create_user("bob", password="pw")
+        for user in (self.user, other):
+            MoodEntry.objects.create(user=user, mood="😊", notes=f"{user.username}'s note")
+            Screening.objects.create(user=user, screening_type="GAD7", score=4, severity="Minimal")
+            ChatMessage.objects.create(user=user, message="hi", response="hello")
+        self.client.force_login(self.user)
+
+    def records(self, body):
+        return [json.loads(line) for line in body.decode().splitlines()]
+
+    def test_ndjson_holds_only_the_users_rows(self):
+        response = self.client.get(reverse("export_data"))
+        self.assertTrue(response.streaming)
+        records = self.records(b"".join(response.streaming_content))
+        self.assertEqual([r["kind"] for r in records], ["mood", "screening", "chat"])
+        self.assertEqual({r["username"] for r in records}, {"alice"})
+        self.assertEqual(records[0]["notes"], "alice's note")
+
+    def test_csv_gzip(self):
+        response = self.client.get(reverse("export_data"), {"format": "csv", "gzip": "1"})
+        self.assertEqual(response["Content-Type"], "application/gzip")
+        rows = gzip.decompress(b"".join(response.streaming_content)).decode().splitlines()
+        self.assertEqual(rows[0].split(","), export.COLUMNS)
+        self.assertEqual(len(rows), 4)
+
+    async def test_asgi_streams_asynchronously(self):
+        await self.async_client.aforce_login(self.user)
+        response = await self.async_client.get(reverse("export_data"))
+        self.assertTrue(response.is_async)
+        chunks = [chunk async for chunk in response.streaming_content]
+        self.assertGreater(len(chunks), 1)
+        self.assertEqual(len(self.records(b"".join(chunks))), 3)
+
+    async def test_async_batches_are_bounded(self):
+        pulled = []
+
+        def chunks():
+            for i in range(10):
+                pulled.append(i)
+                yield "x" * 10
+
+        stream = export.aiter_chunks(chunks(), batch_bytes=30)
+        self.assertEqual(await anext(stream), "x" * 10)
+        self.assertEqual(len(pulled), 3)  # one batch, not the whole stream
+        self.assertEqual(len([chunk async for chunk in stream]), 9)
+
+
+class ResponseCacheTests(TestCase):
+    HISTORY = [{"role": "user", "content": "hi"}, {"role": "assistant", "content": "hello"}]
+
+    def setUp(self):
+        response_cache._cache().clear()
+
+    def test_near_identical_messages_share_a_key(self):
+        self.assertEqual(response_cache.normalize_message("  I'm SO   tired!! "), "im so tired")
+        self.assertEqual(response_cache.cache_key("I'm so tired!"), response_cache.cache_key("im so TIRED"))
+
+    def test_history_is_part_of_the_key(self):
+        self.assertNotEqual(
+            response_cache.cache_key("tired", self.HISTORY), response_cache.cache_key("tired"),
+        )
+        response_cache.store("tired", self.HISTORY, "Rest a little.")
+        self.assertEqual(response_cache.get("Tired.", self.HISTORY), "Rest a little.")
+        self.assertIsNone(response_cache.get("tired"))
+
+    def test_stats_count_hits_and_misses(self):
+        response_cache.reset_stats()
+        response_cache.store("hello", None, "Hi there.")
+        response_cache.get("hello")
+        response_cache.get("hello")
+        response_cache.get("goodbye")
+        self.assertEqual(response_cache.stats(), {"hits": 2, "misses": 1, "hit_ratio": 0.667})
+
+    def test_only_model_replies_are_cached(self):
+        with mock.patch.object(chat_engine, "generate_model_response", return_value="A model reply.") as model:
+            self.assertEqual(chat_engine.generate_intelligent_response("work stress"), "A model reply.")
+            self.assertEqual(chat_engine.generate_intelligent_response("Work stress!"), "A model reply.")
+        model.assert_called_once()
+
+        with mock.patch.object(chat_engine, "generate_model_response", return_value=None):
+            chat_engine.generate_intelligent_response("feeling lonely")
+        self.assertIsNone(response_cache.get("feeling lonely"))  # keyword fallback is not stored
+
+        crisis_message = "I want to kill myself"
+        self.assertTrue(crisis.detect(crisis_message))
+        chat_engine.generate_intelligent_response(crisis_message)
+        self.assertIsNone(response_cache.get(crisis_message))
+
+
+class PageCacheTests(TestCase):
+    def setUp(self):
+        caches["default"].clear()
+
+    def test_static_page_is_served_from_the_cache(self):
+        with mock.patch("Mindscope.views.render", wraps=render) as rendered:
+            first = self.client.get(reverse("home"))
+            second = self.client.get(reverse("home"))
+            self.client.get(reverse("home"), {"utm": "x"})  # a query string bypasses the cache
+        self.assertEqual(rendered.call_count, 2)
+        self.assertEqual(first.content, second.content)
+        stats = page_cache.stats()
+        self.assertEqual((stats["page_hits"], stats["page_misses"], stats["page_hit_ratio"]), (1, 1, 0.5))
+
+    @override_settings(PAGE_CACHE={"VERSION": 2})
+    def test_version_bump_drops_cached_pages(self):
+        self.client.get(reverse("home"))
+        with override_settings(PAGE_CACHE={"VERSION": 3}):
+            self.client.get(reverse("home"))
+        self.assertEqual(page_cache.stats()["page_hits"], 0)
+
+
+class ConditionalPageTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user("alice", password="pw")
+        self.client.force_login(self.user)
+        self.entry = MoodEntry.objects.create(user=self.user, mood="😊", notes="first")
+
+    def get(self, name):
+        # the first render sets the CSRF cookie, which is part of the ETag
+        self.client.get(reverse(name))
+        return self.client.get(reverse(name))
+
+    def revalidate(self, name, response):
+        return self.client.get(reverse(name), HTTP_IF_NONE_MATCH=response["ETag"])
+
+    def test_repeat_request_is_not_modified(self):
+        for name in ("dashboard", "mood_tracker"):
+            first = self.get(name)
+            self.assertEqual(first.status_code, 200)
+            self.assertEqual(self.revalidate(name, first).status_code, 304, name)
+
+    def test_edit_invalidates(self):
+        first = self.get("mood_tracker")
+        # same count, same date_logged: only updated_at moves
+        self.entry.notes = "edited"
+        self.entry.save()
+        response = self.revalidate("mood_tracker", first)
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, "edited")
+
+    def test_revalidation_stats(self):
+        page_cache.reset_stats()
+        first = self.get("dashboard")
+        self.revalidate("dashboard", first)
+        stats = page_cache.stats()
+        self.assertEqual((stats["modified"], stats["not_modified"], stats["not_modified_ratio"]), (2, 1, 0.333))
+
+    def test_screening_edit_invalidates_the_dashboard(self):
+        screening = Screening.objects.create(user=self.user, screening_type="PHQ9", score=3, severity="Minimal")
+        first = self.get("dashboard")
+        Screening.objects.filter(pk=screening.pk).update(severity="Mild", updated_at=timezone.now())
+        self.assertEqual(self.revalidate("dashboard", first).status_code, 200)
+
+
+class PerformanceMetricsTests(TestCase):
+    def setUp(self):
+        metrics.reset()
+        self.addCleanup(metrics.reset)
+
+    def test_histogram_buckets_are_cumulative(self):
+        histogram = metrics.Histogram("latency", "Test.", ("view",), buckets=(0.1, 1.0))
+        for value in (0.05, 0.5, 5.0):
+            histogram.observe(value, 'say "hi"')
+        self.assertEqual(histogram.render()[2:], [
+            'latency_bucket{view="say \\"hi\\"",le="0.1"} 1',
+            'latency_bucket{view="say \\"hi\\"",le="1.0"} 2',
+            'latency_bucket{view="say \\"hi\\"",le="+Inf"} 3',
+            'latency_sum{view="say \\"hi\\""} 5.550000',
+            'latency_count{view="say \\"hi\\""} 3',
+        ])
+
+    def test_requests_get_server_timing_and_are_recorded(self):
+        self.client.force_login(User.objects.create_user("alice", password="pw"))
+        response = self.client.get(reverse("dashboard"))
+        timing = response["Server-Timing"]
+        self.assertRegex(timing, r"^total;dur=[\d.]+, db;dur=[\d.]+;desc=\"\d+ queries\"")
+        self.assertIn("render;dur=", timing)
+        exposed = metrics.render_prometheus()
+        self.assertIn('mindscope_request_duration_seconds_count{view="dashboard",method="GET"} 1', exposed)
+        self.assertIn('mindscope_request_segment_seconds_count{view="dashboard",segment="render"} 1', exposed)
+
+    @override_settings(PERFORMANCE_METRICS={"TOKEN": "s3cret"})
+    def test_metrics_endpoint_needs_the_token(self):
+        self.assertEqual(self.client.get(reverse("metrics")).status_code, 401)
+        self.assertEqual(self.client.get(reverse("metrics"), HTTP_AUTHORIZATION="Bearer wrong").status_code, 401)
+        response = self.client.get(reverse("metrics"), HTTP_AUTHORIZATION="Bearer s3cret")
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'mindscope_cache_requests_total{cache="pages",outcome="hit"}')
+
+    @override_settings(PERFORMANCE_METRICS={"TOKEN": None})
+    def test_metrics_endpoint_without_a_token_is_staff_only(self):
+        self.client.force_login(User.objects.create_user("alice", password="pw"))
+        self.assertEqual(self.client.get(reverse("metrics")).status_code, 401)
+        self.client.force_login(User.objects.create_user("admin", password="pw", is_staff=True))
+        self.assertEqual(self.client.get(reverse("metrics")).status_code, 200)
+
+
+class EstimatedPaginatorTests(TestCase):
+    def setUp(self):
+        user = User.objects.create_user("alice", password="pw")
+        ChatMessage.objects.bulk_create(ChatMessage(user=user, message=f"message {i}") for i in range(5))
+
+    def test_sqlite_estimate_needs_analyze(self):
+        with connection.cursor() as cursor:
+            cursor.execute("DROP TABLE IF EXISTS sqlite_stat1")
+        self.assertIsNone(estimates.estimated_row_count(ChatMessage))
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE")
+        self.assertEqual(estimates.estimated_row_count(ChatMessage), 5)
+
+    def test_unfiltered_count_uses_large_estimates_only(self):
+        paginator = estimates.EstimatedCountPaginator(ChatMessage.objects.order_by("pk"), 2)
+        with mock.patch.object(estimates, "estimated_row_count", return_value=2_000_000):
+            self.assertEqual(paginator.count, 2_000_000)
+        small = estimates.EstimatedCountPaginator(ChatMessage.objects.order_by("pk"), 2)
+        with mock.patch.object(estimates, "estimated_row_count", return_value=7):
+            self.assertEqual(small.count, 5)
+
+    def test_filtered_count_is_exact_up_to_the_cap(self):
+        queryset = ChatMessage.objects.filter(message__startswith="message").order_by("pk")
+        with mock.patch.object(estimates, "estimated_row_count") as estimate:
+            self.assertEqual(estimates.EstimatedCountPaginator(queryset, 2).count, 5)
+            with mock.patch.object(estimates, "EXACT_COUNT_LIMIT", 3):
+                self.assertEqual(estimates.EstimatedCountPaginator(queryset, 2).count, 3)
+        estimate.assert_not_called()
+
+    def test_admin_changelist_renders(self):
+        self.client.force_login(User.objects.create_superuser("admin", password="pw"))
+        response = self.client.get(reverse("admin:Mindscope_chatmessage_changelist"))
+        self.assertContains(response, "5 chat messages")
+
+
+# "default" stands in for the replica alias: the router returns it only inside replica_reads
+@override_settings(DATABASE_REPLICA={"ALIAS": "default", "PIN_SECONDS": 5})
+class ReplicaRouterTests(SimpleTestCase):
+    def setUp(self):
+        self.router = ReplicaRouter()
+        self.model, self.seen = MoodEntry, []
+
+        @replica_reads
+        def view(request):
+            self.seen.append(self.router.db_for_read(self.model))
+            return HttpResponse()
+        self.view = view
+
+    def request(self, method, session):
+        request = getattr(RequestFactory(), method)("/")
+        request.session = session
+        return request
+
+    def test_reads_go_to_the_replica_until_a_write_pins_the_session(self):
+        session = {}
+        self.view(self.request("get", session))
+        self.view(self.request("post", session))
+        self.view(self.request("get", session))
+        self.assertEqual(self.seen, ["default", None, None])
+        self.assertIsNone(self.router.db_for_read(MoodEntry))  # outside the view
+
+        session[PIN_SESSION_KEY] = 0  # the pin has run out
+        self.view(self.request("get", session))
+        self.assertEqual(self.seen[-1], "default")
+
+    def test_writes_cache_and_migrations_stay_on_the_primary(self):
+        # the DatabaseCache model reads from the primary
+        self.model = type("CacheEntry", (), {"_meta": type("Meta", (), {"app_label": "django_cache"})})
+        self.view(self.request("get", {}))
+        self.assertEqual(self.seen, [None])
+        self.assertEqual(self.router.db_for_write(MoodEntry), "default")
+        with self.settings(DATABASE_REPLICA={"ALIAS": "replica"}):
+            self.assertFalse(self.router.allow_migrate("replica", "Mindscope"))
+            self.assertTrue(self.router.allow_migrate("default", "Mindscope"))
+
+    @override_settings(DATABASE_REPLICA={"ALIAS": "replica"})
+    def test_no_replica_configured(self):
+        session = {}
+        self.view(self.request("post", session))
+        self.view(self.request("get", session))
+        self.assertEqual((self.seen, session), ([None, None], {}))
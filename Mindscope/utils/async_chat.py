@@ -0,0 +1,202 @@
+import asyncio
+import json
+import logging
+import os
+import weakref
+
+from asgiref.sync import sync_to_async
+
+# httpx is only needed for the streaming endpoint; fall back to canned replies without it
+try:
+    import httpx
+    HTTPX_AVAILABLE = True
+except ImportError:
+    HTTPX_AVAILABLE = False
+    logging.warning("httpx library not installed. Streaming chat will use fallback responses only.")
+
+from . import crisis, local_worker, response_cache
+from .fallback_responses import get_fallback_response
+from .inference_client import get_inference_client
+from .openai_client import build_conversation_context
+
+logger = logging.getLogger(__name__)
+
+POOL_SIZE = 10  # keep-alive connections per event loop, as InferenceClient's pool
+KEEPALIVE_EXPIRY = 30  # seconds an idle connection is kept
+DEFAULT_TIMEOUT = 15  # per-request timeouts come from the backend settings
+
+# event loop -> AsyncClient; pooled connections belong to the loop that opened them
+_clients = weakref.WeakKeyDictionary()
+
+
+def get_async_client():
+    """
+    The shared AsyncClient for the running event loop, created on first use.
+    An ASGI server runs one loop, so every streamed chat reuses its keep-alive
+    connections; under WSGI each request's short-lived loop gets its own.
+    """
+    loop = asyncio.get_running_loop()
+    client = _clients.get(loop)
+    if client is None or client.is_closed:
+        client = _clients[loop] = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=POOL_SIZE, max_keepalive_connections=POOL_SIZE, keepalive_expiry=KEEPALIVE_EXPIRY,
+            ),
+            timeout=httpx.Timeout(DEFAULT_TIMEOUT, connect=3),
+        )
+    return client
+
+
+def _words(text):
+    """Split a complete reply into word-sized chunks so it streams like tokens."""
+    words = text.split(" ")
+    for i, word in enumerate(words):
+        yield word if i == len(words) - 1 else word + " "
+
+
+async def _stream_hugging_face(client, user_message, history_messages):
+    api_key = os.getenv("HUGGINGFACE_API_KEY")
+    if not api_key:
+        return
+
+    payload = {
+        "inputs": build_conversation_context(user_message, history_messages),
+        "parameters": {
+            "max_new_tokens": 150,
+            "temperature": 0.7,
+            "do_sample": True,
+            "top_p": 0.9,
+            "repetition_penalty": 1.1,
+        },
+        "stream": True,
+    }
+    headers = {"Authorization": f"Bearer {api_key}"}
+    backend = get_inference_client().backend("hf_large")
+    timeout = httpx.Timeout(backend.timeout, connect=backend.connect_timeout)
+
+    async with client.stream("POST", backend.url, headers=headers, json=payload, timeout=timeout) as response:
+        response.raise_for_status()
+        async for line in response.aiter_lines():
+            if not line.startswith("data:"):
+                continue
+            event = json.loads(line[len("data:"):])
+            text = (event.get("token") or {}).get("text")
+            if text and not (event.get("token") or {}).get("special"):
+                yield text
+
+
+async def _simple_api_call(client, user_message):
+    prompt = f"User: {user_message}\nAssistant:"
+    backend = get_inference_client().backend("hf_small")
+    response = await client.post(
+        backend.url,
+        json={"inputs": prompt, "parameters": {"max_length": 150, "temperature": 0.7}},
+        timeout=httpx.Timeout(backend.timeout, connect=backend.connect_timeout),
+    )
+    # a 5xx counts against the breaker, as in InferenceClient.post
+    response.raise_for_status()
+    result = response.json()
+    if isinstance(result, list) and len(result) > 0:
+        generated_text = result[0].get("generated_text", "")
+        if "Assistant:" in generated_text:
+            return generated_text.split("Assistant:")[-1].strip()
+        return generated_text.replace(prompt, "").strip()
+    return None
+
+
+async def _store(user_message, history_messages, reply):
+    await sync_to_async(response_cache.store)(user_message, history_messages, reply)
+
+
+async def _stream_models(user_message, history_messages, outcome):
+    """
+    Chunks from the first model backend that answers, also collected in
+    ``outcome["chunks"]``; ``outcome["complete"]`` is set once a reply has
+    arrived whole. Yields nothing when no backend answered.
+    """
+    if not HTTPX_AVAILABLE:
+        return
+    # the circuit breakers are shared with the synchronous chain in chat_engine
+    client_backends = get_inference_client()
+    client = get_async_client()
+    large = client_backends.backend("hf_large").breaker
+    if os.getenv("HUGGINGFACE_API_KEY") and large.allow():
+        settled = False
+        try:
+            async for chunk in _stream_hugging_face(client, user_message, history_messages):
+                outcome["chunks"].append(chunk)
+                yield chunk
+            large.record_success()
+            outcome["complete"] = settled = True
+        except Exception as e:
+            large.record_failure()
+            settled = True
+            logger.warning(f"Hugging Face streaming failed: {e}")
+        finally:
+            # client disconnected (GeneratorExit) or cancelled: free a half-open trial
+            if not settled:
+                large.release()
+        if outcome["chunks"]:
+            # already sent, so it stands even if the stream broke off
+            return
+
+    small = client_backends.backend("hf_small").breaker
+    if small.allow():
+        reply = None
+        settled = False
+        try:
+            reply = await _simple_api_call(client, user_message)
+            small.record_success()
+            settled = True
+        except Exception as e:
+            small.record_failure()
+            settled = True
+            logger.warning(f"Simple API call failed: {e}")
+        finally:
+            if not settled:
+                small.release()
+        if reply:
+            outcome["chunks"].append(reply)
+            outcome["complete"] = True
+            for chunk in _words(reply):
+                yield chunk
+
+
+async def stream_intelligent_response(user_message, history_messages=None, urgent=False):
+    """
+    Async counterpart of ``chat_engine.generate_intelligent_response`` that yields
+    the reply in chunks as they arrive. Same order: crisis reply (no network
+    call), response cache, streamed Hugging Face API, the unauthenticated
+    small model, the local worker, then the keyword responses. Model replies
+    are cached like the synchronous chain's.
+    """
+    if crisis.detect(user_message):
+        for chunk in _words(crisis.crisis_response()):
+            yield chunk
+        return
+
+    cached = await sync_to_async(response_cache.get)(user_message, history_messages)
+    if cached is not None:
+        for chunk in _words(cached):
+            yield chunk
+        return
+
+    outcome = {"chunks": [], "complete": False}
+    async for chunk in _stream_models(user_message, history_messages, outcome):
+        yield chunk
+    if outcome["complete"]:
+        await _store(user_message, history_messages, "".join(outcome["chunks"]).strip())
+    if outcome["chunks"]:
+        return
+
+    # blocks on a socket for up to LOCAL_AI_WORKER["TIMEOUT"]; off the shared sync thread
+    local_reply = await sync_to_async(local_worker.generate, thread_sensitive=False)(user_message, urgent)
+    if local_reply:
+        await _store(user_message, history_messages, local_reply)
+        for chunk in _words(local_reply):
+            yield chunk
+        return
+
+    # the keyword replies come from the catalog, which may have to (re)load from the database
+    for chunk in _words(await sync_to_async(get_fallback_response)(user_message)):
+        yield chunk
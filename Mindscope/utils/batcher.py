@@ -0,0 +1,119 @@
+import logging
+import threading
+import time
+from collections import deque
+
+logger = logging.getLogger(__name__)
+
+
+class QueueFull(Exception):
+    """Raised by RequestBatcher.submit when the bounded queue has no room."""
+
+
+class _Pending:
+    __slots__ = ("item", "deadline", "result", "done")
+
+    def __init__(self, item, deadline):
+        self.item = item
+        self.deadline = deadline
+        self.result = None
+        self.done = threading.Event()
+
+
+class RequestBatcher:
+    """
+    Collects concurrent requests into batches for ``process_batch(items) -> results``.
+
+    A batch closes when it reaches ``max_batch_size`` or ``batch_window`` seconds
+    after its first item arrived. The queue holds at most ``max_queue`` waiting
+    items; ``submit`` raises ``QueueFull`` beyond that so callers can fall back
+    instead of piling up. Items whose deadline passes while queued are dropped
+    before the batch runs, so the model never works on answers nobody waits for.
+
+    ``urgent`` items (users recently flagged by the crisis check) have their own
+    lane of ``max_urgent`` slots: they are taken into batches ahead of the
+    normal queue and are not turned away because it is full.
+    """
+
+    def __init__(self, process_batch, max_batch_size=8, batch_window=0.01, max_queue=64, max_urgent=16):
+        self.process_batch = process_batch
+        self.max_batch_size = max_batch_size
+        self.batch_window = batch_window
+        self.max_queue = max_queue
+        self.max_urgent = max_urgent
+        self._urgent, self._normal = deque(), deque()
+        self._ready = threading.Condition()
+        self.batches = 0
+        self.served = 0
+        self.rejected = 0
+        self.expired = 0
+        self._thread = None
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self.run, daemon=True)
+            self._thread.start()
+        return self
+
+    def submit(self, item, timeout, urgent=False):
+        """Queue ``item`` and wait up to ``timeout`` seconds; None means it timed out."""
+        pending = _Pending(item, time.monotonic() + timeout)
+        lane, limit = (self._urgent, self.max_urgent) if urgent else (self._normal, self.max_queue)
+        with self._ready:
+            if len(lane) >= limit:
+                self.rejected += 1
+                raise QueueFull(f"{limit} {'urgent ' if urgent else ''}requests already queued")
+            lane.append(pending)
+            self._ready.notify()
+        pending.done.wait(timeout)
+        return pending.result
+
+    def _take(self, batch):
+        while len(batch) < self.max_batch_size and (self._urgent or self._normal):
+            batch.append((self._urgent or self._normal).popleft())
+
+    def _next_batch(self):
+        batch = []
+        with self._ready:
+            self._ready.wait_for(lambda: self._urgent or self._normal)
+            self._take(batch)
+            closes_at = time.monotonic() + self.batch_window
+            while len(batch) < self.max_batch_size:
+                remaining = closes_at - time.monotonic()
+                if remaining <= 0 or not self._ready.wait(remaining):
+                    break
+                self._take(batch)
+        return batch
+
+    def run(self):
+        while True:
+            batch = self._next_batch()
+            now = time.monotonic()
+            live = [pending for pending in batch if pending.deadline > now]
+            self.expired += len(batch) - len(live)
+            if not live:
+                continue
+
+            try:
+                results = self.process_batch([pending.item for pending in live])
+            except Exception as e:
+                logger.error(f"Batch of {len(live)} failed: {e}")
+                results = [None] * len(live)
+
+            self.batches += 1
+            self.served += len(live)
+            for pending, result in zip(live, results):
+                pending.result = result
+                pending.done.set()
+
+    def stats(self):
+        return {
+            "queued": len(self._normal),
+            "max_queue": self.max_queue,
+            "urgent_queued": len(self._urgent),
+            "batches": self.batches,
+            "served": self.served,
+            "rejected": self.rejected,
+            "expired": self.expired,
+            "avg_batch": round(self.served / self.batches, 2) if self.batches else 0,
+        }
@@ -0,0 +1,254 @@
+"""
+Building blocks for ``manage.py bench_suite``.
+
+- ``throwaway_databases``: run a benchmark against freshly migrated test
+  databases instead of the configured ones.
+- ``seed_dataset``: reproducible users with mood, screening and chat history,
+  all under ``BENCH_PREFIX``.
+- ``measure``: calibrated micro-benchmark timer (median and best per call).
+- ``HuggingFaceStub``: a local HTTP server answering like the inference API,
+  with a fixed latency, so load tests exercise the real chat path offline.
+- ``flatten`` / ``compare``: turn results into ``section.name.metric`` keys
+  and flag regressions against a saved baseline.
+"""
+import json
+import math
+import os
+import random
+import statistics
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from django.contrib.auth.models import User
+from django.db import connections, transaction
+from django.test.utils import setup_databases, teardown_databases
+
+from ..models import ChatMessage, MoodEntry, Screening, WellnessSummary
+from .screening_engine import COMPILED
+
+BENCH_PREFIX = "bench_suite_"
+DEFAULT_THRESHOLD = 0.15  # relative change that counts as a regression
+
+WORDS = (
+    "i feel anxious about exams and can't sleep work has been stressful lately my family "
+    "is supportive but lonely sometimes breathing exercises help a little today was better "
+    "tired overwhelmed calm grateful therapy walk music journal motivation focus"
+).split()
+
+
+@contextmanager
+def throwaway_databases(keep=False):
+    """
+    Seed and measure in test databases (setup_databases) rather than the
+    configured ones, dropped on exit. SQLite gets a file instead of the
+    in-memory default, which locks whole tables under concurrent writers.
+    ``keep`` reuses and keeps them between runs (``keepdb``), so a large seed
+    is paid once.
+    """
+    with tempfile.TemporaryDirectory() as workdir:
+        for alias in connections:
+            if connections[alias].vendor == "sqlite":
+                folder = tempfile.gettempdir() if keep else workdir
+                connections[alias].settings_dict["TEST"]["NAME"] = os.path.join(folder, f"mindscope_bench_{alias}.sqlite3")
+        databases = setup_databases(verbosity=0, interactive=False, keepdb=keep)
+        try:
+            yield
+        finally:
+            connections.close_all()
+            if not keep:
+                teardown_databases(databases, verbosity=0)
+
+
+def sentence(rng, low=5, high=30):
+    return " ".join(rng.choices(WORDS, k=rng.randint(low, high)))
+
+
+def seed_dataset(users, moods_per_user, screenings_per_user, chats_per_user, seed=0, batch_size=5000):
+    """Create ``users`` benchmark users with history; returns the users."""
+    rng = random.Random(seed)
+    moods = [choice for choice, _label in MoodEntry.MOOD_CHOICES]
+    created = []
+    for i in range(users):
+        user, _ = User.objects.get_or_create(username=f"{BENCH_PREFIX}{i}")
+        created.append(user)
+
+    def chunks(rows):
+        for start in range(0, len(rows), batch_size):
+            yield rows[start:start + batch_size]
+
+    with transaction.atomic():
+        for user in created:
+            # bulk_create skips save(), so scores and masks are filled in here
+            entries = []
+            for _ in range(moods_per_user):
+                mood = rng.choice(moods)
+                influencers = ", ".join(rng.sample(MoodEntry.INFLUENCERS, rng.randint(0, 3)))
+                entries.append(MoodEntry(
+                    user=user, mood=mood, score=MoodEntry.MOOD_SCORES[mood], notes=sentence(rng),
+                    influencers=influencers, influencer_mask=MoodEntry.mask_for(influencers),
+                ))
+            for chunk in chunks(entries):
+                MoodEntry.objects.bulk_create(chunk)
+            MoodEntry.invalidate_analytics(user.pk)
+
+            screenings = []
+            for _ in range(screenings_per_user):
+                instrument = COMPILED[rng.choice(list(COMPILED))]
+                score = instrument.score([rng.randint(0, instrument.max_answer) for _ in range(instrument.items)])
+                screenings.append(Screening(
+                    user=user, screening_type=instrument.code, score=score, severity=instrument.severity(score),
+                ))
+            for chunk in chunks(screenings):
+                Screening.objects.bulk_create(chunk)
+
+            chats = [ChatMessage(user=user, message=sentence(rng), response=sentence(rng)) for _ in range(chats_per_user)]
+            for chunk in chunks(chats):
+                ChatMessage.objects.bulk_create(chunk)
+            WellnessSummary.rebuild(user)
+    return created
+
+
+def measure(fn, repeat=5, min_round=0.1):
+    """Time ``fn()``; calls per round are calibrated so a round lasts about ``min_round`` s."""
+    number = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_round / 4 or number >= 1_000_000:
+            break
+        number *= 4
+    number = max(1, int(number * min_round / max(elapsed, 1e-9)))
+
+    rounds = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        rounds.append((time.perf_counter() - start) / number * 1e6)
+    return {"median_us": round(statistics.median(rounds), 2), "best_us": round(min(rounds), 2), "calls": number * repeat}
+
+
+def percentile(sorted_samples, fraction):
+    """Nearest-rank percentile of already sorted samples (never below the median)."""
+    return sorted_samples[max(0, math.ceil(fraction * len(sorted_samples)) - 1)]
+
+
+def latency_summary(samples_ms):
+    samples = sorted(samples_ms)
+    if not samples:
+        return {"requests": 0}
+    return {
+        "requests": len(samples),
+        "p50_ms": round(statistics.median(samples), 2),
+        "p95_ms": round(percentile(samples, 0.95), 2),
+        "max_ms": round(samples[-1], 2),
+    }
+
+
+REPLY = "That sounds hard. I'm here to listen."
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    latency = 0.05
+    status = 200  # anything else answers every request with that error
+    calls = None  # per-server list, one entry per request
+
+    def do_POST(self):
+        self.calls.append(self.path)
+        length = int(self.headers.get("Content-Length") or 0)
+        try:
+            payload = json.loads(self.rfile.read(length) or b"{}")
+        except ValueError:
+            payload = {}
+        time.sleep(self.latency)
+        if self.status != 200:
+            self.send_error(self.status)
+            return
+        if payload.get("stream"):
+            # text-generation-inference style server-sent events, one token per word
+            body = "".join(
+                f"data: {json.dumps({'token': {'text': word + ' ', 'special': False}})}\n\n" for word in REPLY.split()
+            ).encode()
+            content_type = "text/event-stream"
+        else:
+            body = json.dumps([{"generated_text": f"{payload.get('inputs', '')}\nassistant: {REPLY}"}]).encode()
+            content_type = "application/json"
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class HuggingFaceStub:
+    """``with HuggingFaceStub(latency_ms=50) as url:`` serves fake generations on 127.0.0.1."""
+
+    def __init__(self, latency_ms=50, status=200):
+        self.calls = []
+        handler = type("StubHandler", (_StubHandler,), {"latency": latency_ms / 1000, "status": status, "calls": self.calls})
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+        self.server.daemon_threads = True
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    @property
+    def url(self):
+        host, port = self.server.server_address
+        return f"http://{host}:{port}/"
+
+    def __enter__(self):
+        self.thread.start()
+        return self.url
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def flatten(results, prefix=""):
+    """Nested numeric results -> {"load.dashboard.p95_ms": 12.3, ...}; non-numeric leaves are dropped."""
+    flat = {}
+    for key, value in results.items():
+        name = f"{prefix}{key}"
+        if isinstance(value, dict):
+            flat.update(flatten(value, f"{name}."))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            flat[name] = value
+    return flat
+
+
+def _direction(metric):
+    """+1 when higher is better, -1 when lower is better, None for informational metrics."""
+    leaf = metric.rsplit(".", 1)[-1]
+    if leaf.startswith("max_"):
+        return None  # a single sample; too noisy to gate on
+    if leaf.endswith("_per_sec"):
+        return 1
+    if leaf.endswith(("_us", "_ms")) or leaf in ("errors", "dead", "unfinished"):
+        return -1
+    return None
+
+
+def compare(current, baseline, threshold=DEFAULT_THRESHOLD):
+    """Rows of (metric, baseline, current, relative change, regressed) for metrics in both runs."""
+    now, before = flatten(current), flatten(baseline)
+    rows = []
+    for metric in sorted(now.keys() & before.keys()):
+        direction = _direction(metric)
+        if direction is None:
+            continue
+        old, new = before[metric], now[metric]
+        if old == 0:
+            change = 0.0 if new == 0 else float("inf")
+        else:
+            change = (new - old) / old
+        regressed = (change > threshold) if direction < 0 else (change < -threshold)
+        rows.append((metric, old, new, change, regressed))
+    return rows
@@ -0,0 +1,140 @@
+"""
+Localized chat fallback replies (ChatResponse) and wellness tips (WellnessTip),
+served from process memory.
+
+The whole catalog is small, so each process loads it in one go at startup
+(``preload`` from wsgi.py/asgi.py and run_chat_workers, else on first use) and
+answers lookups from a dict after that; the request path never queries the
+database for it. Saving or deleting a row (admin, shell, fixtures) fires
+``invalidate`` through the signals connected in ``MindscopeConfig.ready``.
+Once the transaction commits, that bumps a version number in the shared
+cache (``shared_cache()``, a database or Redis cache, never the per-process
+LocMemCache). Every process compares its copy against that version at most
+once per ``CHECK_INTERVAL`` seconds and reloads when it is behind; the
+process that made the edit reloads at once.
+``queryset.update()`` sends no signals, so call ``invalidate()`` after one.
+
+Lookups use the active language (LocaleMiddleware), then LANGUAGE_CODE.
+"""
+import logging
+import threading
+import time
+from collections import namedtuple
+
+from django.conf import settings
+from django.db import DatabaseError
+from django.utils import translation
+
+from .commit_hooks import on_commit_once
+from .shared_cache import shared_cache
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    "CHECK_INTERVAL": 5,  # seconds between version checks against the shared cache
+}
+
+VERSION_KEY = "catalog:version"
+# last resort when the catalog has no reply at all (e.g. before migrations ran)
+DEFAULT_REPLY = "Thank you for sharing. I'm here to listen and support you."
+
+Tip = namedtuple("Tip", ["id", "title", "content"])
+
+_lock = threading.Lock()
+# data: (responses, tips), swapped whole; recheck_at: monotonic time of the next version check
+_state = {"version": None, "recheck_at": 0.0, "data": None}
+
+
+def catalog_settings():
+    return {**DEFAULTS, **getattr(settings, "RESPONSE_CATALOG", {})}
+
+
+def _shared_version():
+    cache = shared_cache()
+    cache.add(VERSION_KEY, 1, timeout=None)
+    return cache.get(VERSION_KEY, 1)
+
+
+def _load():
+    from ..models import ChatResponse, WellnessTip
+
+    responses, tips = {}, {}
+    for intent, language, text in ChatResponse.objects.values_list("intent", "language", "text"):
+        responses.setdefault(language, {})[intent] = text
+    for pk, title, content, language in WellnessTip.objects.order_by("pk").values_list("pk", "title", "content", "language"):
+        tips.setdefault(language, []).append(Tip(pk, title, content))
+    return responses, tips
+
+
+def _current():
+    """(responses, tips), reloaded when another edit bumped the shared version."""
+    now = time.monotonic()
+    data = _state["data"]
+    if data is not None and now < _state["recheck_at"]:
+        return data
+    with _lock:
+        data = _state["data"]
+        try:
+            # the shared cache is a database table by default, so this can fail like _load
+            version = _shared_version()
+            if data is None or _state["version"] != version:
+                data = _load()
+        except DatabaseError as e:
+            # tables missing or database down: serve the old copy (or nothing) and retry next time
+            logger.warning(f"Response catalog unavailable: {e}")
+            return data or ({}, {})
+        _state.update(version=version, data=data)
+        _state["recheck_at"] = now + catalog_settings()["CHECK_INTERVAL"]
+    return data
+
+
+def preload():
+    """Load the catalog now (server startup) rather than on the first lookup."""
+    _current()
+
+
+def invalidate(using=None, **kwargs):
+    """
+    Signal receiver: make every process reload the catalog once the edit
+    commits. Bumping earlier would let a reader cache the old rows under the
+    new version until the next edit.
+    """
+    on_commit_once(VERSION_KEY, _bump_version, using=using)
+
+
+def _bump_version():
+    cache = shared_cache()
+    try:
+        cache.add(VERSION_KEY, 1, timeout=None)
+        cache.incr(VERSION_KEY)
+    except ValueError:
+        # key evicted between add and incr; any new value forces a reload
+        cache.set(VERSION_KEY, int(time.time()), timeout=None)
+    with _lock:
+        _state["data"] = None
+
+
+def _languages(language):
+    language = (language or translation.get_language() or settings.LANGUAGE_CODE).split("-")[0]
+    default = settings.LANGUAGE_CODE.split("-")[0]
+    return (language, default) if language != default else (language,)
+
+
+def response(intent, language=None):
+    """The reply for ``intent``, falling back to "default" and then to LANGUAGE_CODE."""
+    responses, _tips = _current()
+    for code in _languages(language):
+        texts = responses.get(code, {})
+        text = texts.get(intent) or texts.get("default")
+        if text:
+            return text
+    return DEFAULT_REPLY
+
+
+def tips(language=None):
+    """Wellness tips for the language (LANGUAGE_CODE's when it has none)."""
+    _responses, all_tips = _current()
+    for code in _languages(language):
+        if all_tips.get(code):
+            return all_tips[code]
+    return []
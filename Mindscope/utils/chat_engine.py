@@ -1,20 +1,53 @@
-from .openai_client import generate_chat_response
+from .openai_client import try_hugging_face_api
 from .fallback_responses import get_fallback_response
+from .inference_client import get_inference_client
+from . import crisis, local_worker, response_cache
+from .metrics import timed
 import logging
-import requests
 
 
+logger = logging.getLogger(__name__)
+
+def generate_intelligent_response(user_message, history_messages=None, fallback=True, urgent=False):
+    """
+    Hybrid approach: Try multiple methods in order. With ``fallback=False``
+    returns None instead of the keyword reply when no model answered (the
+    chat queue retries those). ``urgent`` (a crisis-flagged user) jumps the
+    local worker's queue.
+    """
+    # 0. Crisis language gets the crisis-resource reply before any network call
+    with timed("crisis_check"):
+        flagged = crisis.detect(user_message)
+    if flagged:
+        return crisis.crisis_response()
 
+    # Reuse a recent model reply for the same message and history
+    with timed("response_cache"):
+        cached = response_cache.get(user_message, history_messages)
+    if cached is not None:
+        return cached
 
-logger = logging.getLogger(__name__)
+    response = generate_model_response(user_message, history_messages, urgent)
+    if response:
+        response_cache.store(user_message, history_messages, response)
+        return response
+
+    if not fallback:
+        return None
 
-def generate_intelligent_response(user_message, history_messages=None):
+    # 4. Final fallback to improved keyword system (cheap, so never cached)
+    with timed("fallback"):
+        return get_fallback_response(user_message)
+
+
+def generate_model_response(user_message, history_messages=None, urgent=False):
     """
-    Hybrid approach: Try multiple methods in order
+    Try the remote models in order; returns None when none of them answered.
     """
     # 1. First try Hugging Face API (your existing setup)
     try:
-        hf_response = generate_chat_response(user_message, history_messages)
+        with timed("inference_hf_large"):
+            hf_response = try_hugging_face_api(user_message, history_messages)
         if hf_response and hf_response != "This is an AI response to your message":
             return hf_response
     except Exception as e:
@@ -22,27 +55,26 @@ def generate_intelligent_response(user_message, history_messages=None):
     
     # 2. Try simple API call without authentication
     try:
-        response = requests.post(
-            "https://api-inference.huggingface.co/models/microsoft/DialoGPT-small",
-            json={
-                "inputs": f"User: {user_message}\nAssistant:",
-                "parameters": {"max_length": 150, "temperature": 0.7}
-            },
-           
-           timeout = 5
-        )
-
-
-
-        if response.status_code == 200:
-            result = response.json()
-            if isinstance(result, list) and len(result) > 0:
-                generated_text = result[0].get('generated_text', '')
-                if 'Assistant:' in generated_text:
-                    return generated_text.split('Assistant:')[-1].strip()
-                return generated_text.replace(f"User: {user_message}\nAssistant:", "").strip()
+        with timed("inference_hf_small"):
+            result = get_inference_client().post(
+                "hf_small",
+                {
+                    "inputs": f"User: {user_message}\nAssistant:",
+                    "parameters": {"max_length": 150, "temperature": 0.7}
+                },
+            )
+        if isinstance(result, list) and len(result) > 0:
+            generated_text = result[0].get('generated_text', '')
+            if 'Assistant:' in generated_text:
+                return generated_text.split('Assistant:')[-1].strip()
+            return generated_text.replace(f"User: {user_message}\nAssistant:", "").strip()
     except Exception as e:
         logger.warning(f"Simple API call failed: {e}")
-    
-    # 3. Final fallback to improved keyword system
-    return get_fallback_response(user_message)
\ No newline at end of file
+
+    # 3. Local DialoGPT served by the shared run_local_ai_worker process (if enabled)
+    with timed("inference_local_worker"):
+        local_response = local_worker.generate(user_message, urgent)
+    if local_response:
+        return local_response
+
+    return None
\ No newline at end of file
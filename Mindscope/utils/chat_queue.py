@@ -0,0 +1,231 @@
+"""
+Database-backed queue for chat replies.
+
+``chat_view`` saves the ChatMessage with no response and ``enqueue``s a
+ChatJob; ``manage.py run_chat_workers`` threads claim jobs, generate the reply
+and fill in ``response``, and the chat page polls ``api/chat/<id>/status/``.
+
+Claiming uses ``SELECT ... FOR UPDATE SKIP LOCKED`` where the database has it
+(PostgreSQL). SQLite has no row locks, so a worker reads the head of the queue
+and takes a job with a conditional UPDATE (``status`` still queued); losing
+that race just moves on to the next candidate.
+
+A failed attempt is retried after ``RETRY_DELAY`` seconds, doubling each time.
+After ``MAX_ATTEMPTS`` the job is dead-lettered: kept with status "dead" and
+its last error for the admin to inspect or requeue, and (``DEAD_LETTER_REPLY``)
+the user gets the keyword fallback reply, flagged as such. Running jobs whose
+lease expired, because their worker died, go back to the queue, unless they
+have used up their attempts: a message that keeps killing its worker is
+dead-lettered rather than handed to the next one.
+
+The queue is off unless ``ENABLED``: with it on and no worker running, messages
+would wait forever. A job that stays ready but unclaimed for
+``UNCLAIMED_WARNING`` seconds is logged (at most once a minute) and reported as
+``stalled`` to the polling page.
+"""
+import logging
+import os
+import socket
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import close_old_connections, connections, transaction
+from django.db.models import F
+from django.utils import timezone, translation
+
+from ..models import ChatJob, ChatMessage
+from . import conversation, crisis
+from .shared_cache import shared_cache
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    "ENABLED": False,  # True needs `manage.py run_chat_workers`; False generates replies inline
+    "WORKERS": 4,  # threads per run_chat_workers process
+    "MAX_ATTEMPTS": 3,
+    "RETRY_DELAY": 5,  # seconds before the first retry; doubles per attempt
+    "POLL_INTERVAL": 1.0,  # seconds an idle worker sleeps between claims
+    "LEASE_SECONDS": 120,  # must exceed the slowest generation (all backend timeouts)
+    "DEAD_LETTER_REPLY": True,  # answer dead-lettered messages with the keyword fallback
+    "UNCLAIMED_WARNING": 30,  # seconds a ready job may wait before it counts as stalled
+}
+
+STALLED_LOG_KEY = "chat-queue:stalled-logged"
+
+CLAIM_CANDIDATES = 8  # queue head read per attempt on databases without SKIP LOCKED
+
+
+class GenerationFailed(Exception):
+    pass
+
+
+def queue_settings():
+    return {**DEFAULTS, **getattr(settings, "CHAT_QUEUE", {})}
+
+
+def worker_name(index=0):
+    return f"{socket.gethostname()}:{os.getpid()}:{index}"
+
+
+def enqueue(chat, priority=0):
+    # the worker replies (and falls back) in the language the user had active
+    return ChatJob.objects.create(chat=chat, priority=priority, language=translation.get_language() or "")
+
+
+def _claimable(now):
+    return ChatJob.objects.filter(status=ChatJob.QUEUED, available_at__lte=now).order_by("-priority", "available_at", "id")
+
+
+def claim(worker_id):
+    """Take the next ready job for ``worker_id`` (status running, attempts + 1); None when idle."""
+    now = timezone.now()
+    if connections[ChatJob.objects.db].features.has_select_for_update_skip_locked:
+        with transaction.atomic():
+            job = _claimable(now).select_for_update(skip_locked=True).first()
+            if job is None:
+                return None
+            job.status, job.locked_by, job.locked_at = ChatJob.RUNNING, worker_id, now
+            job.attempts += 1
+            job.save(update_fields=["status", "locked_by", "locked_at", "attempts"])
+        return ChatJob.objects.select_related("chat__user").get(pk=job.pk)
+
+    for pk in _claimable(now).values_list("pk", flat=True)[:CLAIM_CANDIDATES]:
+        taken = ChatJob.objects.filter(pk=pk, status=ChatJob.QUEUED).update(
+            status=ChatJob.RUNNING, locked_by=worker_id, locked_at=now, attempts=F("attempts") + 1,
+        )
+        if taken:
+            return ChatJob.objects.select_related("chat__user").get(pk=pk)
+    return None
+
+
+def requeue_expired():
+    """
+    Put running jobs whose lease ran out back in the queue; returns how many
+    were requeued or dead-lettered. A job that has already used its
+    ``MAX_ATTEMPTS`` (its worker keeps dying on it) is dead-lettered instead.
+    """
+    options = queue_settings()
+    now = timezone.now()
+    expired = ChatJob.objects.filter(status=ChatJob.RUNNING, locked_at__lt=now - timedelta(seconds=options["LEASE_SECONDS"]))
+    dead = 0
+    for job in expired.filter(attempts__gte=options["MAX_ATTEMPTS"]).select_related("chat__user"):
+        # finish under the expired lease, so a worker that comes back to it loses
+        if _finish(job, job.locked_by, _dead_letter_reply(job), status=ChatJob.DEAD, last_error="lease expired"):
+            logger.error(f"Chat job {job.pk} dead-lettered after {job.attempts} attempts: lease expired")
+            dead += 1
+    count = expired.filter(attempts__lt=options["MAX_ATTEMPTS"]).update(
+        status=ChatJob.QUEUED, locked_by="", locked_at=None, available_at=now,
+    )
+    if count:
+        logger.warning(f"Requeued {count} chat job(s) with an expired lease")
+    return count + dead
+
+
+def _finish(job, worker_id, reply, **fields):
+    """Store ``reply`` and the job's final state, unless another worker has taken the job since."""
+    with transaction.atomic():
+        owned = ChatJob.objects.filter(pk=job.pk, status=ChatJob.RUNNING, locked_by=worker_id).update(
+            finished_at=timezone.now(), locked_at=None, **fields,
+        )
+        if not owned:
+            logger.warning(f"Chat job {job.pk} lost its lease before finishing; result dropped")
+            return False
+        if reply is not None:
+            ChatMessage.objects.filter(pk=job.chat_id).update(response=reply)
+    if reply is not None:
+        conversation.append_turn(job.chat.user, job.chat.message, reply)
+    return True
+
+
+def _fail(job, worker_id, error):
+    options = queue_settings()
+    if job.attempts < options["MAX_ATTEMPTS"]:
+        delay = options["RETRY_DELAY"] * 2 ** (job.attempts - 1)
+        ChatJob.objects.filter(pk=job.pk, status=ChatJob.RUNNING, locked_by=worker_id).update(
+            status=ChatJob.QUEUED, locked_by="", locked_at=None, last_error=error,
+            available_at=timezone.now() + timedelta(seconds=delay),
+        )
+        logger.warning(f"Chat job {job.pk} attempt {job.attempts} failed ({error}); retrying in {delay}s")
+        return
+
+    if _finish(job, worker_id, _dead_letter_reply(job), status=ChatJob.DEAD, last_error=error):
+        logger.error(f"Chat job {job.pk} dead-lettered after {job.attempts} attempts: {error}")
+
+
+def _dead_letter_reply(job):
+    if not queue_settings()["DEAD_LETTER_REPLY"]:
+        return None
+    from .fallback_responses import get_fallback_response
+
+    return get_fallback_response(job.chat.message)
+
+
+def process(job, worker_id):
+    """Generate the reply for a claimed job and record the outcome."""
+    from .chat_engine import generate_intelligent_response
+
+    chat = job.chat
+    try:
+        history = conversation.get_history(chat.user)
+        reply = generate_intelligent_response(
+            chat.message, history_messages=history, fallback=False, urgent=job.priority >= crisis.PRIORITY,
+        )
+        if not reply:
+            raise GenerationFailed("no model backend answered")
+    except Exception as e:
+        _fail(job, worker_id, f"{type(e).__name__}: {e}")
+        return
+    _finish(job, worker_id, reply, status=ChatJob.DONE, last_error="")
+
+
+def run_worker(worker_id, stop, drain=False):
+    """
+    Claim and process jobs until ``stop`` (a threading.Event) is set; with
+    ``drain`` return as soon as nothing is ready.
+    """
+    options = queue_settings()
+    try:
+        while not stop.is_set():
+            close_old_connections()
+            job = claim(worker_id)
+            if job is not None:
+                with translation.override(job.language or None):
+                    process(job, worker_id)
+                continue
+            if requeue_expired():
+                continue
+            if drain:
+                return
+            stop.wait(options["POLL_INTERVAL"])
+    finally:
+        connections.close_all()
+
+
+def status(chat_id, user):
+    """Polling payload for one of ``user``'s messages, or None if it is not theirs."""
+    row = (
+        ChatMessage.objects.filter(pk=chat_id, user=user)
+        .values("pk", "response", "job__pk", "job__status", "job__attempts", "job__available_at")
+        .first()
+    )
+    if row is None:
+        return None
+    # messages from before the queue (or generated inline) have no job
+    state = row["job__status"] or ChatJob.DONE
+    stalled = state == ChatJob.QUEUED and _unclaimed_for(row["job__available_at"]) > queue_settings()["UNCLAIMED_WARNING"]
+    if stalled and shared_cache().add(STALLED_LOG_KEY, True, 60):
+        logger.warning(
+            f"Chat job {row['job__pk']} has been ready for over {queue_settings()['UNCLAIMED_WARNING']}s "
+            f"without a worker claiming it; is `manage.py run_chat_workers` running?"
+        )
+    return {
+        "id": row["pk"],
+        "status": state,
+        "response": row["response"] if state in (ChatJob.DONE, ChatJob.DEAD) else None,
+        "attempts": row["job__attempts"] or 0,
+        "stalled": stalled,
+    }
+
+
+def _unclaimed_for(available_at):
+    return (timezone.now() - available_at).total_seconds() if available_at else 0
@@ -0,0 +1,28 @@
+"""
+``on_commit_once``: ``transaction.on_commit`` deduplicated by key within the
+current transaction, so follow-up work triggered once per row (a bulk delete,
+a run of edits) is queued once per user.
+"""
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+
+
+def on_commit_once(key, func, using=None):
+    """Run ``func`` when the transaction commits, unless ``key`` is already queued in it."""
+    connection = connections[using or DEFAULT_DB_ALIAS]
+    if not connection.in_atomic_block:
+        func()
+        return
+    # Django swaps in a fresh run_on_commit list whenever it runs or discards the
+    # hooks (commit, rollback), so keys recorded against an older list are stale
+    pending = getattr(connection, "_mindscope_once", None)
+    if pending is None or pending[0] is not connection.run_on_commit:
+        pending = connection._mindscope_once = (connection.run_on_commit, set())
+    keys = pending[1]
+    if key in keys:
+        return
+    keys.add(key)
+
+    def run():
+        keys.discard(key)
+        func()
+    transaction.on_commit(run, using=using)
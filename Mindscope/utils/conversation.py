@@ -0,0 +1,146 @@
+import logging
+import re
+from functools import lru_cache
+
+from django.conf import settings
+
+from .intent_matcher import classify
+from .shared_cache import shared_cache
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    "TOKENIZER": None,  # e.g. "microsoft/DialoGPT-large" for exact counts; None approximates
+    "TOKEN_BUDGET": 600,  # history tokens sent to the model
+    "MAX_TURN_TOKENS": 200,  # any single message is cut to this
+    "HISTORY_TURNS": 20,  # turns kept in the per-user cache
+    "SUMMARIZE": True,  # replace dropped turns with a one-line topic summary
+    "CACHE_TIMEOUT": 60 * 60,
+}
+
+_APPROX_TOKEN = re.compile(r"\w+|[^\w\s]")
+
+
+def context_settings():
+    return {**DEFAULTS, **getattr(settings, "CHAT_CONTEXT", {})}
+
+
+@lru_cache(maxsize=1)
+def _tokenizer(name):
+    if not name:
+        return None
+    try:
+        from transformers import AutoTokenizer
+
+        return AutoTokenizer.from_pretrained(name)
+    except Exception as e:
+        logger.warning(f"Tokenizer {name} unavailable, approximating token counts: {e}")
+        return None
+
+
+def preload():
+    """Load the configured tokenizer now (server/worker start-up) rather than on the first request."""
+    _tokenizer(context_settings()["TOKENIZER"])
+
+
+def count_tokens(text):
+    tokenizer = _tokenizer(context_settings()["TOKENIZER"])
+    if tokenizer is not None:
+        return len(tokenizer.encode(text))
+    # words and punctuation are a close enough stand-in for GPT-2 BPE tokens
+    return len(_APPROX_TOKEN.findall(text))
+
+
+def truncate_tokens(text, limit):
+    tokenizer = _tokenizer(context_settings()["TOKENIZER"])
+    if tokenizer is not None:
+        ids = tokenizer.encode(text)
+        return text if len(ids) <= limit else tokenizer.decode(ids[:limit]).strip() + " …"
+    matches = list(_APPROX_TOKEN.finditer(text))
+    return text if len(matches) <= limit else text[:matches[limit - 1].end()] + " …"
+
+
+def summarize_turns(turns):
+    """A compact stand-in for dropped turns: the topics the user raised, oldest first."""
+    topics = []
+    for turn in turns:
+        intent = classify(turn["content"]).name if turn["role"] == "user" else "default"
+        if intent != "default" and intent not in topics:
+            topics.append(intent.replace("_", " "))
+    if not topics:
+        return None
+    return f"Earlier in this conversation the user talked about: {', '.join(topics)}."
+
+
+def trim_history(history_messages, budget=None):
+    """
+    Keep the newest turns that fit in ``budget`` tokens (each capped at
+    MAX_TURN_TOKENS). Returns ``(kept_turns, summary)``; ``summary`` describes
+    the dropped older turns, or is None.
+    """
+    config = context_settings()
+    budget = config["TOKEN_BUDGET"] if budget is None else budget
+    kept = []
+    used = 0
+    history_messages = history_messages or []
+
+    for index in range(len(history_messages) - 1, -1, -1):
+        turn = history_messages[index]
+        content = truncate_tokens(turn["content"], config["MAX_TURN_TOKENS"])
+        cost = count_tokens(content)
+        if used + cost > budget:
+            dropped = history_messages[:index + 1]
+            summary = summarize_turns(dropped) if config["SUMMARIZE"] else None
+            return kept[::-1], summary
+        kept.append({"role": turn["role"], "content": content})
+        used += cost
+    return kept[::-1], None
+
+
+# ---------------- per-user history cache ----------------
+# Kept in the shared cache: web processes and chat workers all append to it.
+
+def _cache_key(user_id):
+    return f"chat-history:{user_id}"
+
+
+def _turns(message, response):
+    turns = [{"role": "user", "content": message}]
+    if response:
+        turns.append({"role": "assistant", "content": response})
+    return turns
+
+
+def get_history(user):
+    """The user's recent turns, oldest first, from cache (loaded from the DB on a miss)."""
+    history = shared_cache().get(_cache_key(user.pk))
+    if history is None:
+        from ..models import ChatMessage
+
+        config = context_settings()
+        # messages still waiting in the chat queue are not part of the conversation yet
+        recent = (
+            ChatMessage.objects.filter(user=user, response__isnull=False)
+            .order_by("-timestamp").values_list("message", "response")
+        )
+        history = []
+        for message, response in list(recent[:config["HISTORY_TURNS"]])[::-1]:
+            history.extend(_turns(message, response))
+        shared_cache().set(_cache_key(user.pk), history, config["CACHE_TIMEOUT"])
+    return history
+
+
+def append_turn(user, message, response):
+    """Record a new exchange in the cached history (no-op when nothing is cached yet)."""
+    config = context_settings()
+    key = _cache_key(user.pk)
+    cache = shared_cache()
+    history = cache.get(key)
+    if history is None:
+        return
+    history = (history + _turns(message, response))[-2 * config["HISTORY_TURNS"]:]
+    cache.set(key, history, config["CACHE_TIMEOUT"])
+
+
+def clear_history(user):
+    shared_cache().delete(_cache_key(user.pk))
@@ -0,0 +1,153 @@
+"""
+Crisis pre-classifier for chat messages.
+
+Runs before any network call: a message that matches the crisis lexicon
+(self-harm, suicidal intent) is answered at once with a fixed, localized
+crisis-resource reply instead of waiting on the models. The lexicon is
+compiled into one regex at import, like ``intent_matcher``, so a check costs
+a few microseconds. It errs on the side of flagging: negations ("I'm not
+suicidal") are flagged too.
+
+A user who sent a flagged message stays marked for ``WINDOW`` seconds, and
+their follow-up messages go to the front of the chat queue. The mark lives in
+the shared cache, so every web process sees it.
+
+``SCORER`` may name a local classifier, ``callable(message) -> float`` in
+[0, 1], consulted only when the lexicon found nothing; its cost comes on top
+of the lexicon's.
+"""
+import logging
+import re
+from collections import namedtuple
+from functools import lru_cache
+
+from django.conf import settings
+from django.utils import translation
+from django.utils.module_loading import import_string
+
+from .intent_matcher import _trie_pattern
+from .shared_cache import shared_cache
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    "ENABLED": True,
+    "WINDOW": 60 * 60,  # seconds a flagged user's messages keep queue priority
+    "SCORER": None,  # dotted path to a local classifier
+    "THRESHOLD": 0.8,  # SCORER score that counts as a crisis
+    "RESPONSES": {},  # per-language overrides of CRISIS_RESPONSES
+}
+
+PRIORITY = 100  # ChatJob.priority for flagged users' messages (normal is 0)
+
+CrisisMatch = namedtuple("CrisisMatch", ["source", "term"])
+
+# Whole words against the normalized message (lowercase, punctuation removed,
+# so "don't" -> "dont" and "self-harm" -> "selfharm"); a trailing "*" makes a stem.
+LEXICON = [
+    "suicid*", "kill myself", "killing myself", "end my life", "ending my life", "end it all",
+    "take my own life", "taking my own life", "want to die", "wanna die", "wish i was dead",
+    "wish i were dead", "better off dead", "no reason to live", "dont want to live",
+    "dont want to be alive", "not worth living", "hurt myself", "hurting myself", "harm myself",
+    "harming myself", "selfharm*", "self harm*", "cut myself", "cutting myself", "hang myself",
+    "overdos*",
+    # Bengali
+    "আত্মহত্যা", "আত্মহত্যার", "মরে যেতে চাই", "মরতে চাই", "বাঁচতে চাই না", "নিজেকে শেষ করে",
+    "নিজের ক্ষতি", "নিজেকে আঘাত",
+]
+
+CRISIS_RESPONSES = {
+    "en": (
+        "I'm really concerned about what you're going through, and I'm glad you told me. "
+        "You don't have to face this alone. If you might act on these thoughts or are in "
+        "danger, please call your local emergency number now (for example 999 in Bangladesh "
+        "and the UK, 911 in the US, 112 in the EU), or in the US call or text 988. Please also "
+        "reach out to someone you trust or a mental health professional. I'm an AI assistant "
+        "and can't provide emergency help, but I'm here to keep talking with you."
+    ),
+    "bn": (
+        "আপনি যা অনুভব করছেন তা শুনে আমি সত্যিই চিন্তিত, এবং আমাকে জানানোর জন্য ধন্যবাদ। "
+        "আপনি একা নন। আপনি যদি নিজের ক্ষতি করার কথা ভাবেন বা বিপদে থাকেন, অনুগ্রহ করে এখনই "
+        "জরুরি সেবায় কল করুন (বাংলাদেশে ৯৯৯)। আপনার বিশ্বস্ত কারো সাথে বা একজন মানসিক "
+        "স্বাস্থ্য বিশেষজ্ঞের সাথে কথা বলুন। আমি একটি এআই সহকারী, জরুরি সাহায্য দিতে পারি না, "
+        "তবে আমি আপনার সাথে কথা বলার জন্য এখানে আছি।"
+    ),
+}
+
+# Python's \w leaves out Bengali vowel signs, so words and boundaries include the block explicitly
+_WORD = r"\w\u0980-\u09FF"
+_PUNCTUATION = re.compile(rf"[^{_WORD}\s]")
+_END = "<end>"
+_STEM = "<stem>"
+
+
+def _compile(terms):
+    trie = {}
+    for term in terms:
+        node = trie
+        for char in term.rstrip("*"):
+            node = node.setdefault(char, {})
+        node[_STEM if term.endswith("*") else _END] = True
+    return re.compile(rf"(?<![{_WORD}])" + _trie_pattern(trie) + rf"(?![{_WORD}])")
+
+
+_PATTERN = _compile(LEXICON)
+
+
+def crisis_settings():
+    return {**DEFAULTS, **getattr(settings, "CRISIS_DETECTION", {})}
+
+
+def normalize(message):
+    return _PUNCTUATION.sub("", message.lower())
+
+
+@lru_cache(maxsize=1)
+def _scorer(path):
+    return import_string(path)
+
+
+def detect(message):
+    """``CrisisMatch(source, term)`` when ``message`` reads as a crisis, else None."""
+    if not message or not isinstance(message, str):
+        return None
+    options = crisis_settings()
+    if not options["ENABLED"]:
+        return None
+    found = _PATTERN.search(normalize(message))
+    if found:
+        return CrisisMatch("lexicon", found.group(0))
+    if options["SCORER"]:
+        try:
+            score = _scorer(options["SCORER"])(message)
+        except Exception as e:
+            logger.warning(f"Crisis scorer failed: {e}")
+            return None
+        if score >= options["THRESHOLD"]:
+            return CrisisMatch("scorer", round(score, 3))
+    return None
+
+
+@lru_cache(maxsize=None)
+def _response_for(language):
+    responses = {**CRISIS_RESPONSES, **crisis_settings()["RESPONSES"]}
+    return responses.get(language) or responses[settings.LANGUAGE_CODE.split("-")[0]]
+
+
+def crisis_response(language=None):
+    """The crisis-resource reply in ``language`` (default: the active language)."""
+    language = language or translation.get_language() or settings.LANGUAGE_CODE
+    return _response_for(language.split("-")[0])
+
+
+def _flag_key(user_id):
+    return f"crisis-flag:{user_id}"
+
+
+def flag_user(user):
+    shared_cache().set(_flag_key(user.pk), True, crisis_settings()["WINDOW"])
+
+
+def priority_for(user):
+    """Chat queue priority for ``user``'s next message."""
+    return PRIORITY if shared_cache().get(_flag_key(user.pk)) else 0
@@ -0,0 +1,46 @@
+"""
+Row-count estimates for admin changelists on large tables.
+
+``EstimatedCountPaginator`` reports the planner's row estimate for unfiltered
+listings (``pg_class.reltuples`` on PostgreSQL, ``sqlite_stat1`` after
+``ANALYZE`` on SQLite) and caps exact counts of filtered listings, so a page
+load never has to COUNT(*) millions of rows.
+"""
+from django.core.paginator import Paginator
+from django.db import DatabaseError, connections
+from django.utils.functional import cached_property
+
+EXACT_COUNT_LIMIT = 10_000
+
+
+def estimated_row_count(model, using="default"):
+    """Planner estimate of the table size, or None when no statistics exist."""
+    connection = connections[using]
+    table = model._meta.db_table
+    try:
+        with connection.cursor() as cursor:
+            if connection.vendor == "postgresql":
+                cursor.execute("SELECT reltuples::bigint FROM pg_class WHERE relname = %s", [table])
+            elif connection.vendor == "sqlite":
+                cursor.execute("SELECT stat FROM sqlite_stat1 WHERE tbl = %s LIMIT 1", [table])
+            else:
+                return None
+            row = cursor.fetchone()
+    except DatabaseError:
+        return None  # sqlite_stat1 only exists once ANALYZE has run
+    if not row or row[0] is None:
+        return None
+    estimate = int(str(row[0]).split()[0])
+    return estimate if estimate >= 0 else None
+
+
+class EstimatedCountPaginator(Paginator):
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        if not queryset.query.where:
+            estimate = estimated_row_count(queryset.model, queryset.db)
+            if estimate is not None and estimate > EXACT_COUNT_LIMIT:
+                return estimate
+        # filtered listings beyond the limit page through the first EXACT_COUNT_LIMIT rows
+        return queryset[:EXACT_COUNT_LIMIT].count()
@@ -0,0 +1,135 @@
+"""
+Streaming export of a user's moods, screenings and chats as NDJSON or CSV.
+
+Rows are read with ``values_list(...).iterator(chunk_size=...)`` and encoded
+one line at a time, optionally through an incremental gzip compressor, so
+memory stays flat no matter how much history a user has.
+
+Under ASGI, Django drains a sync iterator with ``sync_to_async(list)`` before
+sending anything, so ``response_body`` hands ASGI requests an async wrapper
+that pulls the stream in bounded batches instead.
+"""
+import csv
+import io
+import json
+import zlib
+
+from asgiref.sync import sync_to_async
+from django.core.handlers.asgi import ASGIRequest
+
+from ..models import ChatArchiveSegment, ChatMessage, MoodEntry, Screening
+
+CHUNK_SIZE = 2000
+
+COLUMNS = [
+    "kind", "username", "id", "timestamp",
+    "mood", "score", "influencers", "notes",
+    "screening_type", "severity",
+    "message", "response",
+]
+
+# kind -> (model, timestamp field, exported fields)
+SOURCES = [
+    ("mood", MoodEntry, "date_logged", ["mood", "score", "influencers", "notes"]),
+    ("screening", Screening, "date_taken", ["screening_type", "score", "severity"]),
+    ("chat", ChatMessage, "timestamp", ["message", "response"]),
+]
+
+
+def iter_records(users):
+    """Yield one dict per row for each user in ``users`` (an iterable of User)."""
+    for user in users:
+        # archived chats are older than anything still in ChatMessage
+        segments = ChatArchiveSegment.objects.filter(user_id=user.pk).order_by("first_timestamp", "pk")
+        for segment in segments.iterator(chunk_size=1):
+            for chat in segment.messages():
+                yield {
+                    "kind": "chat", "username": user.username, "id": chat.id,
+                    "timestamp": chat.timestamp.isoformat(), "message": chat.message, "response": chat.response,
+                }
+
+        for kind, model, ts_field, fields in SOURCES:
+            rows = (
+                model.objects.filter(user_id=user.pk)
+                .order_by(ts_field, "pk")
+                .values_list("pk", ts_field, *fields)
+                .iterator(chunk_size=CHUNK_SIZE)
+            )
+            for pk, timestamp, *values in rows:
+                record = {"kind": kind, "username": user.username, "id": pk, "timestamp": timestamp.isoformat()}
+                record.update(zip(fields, values))
+                yield record
+
+
+def iter_ndjson(records):
+    for record in records:
+        yield json.dumps(record, ensure_ascii=False) + "\n"
+
+
+def iter_csv(records):
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=COLUMNS, restval="")
+    writer.writeheader()
+    for record in records:
+        writer.writerow(record)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    yield buffer.getvalue()
+
+
+def iter_gzip(chunks, flush_every=64 * 1024):
+    """Gzip a stream of text chunks on the fly, yielding compressed bytes."""
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)  # wbits=31: gzip container
+    pending = 0
+    for chunk in chunks:
+        data = chunk.encode("utf-8")
+        pending += len(data)
+        out = compressor.compress(data)
+        if pending >= flush_every:
+            out += compressor.flush(zlib.Z_SYNC_FLUSH)
+            pending = 0
+        if out:
+            yield out
+    yield compressor.flush()
+
+
+def iter_export(users, fmt="ndjson", compress=False):
+    """Encoded export stream (text chunks, or bytes when ``compress``)."""
+    encode = {"ndjson": iter_ndjson, "csv": iter_csv}[fmt]
+    chunks = encode(iter_records(users))
+    return iter_gzip(chunks) if compress else chunks
+
+
+async def aiter_chunks(chunks, batch_bytes=64 * 1024):
+    """Async iterator over a sync chunk stream, about ``batch_bytes`` per thread hop."""
+    chunks = iter(chunks)
+
+    def next_batch():
+        batch, size = [], 0
+        for chunk in chunks:
+            batch.append(chunk)
+            size += len(chunk)
+            if size >= batch_bytes:
+                break
+        return batch
+
+    # thread_sensitive (the default): every batch runs on the thread that opened the cursors
+    while batch := await sync_to_async(next_batch)():
+        for chunk in batch:
+            yield chunk
+
+
+def response_body(request, chunks):
+    """``chunks`` as StreamingHttpResponse content that stays streamed under WSGI and ASGI."""
+    return aiter_chunks(chunks) if isinstance(request, ASGIRequest) else chunks
+
+
+def filename(stem, fmt, compress):
+    return f"{stem}.{fmt}" + (".gz" if compress else "")
+
+
+def content_type(fmt, compress):
+    if compress:
+        return "application/gzip"
+    return "application/x-ndjson" if fmt == "ndjson" else "text/csv"
@@ -0,0 +1,218 @@
+"""
+Full-text search over chat messages and mood notes.
+
+Migrations 0009/0010 build the indexes: FTS5 external-content tables kept in
+sync by triggers on SQLite, GIN ``to_tsvector`` expression indexes on
+PostgreSQL. Anything else (or a SQLite build without FTS5) falls back to
+``icontains``.
+
+``filter_queryset`` narrows an admin queryset; ``search`` returns one user's
+ranked, highlighted hits a page at a time. On SQLite the user filter is an
+indexed FTS5 column, ranking is FTS5's ``rank`` (column-weighted bm25) and
+snippets are built only for the page. bm25's IDF walks each term's doclist,
+so a term found in most rows of the table costs O(rows containing it).
+"""
+import re
+from collections import namedtuple
+
+from django.db import connections
+from django.db.models import BooleanField, FloatField, Q, TextField
+from django.db.models.expressions import RawSQL
+from django.utils.html import escape
+from django.utils.safestring import mark_safe
+
+from ..models import ChatMessage, MoodEntry
+
+SOURCES = {
+    "chat": {
+        "model": ChatMessage,
+        "fields": ("message", "response"),
+        "timestamp": "timestamp",
+        "fts_table": "mindscope_chat_fts",
+        "bm25": "bm25(1.0, 0.5, 0.0)",  # the user's own words weigh most; user_id not at all
+        "text": "coalesce({t}.message, '') || ' ' || coalesce({t}.response, '')",
+    },
+    "mood": {
+        "model": MoodEntry,
+        "fields": ("notes",),
+        "timestamp": "date_logged",
+        "fts_table": "mindscope_mood_fts",
+        "bm25": "bm25(1.0, 0.0)",
+        "text": "coalesce({t}.notes, '')",
+    },
+}
+
+SNIPPET_TOKENS = 12
+# control characters cannot appear in escaped output, so they mark matches safely
+_START, _STOP = "\x02", "\x03"
+HEADLINE_OPTIONS = f"StartSel={_START}, StopSel={_STOP}, MaxWords=20, MinWords=8, MaxFragments=1"
+
+SearchHit = namedtuple("SearchHit", ["kind", "id", "timestamp", "rank", "snippet"])
+
+_TOKEN = re.compile(r"\w+", re.UNICODE)
+_backends = {}
+
+
+def backend(using="default"):
+    """"fts5", "postgres" or None for the given database alias."""
+    if using not in _backends:
+        connection = connections[using]
+        found = None
+        if connection.vendor == "postgresql":
+            found = "postgres"
+        elif connection.vendor == "sqlite":
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = %s",
+                    [SOURCES["chat"]["fts_table"]],
+                )
+                found = "fts5" if cursor.fetchone() else None
+        _backends[using] = found
+    return _backends[using]
+
+
+def fts_query(term, kind, user_id=None):
+    """
+    User input -> FTS5 MATCH string over the text columns of ``kind``: every
+    word must match (porter stemming covers plurals and tenses). ``user_id``
+    adds an indexed filter.
+    """
+    tokens = _TOKEN.findall(term)
+    if not tokens:
+        return None
+    columns = " ".join(SOURCES[kind]["fields"])
+    phrases = " ".join(f'"{token}"' for token in tokens)
+    query = f"{{{columns}}} : ({phrases})"
+    if user_id is not None:
+        query = f'user_id : "{int(user_id)}" AND {query}'
+    return query
+
+
+def _sql(kind, key):
+    table = connections["default"].ops.quote_name(SOURCES[kind]["model"]._meta.db_table)
+    return SOURCES[kind][key].format(t=table)
+
+
+def _tsvector(kind):
+    return f"to_tsvector('english', {_sql(kind, 'text')})"
+
+
+def highlight(snippet):
+    """Escape a raw snippet and turn the match markers into ``<mark>`` tags."""
+    html = escape(snippet).replace(_START, "<mark>").replace(_STOP, "</mark>")
+    return mark_safe(html)
+
+
+def filter_queryset(queryset, kind, term):
+    """Restrict ``queryset`` (of the ``kind`` model) to rows whose text matches ``term``."""
+    source = SOURCES[kind]
+    found = backend(queryset.db)
+    if found == "fts5":
+        query = fts_query(term, kind)
+        if query is None:
+            return queryset.none()
+        table = source["fts_table"]
+        return queryset.filter(pk__in=RawSQL(f"SELECT rowid FROM {table} WHERE {table} MATCH %s", [query]))
+    if found == "postgres":
+        match = RawSQL(f"{_tsvector(kind)} @@ websearch_to_tsquery('english', %s)", [term], output_field=BooleanField())
+        return queryset.alias(fulltext_match=match).filter(fulltext_match=True)
+    condition = Q()
+    for field in source["fields"]:
+        condition |= Q(**{f"{field}__icontains": term})
+    return queryset.filter(condition)
+
+
+def _search_fts5(user, term, kind, offset, limit):
+    source = SOURCES[kind]
+    query = fts_query(term, kind, user.pk)
+    if query is None:
+        return []
+    fts = source["fts_table"]
+    snippets = ", ".join(
+        f"snippet({fts}, {i}, %s, %s, '…', {SNIPPET_TOKENS})" for i in range(len(source["fields"]))
+    )
+    # ORDER BY rank is sorted inside FTS5, so snippet() only runs for the returned page
+    with connections["default"].cursor() as cursor:
+        cursor.execute(
+            f"SELECT rowid, rank, {snippets} FROM {fts} WHERE {fts} MATCH %s AND rank MATCH %s "
+            f"ORDER BY rank LIMIT %s OFFSET %s",
+            [_START, _STOP] * len(source["fields"]) + [query, source["bm25"], limit, offset],
+        )
+        rows = cursor.fetchall()
+    if not rows:
+        return []
+    timestamps = dict(
+        source["model"].objects.filter(pk__in=[row[0] for row in rows]).values_list("pk", source["timestamp"])
+    )
+    hits = []
+    for pk, rank, *columns in rows:
+        if pk in timestamps:
+            # first column with a highlighted match, else the first column
+            snippet = next((c for c in columns if c and _START in c), columns[0] or "")
+            hits.append(SearchHit(kind, pk, timestamps[pk], -rank, highlight(snippet)))
+    return hits
+
+
+def _search_postgres(user, term, kind, offset, limit):
+    source = SOURCES[kind]
+    tsquery = "websearch_to_tsquery('english', %s)"
+    rows = (
+        filter_queryset(source["model"].objects.filter(user=user), kind, term)
+        .annotate(
+            rank=RawSQL(f"ts_rank({_tsvector(kind)}, {tsquery})", [term], output_field=FloatField()),
+            snippet=RawSQL(
+                f"ts_headline('english', {_sql(kind, 'text')}, {tsquery}, %s)",
+                [term, HEADLINE_OPTIONS], output_field=TextField(),
+            ),
+        )
+        .order_by("-rank", "-pk")
+        .values_list("pk", source["timestamp"], "rank", "snippet")[offset:offset + limit]
+    )
+    return [SearchHit(kind, pk, ts, rank, highlight(snippet)) for pk, ts, rank, snippet in rows]
+
+
+def _plain_snippet(text, term, width=60):
+    text = text or ""
+    at = text.lower().find(term.lower())
+    if at < 0:
+        return text[:width * 2]
+    start = max(0, at - width)
+    return (
+        ("…" if start else "") + text[start:at] + _START + text[at:at + len(term)] + _STOP
+        + text[at + len(term):at + len(term) + width] + ("…" if at + len(term) + width < len(text) else "")
+    )
+
+
+def _search_plain(user, term, kind, offset, limit):
+    source = SOURCES[kind]
+    rows = (
+        filter_queryset(source["model"].objects.filter(user=user), kind, term)
+        .order_by(f"-{source['timestamp']}", "-pk")[offset:offset + limit]
+    )
+    hits = []
+    for row in rows:
+        text = next((getattr(row, f) for f in source["fields"] if term.lower() in (getattr(row, f) or "").lower()), "")
+        hits.append(SearchHit(kind, row.pk, getattr(row, source["timestamp"]), 0.0, highlight(_plain_snippet(text, term))))
+    return hits
+
+
+def search(user, term, kinds=("chat", "mood"), page=1, page_size=20):
+    """
+    One page of ``user``'s hits for ``term`` across ``kinds``, best first.
+    Returns ``(hits, has_next)``.
+    """
+    term = term.strip()
+    if not term:
+        return [], False
+    run = {"fts5": _search_fts5, "postgres": _search_postgres}.get(backend(), _search_plain)
+    offset = (page - 1) * page_size
+    if len(kinds) == 1:
+        hits = run(user, term, kinds[0], offset, page_size + 1)
+    else:
+        # each kind's top offset + page_size + 1 contains every hit of the merged page
+        hits = []
+        for kind in kinds:
+            hits.extend(run(user, term, kind, 0, offset + page_size + 1))
+        hits.sort(key=lambda hit: (hit.rank, hit.timestamp), reverse=True)
+        hits = hits[offset:]
+    return hits[:page_size], len(hits) > page_size
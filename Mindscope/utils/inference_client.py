@@ -0,0 +1,182 @@
+import logging
+import threading
+import time
+
+from django.conf import settings
+
+try:
+    import requests
+    from requests.adapters import HTTPAdapter
+    from urllib3.util.retry import Retry
+    REQUESTS_AVAILABLE = True
+except ImportError:
+    REQUESTS_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+# Defaults; override any key per backend with settings.INFERENCE_BACKENDS
+# (e.g. point "url" at a local stub server in development).
+DEFAULT_BACKENDS = {
+    "hf_large": {
+        "url": "https://api-inference.huggingface.co/models/microsoft/DialoGPT-large",
+        "timeout": 15,
+        "connect_timeout": 3,
+    },
+    "hf_small": {
+        "url": "https://api-inference.huggingface.co/models/microsoft/DialoGPT-small",
+        "timeout": 5,
+        "connect_timeout": 3,
+    },
+}
+DEFAULT_FAILURE_THRESHOLD = 3
+DEFAULT_COOLDOWN = 30  # seconds a tripped backend is skipped
+
+
+class BackendUnavailable(Exception):
+    """Raised when a backend is skipped (open circuit) or its call fails."""
+
+
+class CircuitBreaker:
+    """
+    Classic closed/open/half-open breaker. After ``failure_threshold`` consecutive
+    failures the backend is skipped for ``cooldown`` seconds; the first call after
+    that is a trial, and its outcome closes or re-opens the circuit.
+    """
+
+    def __init__(self, failure_threshold=DEFAULT_FAILURE_THRESHOLD, cooldown=DEFAULT_COOLDOWN, clock=time.monotonic):
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.clock = clock
+        self.failures = 0
+        self.opened_at = None
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self):
+        if self.opened_at is None:
+            return "closed"
+        if self.clock() - self.opened_at >= self.cooldown:
+            return "half_open"
+        return "open"
+
+    def allow(self):
+        with self._lock:
+            state = self.state
+            if state == "closed":
+                return True
+            if state == "half_open" and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self._trial_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            self._trial_in_flight = False
+            if self.failures >= self.failure_threshold or self.opened_at is not None:
+                self.opened_at = self.clock()
+
+    def release(self):
+        """End a call without an outcome (the caller went away); a pending trial can be retried."""
+        with self._lock:
+            self._trial_in_flight = False
+
+
+class InferenceBackend:
+    def __init__(self, name, url, timeout, connect_timeout=3,
+                 failure_threshold=DEFAULT_FAILURE_THRESHOLD, cooldown=DEFAULT_COOLDOWN):
+        self.name = name
+        self.url = url
+        self.timeout = timeout
+        self.connect_timeout = connect_timeout
+        self.breaker = CircuitBreaker(failure_threshold, cooldown)
+
+    def __repr__(self):
+        return f"<InferenceBackend {self.name} {self.breaker.state}>"
+
+
+class InferenceClient:
+    """
+    Shared, thread-safe client for the text-generation backends. One pooled
+    keep-alive ``requests.Session`` is reused for every call, so only the first
+    message pays for the TCP/TLS handshake.
+    """
+
+    def __init__(self, backends, pool_size=10):
+        self.backends = {
+            name: InferenceBackend(name, **config) for name, config in backends.items()
+        }
+        self.session = None
+        if REQUESTS_AVAILABLE:
+            self.session = requests.Session()
+            # retry connection setup only; a slow generation is never re-sent
+            retry = Retry(total=1, connect=1, read=0, status=0, backoff_factor=0.1)
+            adapter = HTTPAdapter(pool_connections=len(self.backends), pool_maxsize=pool_size, max_retries=retry)
+            self.session.mount("https://", adapter)
+            self.session.mount("http://", adapter)
+
+    def backend(self, name):
+        return self.backends[name]
+
+    def post(self, name, payload, headers=None):
+        """POST ``payload`` to backend ``name`` and return the decoded JSON body."""
+        backend = self.backends[name]
+        if self.session is None:
+            raise BackendUnavailable("requests library not installed")
+        if not backend.breaker.allow():
+            raise BackendUnavailable(f"{name} circuit open")
+
+        try:
+            response = self.session.post(
+                backend.url,
+                headers=headers,
+                json=payload,
+                timeout=(backend.connect_timeout, backend.timeout),
+            )
+            response.raise_for_status()
+            result = response.json()
+        except Exception as e:
+            backend.breaker.record_failure()
+            logger.warning(f"Inference backend {name} failed: {e}")
+            raise BackendUnavailable(f"{name}: {e}") from e
+
+        backend.breaker.record_success()
+        return result
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def _backend_config():
+    overrides = getattr(settings, "INFERENCE_BACKENDS", {})
+    config = {}
+    for name in set(DEFAULT_BACKENDS) | set(overrides):
+        config[name] = {**DEFAULT_BACKENDS.get(name, {}), **overrides.get(name, {})}
+    return config
+
+
+def get_inference_client():
+    """Return the process-wide InferenceClient, creating it on first use."""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = InferenceClient(_backend_config())
+    return _client
+
+
+def reset_inference_client():
+    """Drop the shared client (e.g. after changing settings.INFERENCE_BACKENDS)."""
+    global _client
+    with _client_lock:
+        if _client is not None and _client.session is not None:
+            _client.session.close()
+        _client = None
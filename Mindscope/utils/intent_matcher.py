@@ -0,0 +1,138 @@
+import re
+from collections import namedtuple
+from functools import lru_cache
+
+Intent = namedtuple("Intent", ["name", "confidence"])
+
+Rule = namedtuple("Rule", ["intent", "priority", "terms", "exact"])
+
+# Lower priority number wins. Terms are matched on whole words against the
+# normalized message (lowercase, punctuation removed); a trailing "*" makes a
+# term a stem ("depress*" matches "depressed", "depression").
+RULES = [
+    Rule("exercise", 0, ["exercis*", "workout*", "physical", "fitness", "yoga", "stretch*"], False),
+
+    # quick topic buttons on the chat page
+    Rule("sleep", 1, ["im having trouble sleeping"], True),
+    Rule("anxious", 1, ["im feeling anxious"], True),
+    Rule("stress", 1, ["i need help with stress management"], True),
+    Rule("lonely", 1, ["im feeling lonely"], True),
+    Rule("work", 1, ["i have work stress"], True),
+    Rule("relationship", 1, ["i have a relationship issue"], True),
+
+    Rule("greeting", 10, ["hi", "hello", "hey", "hola", "greetings", "good morning", "good afternoon"], False),
+    Rule("how_are_you", 11, ["how are you", "how do you do", "hows it going"], False),
+    Rule("name", 12, ["who are you", "whats your name", "what is your name"], False),
+    Rule("help", 13, ["help*", "what can you do", "how do you work", "what should i do"], False),
+    Rule("thanks", 14, ["thank*", "appreciat*", "grateful"], False),
+    Rule("goodbye", 15, ["bye", "goodbye", "see you", "talk later"], False),
+
+    # emotional states
+    Rule("anxious", 20, ["anxious", "anxiety", "worr*", "nervous", "panic*"], False),
+    Rule("sleep", 21, ["sleep*", "tired", "insomnia", "awake", "cant sleep"], False),
+    Rule("stress", 22, ["stress*", "pressure"], False),
+    Rule("lonely", 23, ["lonel*", "alone", "isolat*", "no friends"], False),
+    Rule("work", 24, ["work", "working", "job*", "career*", "boss*", "colleague*", "office"], False),
+    Rule("relationship", 25, ["relationship*", "partner*", "friend*", "family", "boyfriend*", "girlfriend*", "husband*", "wife"], False),
+    Rule("sad", 26, ["sad*", "depress*", "unhappy", "miserable", "down", "blue"], False),
+    Rule("angry", 27, ["angry", "mad", "frustrat*", "annoy*", "furious", "irritat*"], False),
+    Rule("overwhelm", 28, ["overwhelm*", "too much", "cant handle", "drowning"], False),
+]
+
+DEFAULT_INTENT = Intent("default", 0.0)
+
+_PUNCTUATION = re.compile(r"[^\w\s]")
+_END = "<end>"
+_STEM = "<stem>"
+
+
+def _trie_pattern(node):
+    """Render a character trie as a regex; shared prefixes are matched only once."""
+    alternatives = [
+        (r"\s+" if char == " " else re.escape(char)) + _trie_pattern(child)
+        for char, child in sorted(node.items())
+        if len(char) == 1
+    ]
+    if _STEM in node:
+        alternatives.append(r"\w*")
+    if not alternatives:
+        return ""
+    body = alternatives[0] if len(alternatives) == 1 else "(?:" + "|".join(alternatives) + ")"
+    # greedy optional: try the longer term first, fall back to the one ending here
+    return f"(?:{body})?" if _END in node else body
+
+
+def _compile(rules):
+    """
+    Compile every rule's terms into one word-bounded regex built from a
+    character trie, so a message is classified in a single C-level scan.
+    The matched text maps back to its rule through the ``terms``/``stems``
+    dicts.
+    """
+    trie = {}
+    terms = {}
+    stems = {}
+    for rule_index, rule in enumerate(rules):
+        for term in rule.terms:
+            stem = term.endswith("*")
+            text = term.rstrip("*")
+            (stems if stem else terms).setdefault(text, rule_index)
+            node = trie
+            for char in text:
+                node = node.setdefault(char, {})
+            node[_STEM if stem else _END] = True
+    pattern = re.compile(r"\b" + _trie_pattern(trie) + r"\b")
+    stem_lengths = sorted({len(stem) for stem in stems}, reverse=True)
+    return pattern, terms, stems, stem_lengths
+
+
+_PATTERN, _TERMS, _STEMS, _STEM_LENGTHS = _compile(RULES)
+
+
+def normalize(message):
+    # apostrophes (straight or curly) are dropped too: "I’m" -> "im", "can't" -> "cant"
+    return _PUNCTUATION.sub("", message.lower())
+
+
+@lru_cache(maxsize=8192)
+def _rule_for(text):
+    text = " ".join(text.split())
+    rule_index = _TERMS.get(text)
+    if rule_index is not None:
+        return rule_index
+    for length in _STEM_LENGTHS:
+        if length <= len(text):
+            rule_index = _STEMS.get(text[:length])
+            if rule_index is not None:
+                return rule_index
+    return None
+
+
+def classify(message):
+    """
+    Classify ``message`` in a single regex pass.
+
+    Returns an ``Intent(name, confidence)``. Quick-topic phrases score 1.0;
+    keyword matches score by the share of hits belonging to the winning rule,
+    capped at 0.9. Messages with no hits get ``DEFAULT_INTENT``.
+    """
+    if not message or not isinstance(message, str):
+        return DEFAULT_INTENT
+
+    matches = _PATTERN.findall(normalize(message))
+    if not matches:
+        return DEFAULT_INTENT
+    if len(matches) == 1:
+        rule = RULES[_rule_for(matches[0])]
+        return Intent(rule.intent, 1.0 if rule.exact else 0.9)
+
+    hits = {}
+    for text in matches:
+        rule_index = _rule_for(text)
+        hits[rule_index] = hits.get(rule_index, 0) + 1
+
+    best = RULES[min(hits, key=lambda rule_index: RULES[rule_index].priority)]
+    if best.exact:
+        return Intent(best.intent, 1.0)
+    same_intent = sum(count for rule_index, count in hits.items() if RULES[rule_index].intent == best.intent)
+    return Intent(best.intent, round(0.9 * same_intent / sum(hits.values()), 2))
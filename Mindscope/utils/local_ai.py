@@ -1,53 +1,92 @@
 # Mindscope/utils/local_ai.py
-from transformers import pipeline
-import torch
 import logging
+import threading
 
 logger = logging.getLogger(__name__)
 
+DEFAULT_MODEL = "microsoft/DialoGPT-small"
+
+
+def _prompt(user_message):
+    return f"User: {user_message}\nAssistant:"
+
+
+def _extract_reply(full_text, prompt):
+    # Extract just the assistant's part
+    if 'Assistant:' in full_text:
+        return full_text.split('Assistant:')[-1].strip()
+    return full_text.replace(prompt, '').strip()
+
+
 class LocalAIChat:
-    def __init__(self):
+    """
+    CPU text-generation pipeline that is only built on first use, so importing
+    this module no longer pays for torch and the model weights. Run it inside
+    the ``run_local_ai_worker`` process to share one warm copy between all
+    Django workers.
+    """
+
+    def __init__(self, model_name=DEFAULT_MODEL):
+        self.model_name = model_name
         self.chatbot = None
-        try:
-            # Use a small, fast model
-            self.chatbot = pipeline(
-                "text-generation",
-                model="microsoft/DialoGPT-small",
-                device=-1  # Use CPU (no GPU needed)
-            )
-            logger.info("Local AI model loaded successfully")
-        except Exception as e:
-            logger.warning(f"Could not load local model: {e}")
-    
+        self.load_error = None
+        self._lock = threading.Lock()
+
+    @property
+    def ready(self):
+        return self.chatbot is not None
+
+    def load(self):
+        """Build the pipeline once; returns True when the model is usable."""
+        if self.chatbot is not None or self.load_error is not None:
+            return self.ready
+        with self._lock:
+            if self.chatbot is None and self.load_error is None:
+                try:
+                    from transformers import pipeline
+
+                    # Use a small, fast model
+                    chatbot = pipeline(
+                        "text-generation",
+                        model=self.model_name,
+                        device=-1  # Use CPU (no GPU needed)
+                    )
+                    # DialoGPT has no pad token; batches are left-padded with EOS
+                    chatbot.tokenizer.pad_token = chatbot.tokenizer.eos_token
+                    chatbot.tokenizer.padding_side = "left"
+                    self.chatbot = chatbot
+                    logger.info("Local AI model loaded successfully")
+                except Exception as e:
+                    self.load_error = e
+                    logger.warning(f"Could not load local model: {e}")
+        return self.ready
+
     def generate_response(self, user_message):
-        if not self.chatbot:
-            return None
-        
+        return self.generate_batch([user_message])[0]
+
+    def generate_batch(self, user_messages):
+        """Generate one reply per message in a single padded forward pass."""
+        if not self.load():
+            return [None] * len(user_messages)
+
+        prompts = [_prompt(message) for message in user_messages]
         try:
-            # Create prompt
-            prompt = f"User: {user_message}\nAssistant:"
-            
-            # Generate response
-            response = self.chatbot(
-                prompt,
+            outputs = self.chatbot(
+                prompts,
                 max_length=150,
                 temperature=0.7,
                 do_sample=True,
-                num_return_sequences=1
+                num_return_sequences=1,
+                batch_size=len(prompts),
             )
-            
-            # Extract just the assistant's part
-            full_text = response[0]['generated_text']
-            if 'Assistant:' in full_text:
-                return full_text.split('Assistant:')[-1].strip()
-            return full_text.replace(prompt, '').strip()
-            
         except Exception as e:
             logger.error(f"Local AI error: {e}")
-            return None
+            return [None] * len(user_messages)
+
+        return [_extract_reply(output[0]['generated_text'], prompt) for output, prompt in zip(outputs, prompts)]
 
-# Global instance
+# Global instance (cheap: the model loads on the first generate call)
 local_ai = LocalAIChat()
 
 def get_local_ai_response(user_message):
-    return local_ai.generate_response(user_message)
\ No newline at end of file
+    return local_ai.generate_response(user_message)
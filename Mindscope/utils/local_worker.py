@@ -0,0 +1,134 @@
+import logging
+import threading
+import time
+from multiprocessing.connection import Client, Listener
+
+from django.conf import settings
+
+from .batcher import QueueFull, RequestBatcher
+from .local_ai import LocalAIChat
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    "ENABLED": False,
+    "ADDRESS": ("127.0.0.1", 6011),
+    "AUTHKEY": None,  # defaults to SECRET_KEY
+    "TIMEOUT": 10,  # seconds a Django worker waits for a reply
+    "MAX_BATCH_SIZE": 8,
+    "BATCH_WINDOW_MS": 10,
+    "MAX_QUEUE": 64,  # further requests are answered "busy" and use the keyword fallback
+    "MAX_URGENT_QUEUE": 16,  # separate lane for crisis-flagged users, served first
+}
+
+
+def worker_settings():
+    config = {**DEFAULTS, **getattr(settings, "LOCAL_AI_WORKER", {})}
+    config["ADDRESS"] = tuple(config["ADDRESS"]) if isinstance(config["ADDRESS"], list) else config["ADDRESS"]
+    config["AUTHKEY"] = (config["AUTHKEY"] or settings.SECRET_KEY).encode()
+    return config
+
+
+class LocalAIWorker:
+    """
+    Serves one warm LocalAIChat to every Django worker over a local socket.
+
+    Connections are handled on their own threads; generate requests go through
+    a RequestBatcher so concurrent callers share one padded forward pass, and a
+    full queue is reported back as "busy" rather than waited out.
+    """
+
+    def __init__(self, chat=None, max_batch_size=8, batch_window=0.01, max_queue=64, max_urgent=16):
+        self.chat = chat or LocalAIChat()
+        self.batcher = RequestBatcher(self.chat.generate_batch, max_batch_size, batch_window, max_queue, max_urgent)
+        self.started_at = time.monotonic()
+
+    def health(self):
+        if self.chat.ready:
+            status = "ready"
+        elif self.chat.load_error is not None:
+            status = "failed"
+        else:
+            status = "loading"
+        return {
+            "status": status,
+            "model": self.chat.model_name,
+            "uptime": round(time.monotonic() - self.started_at, 1),
+            **self.batcher.stats(),
+        }
+
+    def generate(self, message, timeout, urgent=False):
+        try:
+            return {"response": self.batcher.submit(message, timeout, urgent)}
+        except QueueFull:
+            return {"error": "busy"}
+
+    def handle(self, conn):
+        try:
+            while True:
+                request = conn.recv()
+                op = request.get("op")
+                if op == "health":
+                    conn.send(self.health())
+                elif op == "generate":
+                    conn.send(self.generate(
+                        request["message"], request.get("timeout") or DEFAULTS["TIMEOUT"], bool(request.get("urgent")),
+                    ))
+                else:
+                    conn.send({"error": f"unknown op {op!r}"})
+        except (EOFError, OSError):
+            pass
+        finally:
+            conn.close()
+
+    def serve_forever(self, address, authkey):
+        # warm start: load the weights before the first request arrives
+        threading.Thread(target=self.chat.load, daemon=True).start()
+        self.batcher.start()
+
+        with Listener(address, authkey=authkey) as listener:
+            logger.info(f"Local AI worker listening on {address}")
+            while True:
+                try:
+                    conn = listener.accept()
+                except Exception as e:
+                    logger.warning(f"Rejected local AI worker connection: {e}")
+                    continue
+                threading.Thread(target=self.handle, args=(conn,), daemon=True).start()
+
+
+def _call(request, timeout):
+    config = worker_settings()
+    with Client(config["ADDRESS"], authkey=config["AUTHKEY"]) as conn:
+        conn.send(request)
+        if not conn.poll(timeout):
+            raise TimeoutError("local AI worker did not answer in time")
+        return conn.recv()
+
+
+def health(timeout=2):
+    """Readiness probe: the worker's health dict, or ``{"status": "down"}``."""
+    try:
+        return _call({"op": "health"}, timeout)
+    except Exception as e:
+        return {"status": "down", "error": str(e)}
+
+
+def generate(user_message, urgent=False):
+    """
+    Ask the shared worker for a reply; returns None if it is off, down, busy or
+    slow. ``urgent`` requests (crisis-flagged users) use the worker's priority lane.
+    """
+    config = worker_settings()
+    if not config["ENABLED"]:
+        return None
+    try:
+        request = {"op": "generate", "message": user_message, "timeout": config["TIMEOUT"], "urgent": urgent}
+        reply = _call(request, config["TIMEOUT"])
+    except Exception as e:
+        logger.warning(f"Local AI worker unavailable: {e}")
+        return None
+    if reply.get("error"):
+        logger.warning(f"Local AI worker declined request: {reply['error']}")
+        return None
+    return reply.get("response")
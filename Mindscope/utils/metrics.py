@@ -0,0 +1,195 @@
+"""
+Per-request performance timings and Prometheus-style histograms.
+
+``PerformanceMiddleware`` opens a ``RequestTimings`` for each request in a
+context variable; code on the request path adds to it with ``timed(segment)``
+(template render, each inference backend) and the database execute wrapper
+(query count and time, every alias). The middleware then reports the totals
+as a Server-Timing header and records them in the process-wide histograms
+that ``render_prometheus`` exposes. Outside a request every hook is a
+context-variable lookup and nothing more.
+
+Histograms live in process memory: with several worker processes, scrape
+each one (or aggregate in Prometheus).
+"""
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.db import connections
+
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200)
+
+_current = ContextVar("mindscope_request_timings", default=None)
+
+
+class RequestTimings:
+    __slots__ = ("started", "segments", "db_queries", "db_seconds")
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.segments = {}  # segment -> seconds
+        self.db_queries = 0
+        self.db_seconds = 0.0
+
+    def add(self, segment, seconds):
+        self.segments[segment] = self.segments.get(segment, 0.0) + seconds
+
+    def elapsed(self):
+        return time.perf_counter() - self.started
+
+
+def start_request():
+    """Begin collecting for the current context; returns (timings, reset token)."""
+    timings = RequestTimings()
+    return timings, _current.set(timings)
+
+
+def end_request(token):
+    _current.reset(token)
+
+
+@contextmanager
+def timed(segment):
+    """Add the block's wall time to ``segment`` of the current request, if any."""
+    timings = _current.get()
+    if timings is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings.add(segment, time.perf_counter() - start)
+
+
+def _db_wrapper(execute, sql, params, many, context):
+    timings = _current.get()
+    if timings is None:
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        timings.db_queries += 1
+        timings.db_seconds += time.perf_counter() - start
+
+
+def install_db_wrapper(sender=None, connection=None, **kwargs):
+    """
+    ``connection_created`` receiver: keep ``_db_wrapper`` in the connection's
+    execute wrappers (the list ``connection.execute_wrapper()`` manages), so
+    queries from any thread, including ``sync_to_async`` ones, are counted.
+    """
+    if _db_wrapper not in connection.execute_wrappers:
+        connection.execute_wrappers.insert(0, _db_wrapper)
+
+
+def install_on_open_connections(**kwargs):
+    """
+    ``request_started`` receiver: cover connections this thread opened before
+    the receiver above was connected. Sync receivers run on the thread that
+    will run sync views, under ASGI as well.
+    """
+    for connection in connections.all(initialized_only=True):
+        install_db_wrapper(connection=connection)
+
+
+class Histogram:
+    def __init__(self, name, documentation, labelnames, buckets=DURATION_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self.buckets = buckets
+        self._series = {}  # label values -> [bucket counts..., sum, count]
+        self._lock = threading.Lock()
+
+    def observe(self, value, *labelvalues):
+        with self._lock:
+            series = self._series.get(labelvalues)
+            if series is None:
+                series = self._series[labelvalues] = [0] * len(self.buckets) + [0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[i] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            snapshot = {labels: list(series) for labels, series in self._series.items()}
+        for labelvalues, series in sorted(snapshot.items()):
+            labels = ",".join(f'{name}="{_escape(value)}"' for name, value in zip(self.labelnames, labelvalues))
+            prefix = f"{labels}," if labels else ""
+            for bound, count in zip(self.buckets, series):
+                lines.append(f'{self.name}_bucket{{{prefix}le="{bound}"}} {count}')
+            lines.append(f'{self.name}_bucket{{{prefix}le="+Inf"}} {series[-1]}')
+            lines.append(f"{self.name}_sum{{{labels}}} {series[-2]:.6f}")
+            lines.append(f"{self.name}_count{{{labels}}} {series[-1]}")
+        return lines
+
+    def clear(self):
+        with self._lock:
+            self._series.clear()
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+REQUEST_DURATION = Histogram(
+    "mindscope_request_duration_seconds", "Wall time per request, until the response is returned.",
+    ("view", "method"),
+)
+REQUEST_DB_QUERIES = Histogram(
+    "mindscope_request_db_queries", "Database queries per request.", ("view",), QUERY_BUCKETS,
+)
+REQUEST_SEGMENT = Histogram(
+    "mindscope_request_segment_seconds",
+    "Time per request spent in one segment: db, render or inference_<backend>.",
+    ("view", "segment"),
+)
+HISTOGRAMS = (REQUEST_DURATION, REQUEST_DB_QUERIES, REQUEST_SEGMENT)
+
+
+def record(view, method, timings, total):
+    REQUEST_DURATION.observe(total, view, method)
+    REQUEST_DB_QUERIES.observe(timings.db_queries, view)
+    if timings.db_queries:
+        REQUEST_SEGMENT.observe(timings.db_seconds, view, "db")
+    for segment, seconds in timings.segments.items():
+        REQUEST_SEGMENT.observe(seconds, view, segment)
+
+
+def server_timing(timings, total):
+    """Server-Timing header value (durations in milliseconds)."""
+    parts = [f"total;dur={total * 1000:.1f}"]
+    if timings.db_queries:
+        parts.append(f'db;dur={timings.db_seconds * 1000:.1f};desc="{timings.db_queries} queries"')
+    parts.extend(f"{segment};dur={seconds * 1000:.1f}" for segment, seconds in timings.segments.items())
+    return ", ".join(parts)
+
+
+def render_prometheus(extra_counters=None):
+    """
+    Prometheus text exposition of the histograms. ``extra_counters`` maps a
+    counter name to ``(help, {((label, value), ...): sample})``.
+    """
+    lines = []
+    for histogram in HISTOGRAMS:
+        lines.extend(histogram.render())
+    for name, (documentation, samples) in (extra_counters or {}).items():
+        lines.append(f"# HELP {name} {documentation}")
+        lines.append(f"# TYPE {name} counter")
+        for labels, value in samples.items():
+            rendered = ",".join(f'{key}="{_escape(val)}"' for key, val in labels)
+            lines.append(f"{name}{{{rendered}}} {value}")
+    return "\n".join(lines) + "\n"
+
+
+def reset():
+    for histogram in HISTOGRAMS:
+        histogram.clear()
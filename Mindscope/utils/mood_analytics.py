@@ -0,0 +1,169 @@
+"""
+Vectorized mood statistics for one user.
+
+The score series is loaded once into NumPy arrays (scores, local day ordinals,
+weekdays, influencer bitmasks) and every statistic is computed with array
+operations. Results are cached per user in the shared cache, so every process
+sees the same copy, tagged with the local day they were computed for, and
+dropped by ``MoodEntry.invalidate_analytics`` (on save, on delete, and by
+bulk writers).
+``influencer_averages_db`` computes the influencer split in SQL from the
+bitmask column, without NumPy.
+"""
+import logging
+from datetime import date
+
+from django.db.models import Avg, Count, F, Q
+from django.utils import timezone
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+    logging.warning("numpy not installed. Mood analytics will only include database aggregates.")
+
+from ..models import MoodEntry
+from .shared_cache import shared_cache
+
+ROLLING_DAYS = 7
+GOOD_MOOD = 6  # daily average at or above this counts toward the good-mood streak
+CACHE_TIMEOUT = 60 * 60 * 24
+WEEKDAYS = ["Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"]
+
+
+def load_series(user):
+    """(scores, day_ordinals, masks) arrays in time order, days in the current timezone."""
+    rows = MoodEntry.objects.filter(user=user).order_by("date_logged").values_list("date_logged", "score", "influencer_mask")
+    days, scores, masks = [], [], []
+    for logged, score, mask in rows.iterator(chunk_size=2000):
+        days.append(timezone.localtime(logged).date().toordinal())
+        scores.append(score)
+        masks.append(mask)
+    return np.array(scores, dtype=float), np.array(days, dtype=np.int64), np.array(masks, dtype=np.int64)
+
+
+def _runs(flags):
+    """Lengths of consecutive True runs in a boolean array -> (longest, trailing)."""
+    if not flags.any():
+        return 0, 0
+    padded = np.concatenate(([False], flags, [False]))
+    edges = np.flatnonzero(np.diff(padded.astype(np.int8)))
+    lengths = edges[1::2] - edges[::2]
+    trailing = int(lengths[-1]) if flags[-1] else 0
+    return int(lengths.max()), trailing
+
+
+def compute(scores, days, masks, today=None):
+    if scores.size == 0:
+        return {"entries": 0}
+
+    # daily means over the full calendar span (missing days are NaN)
+    first = days.min()
+    last = max(days.max(), today or days.max())
+    offsets = days - first
+    span = last - first + 1
+    day_sum = np.bincount(offsets, weights=scores, minlength=span)
+    day_count = np.bincount(offsets, minlength=span)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        daily = day_sum / day_count
+
+    # rolling mean of all entries in the trailing ROLLING_DAYS window
+    csum = np.concatenate(([0.0], np.cumsum(day_sum)))
+    ccount = np.concatenate(([0], np.cumsum(day_count)))
+    lo = np.maximum(np.arange(span) + 1 - ROLLING_DAYS, 0)
+    hi = np.arange(span) + 1
+    window_count = ccount[hi] - ccount[lo]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        rolling = (csum[hi] - csum[lo]) / window_count
+
+    logged = day_count > 0
+    longest_logging, current_logging = _runs(logged)
+    longest_good, current_good = _runs(logged & (np.nan_to_num(daily) >= GOOD_MOOD))
+
+    # day-of-week means (Monday = 0)
+    weekdays = (days - 1) % 7  # date.toordinal() 1 is a Monday
+    wd_sum = np.bincount(weekdays, weights=scores, minlength=7)
+    wd_count = np.bincount(weekdays, minlength=7)
+
+    # per-influencer mean with vs. without, all influencers at once
+    bits = (masks[:, None] >> np.arange(len(MoodEntry.INFLUENCERS))) & 1
+    with_count = bits.sum(axis=0)
+    with_sum = scores @ bits
+    without_count = scores.size - with_count
+    without_sum = scores.sum() - with_sum
+
+    influencers = {}
+    for i, name in enumerate(MoodEntry.INFLUENCERS):
+        if with_count[i] == 0:
+            continue
+        with_mean = with_sum[i] / with_count[i]
+        without_mean = without_sum[i] / without_count[i] if without_count[i] else None
+        influencers[name] = {
+            "entries": int(with_count[i]),
+            "mean": round(float(with_mean), 2),
+            "delta": round(float(with_mean - without_mean), 2) if without_mean is not None else None,
+        }
+
+    return {
+        "entries": int(scores.size),
+        "mean": round(float(scores.mean()), 2),
+        "std": round(float(scores.std()), 2),
+        "rolling_7d": [
+            {"date": date.fromordinal(int(first + i)).isoformat(), "avg": round(float(value), 2)}
+            for i, value in enumerate(rolling) if window_count[i]
+        ][-90:],
+        "streaks": {
+            "current_logging_days": current_logging,
+            "longest_logging_days": longest_logging,
+            "current_good_mood_days": current_good,
+            "longest_good_mood_days": longest_good,
+        },
+        "weekdays": {
+            WEEKDAYS[i]: round(float(wd_sum[i] / wd_count[i]), 2) for i in range(7) if wd_count[i]
+        },
+        "influencers": influencers,
+    }
+
+
+def influencer_averages_db(user):
+    """Per-influencer mean score with/without the influencer, aggregated in SQL via the bitmask."""
+    entries = MoodEntry.objects.filter(user=user)
+    annotations = {f"bit{i}": F("influencer_mask").bitand(1 << i) for i in range(len(MoodEntry.INFLUENCERS))}
+    aggregates = {}
+    for i in range(len(MoodEntry.INFLUENCERS)):
+        aggregates[f"with{i}"] = Avg("score", filter=Q(**{f"bit{i}__gt": 0}))
+        aggregates[f"without{i}"] = Avg("score", filter=Q(**{f"bit{i}": 0}))
+        aggregates[f"count{i}"] = Count("pk", filter=Q(**{f"bit{i}__gt": 0}))
+    row = entries.annotate(**annotations).aggregate(**aggregates)
+
+    result = {}
+    for i, name in enumerate(MoodEntry.INFLUENCERS):
+        if not row[f"count{i}"]:
+            continue
+        with_mean, without_mean = row[f"with{i}"], row[f"without{i}"]
+        result[name] = {
+            "entries": row[f"count{i}"],
+            "mean": round(with_mean, 2),
+            "delta": round(with_mean - without_mean, 2) if without_mean is not None else None,
+        }
+    return result
+
+
+def get_analytics(user):
+    """
+    Cached analytics for ``user``; recomputed after their mood entries change
+    and on a new local day, since the streaks and rolling window end today.
+    """
+    key = MoodEntry.analytics_cache_key(user.pk)
+    cache = shared_cache()
+    today = timezone.localdate().toordinal()
+    cached = cache.get(key)
+    if cached is not None and cached[0] == today:
+        return cached[1]
+    if NUMPY_AVAILABLE:
+        result = compute(*load_series(user), today=today)
+    else:
+        result = {"influencers": influencer_averages_db(user)}
+    cache.set(key, (today, result), CACHE_TIMEOUT)
+    return result
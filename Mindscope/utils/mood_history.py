@@ -0,0 +1,70 @@
+from datetime import datetime, time, timedelta
+
+from django.db.models import Avg, Count, Max, Min
+from django.db.models.functions import TruncDay, TruncMonth, TruncWeek
+from django.utils import timezone
+
+from ..models import MoodEntry
+
+BUCKETS = {
+    "day": TruncDay,
+    "week": TruncWeek,
+    "month": TruncMonth,
+}
+BUCKET_ORDER = ["day", "week", "month"]
+
+DEFAULT_RANGE_DAYS = 90
+DEFAULT_MAX_POINTS = 120
+MAX_POINTS_LIMIT = 1000
+
+
+def _day_bounds(start_date, end_date):
+    tz = timezone.get_current_timezone()
+    start = timezone.make_aware(datetime.combine(start_date, time.min), tz)
+    end = timezone.make_aware(datetime.combine(end_date + timedelta(days=1), time.min), tz)
+    return start, end
+
+
+def _bucketed(entries, bucket):
+    return (
+        entries.annotate(bucket=BUCKETS[bucket]("date_logged"))
+        .values("bucket")
+        .annotate(avg=Avg("score"), min=Min("score"), max=Max("score"), count=Count("id"))
+        .order_by("bucket")
+    )
+
+
+def get_mood_history(user, start_date, end_date, bucket="day", max_points=DEFAULT_MAX_POINTS):
+    """
+    Aggregate a user's mood scores into day/week/month buckets in the database.
+
+    If the requested bucket would produce more than ``max_points`` rows the next
+    coarser bucket is used; as a last resort only the most recent points are kept.
+    """
+    start, end = _day_bounds(start_date, end_date)
+    entries = MoodEntry.objects.filter(user=user, date_logged__gte=start, date_logged__lt=end)
+
+    for candidate in BUCKET_ORDER[BUCKET_ORDER.index(bucket):]:
+        bucket = candidate
+        rows = _bucketed(entries, bucket)
+        if rows.count() <= max_points:
+            rows = list(rows)
+            break
+    else:
+        rows = list(rows.reverse()[:max_points])[::-1]
+
+    return {
+        "bucket": bucket,
+        "start": start_date.isoformat(),
+        "end": end_date.isoformat(),
+        "points": [
+            {
+                "date": row["bucket"].date().isoformat(),
+                "avg": round(row["avg"], 2),
+                "min": row["min"],
+                "max": row["max"],
+                "count": row["count"],
+            }
+            for row in rows
+        ],
+    }
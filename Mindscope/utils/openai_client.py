@@ -11,6 +11,8 @@ except ImportError:
     logging.warning("Requests library not installed. Using fallback responses only.")
 
 from .fallback_responses import get_fallback_response
+from .inference_client import BackendUnavailable, get_inference_client
+from .conversation import context_settings, trim_history, truncate_tokens
 
 logger = logging.getLogger(__name__)
 
@@ -34,7 +36,6 @@ def try_hugging_face_api(user_message, history_messages):
     """
     Try to get response from Hugging Face API
     """
-    API_URL = "https://api-inference.huggingface.co/models/microsoft/DialoGPT-large"
     api_key = os.getenv("HUGGINGFACE_API_KEY")
     
     if not api_key:
@@ -58,49 +59,41 @@ def try_hugging_face_api(user_message, history_messages):
     }
     
     try:
-        response = requests.post(API_URL, headers=headers, json=payload, timeout=15)
-        response.raise_for_status()
-        
-        result = response.json()
-        if isinstance(result, list) and len(result) > 0:
-            generated_text = result[0].get('generated_text', '')
-            # Extract only the assistant's response
-            if 'assistant:' in generated_text:
-                return generated_text.split('assistant:')[-1].strip()
-            return generated_text.strip()
-        else:
-            logger.warning("Unexpected response format from Hugging Face API")
-            return None
-            
-    except requests.exceptions.Timeout:
-        logger.warning("Hugging Face API timeout")
+        # pooled session + circuit breaker: an outage fails fast instead of timing out
+        result = get_inference_client().post("hf_large", payload, headers=headers)
+    except BackendUnavailable as e:
+        logger.warning(f"Hugging Face API unavailable: {e}")
         return None
-    except requests.exceptions.RequestException as e:
-        logger.error(f"Hugging Face API error: {e}")
-        return None
-    except Exception as e:
-        logger.error(f"Unexpected error in Hugging Face API call: {e}")
+
+    if isinstance(result, list) and len(result) > 0:
+        generated_text = result[0].get('generated_text', '')
+        # Extract only the assistant's response
+        if 'assistant:' in generated_text:
+            return generated_text.split('assistant:')[-1].strip()
+        return generated_text.strip()
+    else:
+        logger.warning("Unexpected response format from Hugging Face API")
         return None
 
 def build_conversation_context(user_message, history_messages):
     """
-    Build proper conversation context for the model
+    Build proper conversation context for the model, trimmed to the token budget
     """
-    conversation = ""
-    
     # Add system prompt (helps guide the AI's personality)
-    conversation += "System: You are a supportive, empathetic mental health assistant. Be kind, understanding, and provide helpful suggestions. Don't give medical advice.\n"
-    
-    # Add conversation history
-    if history_messages:
-        for msg in history_messages:
-            if msg['role'] == 'user':
-                conversation += f"user: {msg['content']}\n"
-            elif msg['role'] == 'assistant':
-                conversation += f"assistant: {msg['content']}\n"
-    
+    lines = ["System: You are a supportive, empathetic mental health assistant. Be kind, understanding, and provide helpful suggestions. Don't give medical advice."]
+
+    # Add conversation history (newest turns that fit; older ones summarized)
+    kept, summary = trim_history(history_messages)
+    if summary:
+        lines.append(f"System: {summary}")
+    for msg in kept:
+        if msg['role'] == 'user':
+            lines.append(f"user: {msg['content']}")
+        elif msg['role'] == 'assistant':
+            lines.append(f"assistant: {msg['content']}")
+
     # Add current message
-    conversation += f"user: {user_message}\n"
-    conversation += "assistant:"
-    
-    return conversation
\ No newline at end of file
+    lines.append(f"user: {truncate_tokens(user_message, context_settings()['MAX_TURN_TOKENS'])}")
+    lines.append("assistant:")
+
+    return "\n".join(lines)
@@ -0,0 +1,139 @@
+"""
+Page-level caching.
+
+``cached_page`` stores the rendered response of a static page per (language,
+path) so repeat hits skip the template render. ``conditional_page`` gives a
+per-user page an ETag and Last-Modified built from a cheap "state" query (the
+user's latest creation and edit timestamps and row counts); when the browser's copy is current
+the view is skipped and 304 is returned. Hit/miss and 304/200 counts are kept
+in the cache for ``stats()``.
+"""
+import hashlib
+from functools import wraps
+
+from django.conf import settings
+from django.contrib import messages
+from django.core.cache import caches
+from django.http import HttpResponse
+from django.utils import translation
+from django.views.decorators.http import condition
+
+DEFAULTS = {
+    "ALIAS": "default",
+    "TIMEOUT": 60 * 10,
+    # bump on deploys that change templates, to drop cached pages and ETags
+    "VERSION": 1,
+}
+
+KEY_PREFIX = "page-cache"
+STATS = ("page_hits", "page_misses", "not_modified", "modified")
+STATS_KEYS = {stat: f"{KEY_PREFIX}:stats:{stat}" for stat in STATS}
+
+
+def page_cache_settings():
+    return {**DEFAULTS, **getattr(settings, "PAGE_CACHE", {})}
+
+
+def _cache():
+    return caches[page_cache_settings()["ALIAS"]]
+
+
+def _count(stat):
+    cache = _cache()
+    key = STATS_KEYS[stat]
+    try:
+        cache.add(key, 0, timeout=None)
+        cache.incr(key)
+    except ValueError:
+        # key evicted between add and incr; losing one count is fine
+        pass
+
+
+def cached_page(view):
+    """Serve GET/HEAD hits without a query string from the cache; only for pages with no per-user content."""
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        if request.method not in ("GET", "HEAD") or request.GET:
+            return view(request, *args, **kwargs)
+
+        options = page_cache_settings()
+        key = f"{KEY_PREFIX}:v{options['VERSION']}:{translation.get_language()}:{request.path}"
+        cache = _cache()
+        cached = cache.get(key)
+        if cached is not None:
+            _count("page_hits")
+            content, content_type = cached
+            return HttpResponse(content, content_type=content_type)
+
+        _count("page_misses")
+        response = view(request, *args, **kwargs)
+        if response.status_code == 200 and not response.streaming:
+            cache.set(key, (response.content, response["Content-Type"]), options["TIMEOUT"])
+        return response
+    return wrapper
+
+
+def conditional_page(state_func):
+    """
+    ETag/Last-Modified for a per-user page. ``state_func(request)`` returns a
+    tuple that changes whenever the page would (latest timestamps, counts);
+    its newest datetime becomes Last-Modified. Requests with pending flash
+    messages always render in full.
+    """
+    def _state(request):
+        if not hasattr(request, "_page_state"):
+            if request.method not in ("GET", "HEAD") or len(messages.get_messages(request)):
+                request._page_state = None
+            else:
+                request._page_state = state_func(request)
+        return request._page_state
+
+    def etag(request, *args, **kwargs):
+        state = _state(request)
+        if state is None:
+            return None
+        fingerprint = repr((
+            page_cache_settings()["VERSION"],
+            request.user.pk,
+            translation.get_language(),
+            request.get_full_path(),
+            # the page embeds a CSRF token; a new CSRF cookie must not get an old page
+            request.COOKIES.get(settings.CSRF_COOKIE_NAME),
+            state,
+        ))
+        return hashlib.sha256(fingerprint.encode()).hexdigest()[:32]
+
+    def last_modified(request, *args, **kwargs):
+        state = _state(request)
+        if state is None:
+            return None
+        timestamps = [value for value in state if hasattr(value, "utcoffset")]
+        return max(timestamps) if timestamps else None
+
+    def decorator(view):
+        conditional_view = condition(etag_func=etag, last_modified_func=last_modified)(view)
+
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            response = conditional_view(request, *args, **kwargs)
+            if request.method in ("GET", "HEAD") and getattr(request, "_page_state", None) is not None:
+                _count("not_modified" if response.status_code == 304 else "modified")
+            return response
+        return wrapper
+    return decorator
+
+
+def stats():
+    values = _cache().get_many(STATS_KEYS.values())
+    counts = {stat: values.get(key, 0) for stat, key in STATS_KEYS.items()}
+    pages = counts["page_hits"] + counts["page_misses"]
+    conditional = counts["not_modified"] + counts["modified"]
+    return {
+        **counts,
+        "page_hit_ratio": round(counts["page_hits"] / pages, 3) if pages else 0.0,
+        "not_modified_ratio": round(counts["not_modified"] / conditional, 3) if conditional else 0.0,
+    }
+
+
+def reset_stats():
+    _cache().delete_many(STATS_KEYS.values())
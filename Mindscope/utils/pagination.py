@@ -0,0 +1,65 @@
+import base64
+from datetime import datetime
+
+from django.db.models import Q
+
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_cursor(timestamp, pk):
+    raw = f"{timestamp.isoformat()}|{pk}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor):
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        timestamp, pk = base64.urlsafe_b64decode(padded.encode()).decode().split("|")
+        return datetime.fromisoformat(timestamp), int(pk)
+    except (ValueError, UnicodeDecodeError) as e:
+        raise InvalidCursor(f"Invalid cursor: {cursor!r}") from e
+
+
+def keyset_queryset(queryset, field, cursor=None):
+    """Order ``queryset`` newest first by (``field``, pk) and seek past ``cursor``."""
+    queryset = queryset.order_by(f"-{field}", "-pk")
+    if cursor:
+        timestamp, pk = decode_cursor(cursor)
+        # the plain <= bound lets the database seek on the (user, field) index;
+        # the OR only breaks ties between rows sharing a timestamp
+        queryset = queryset.filter(**{f"{field}__lte": timestamp}).filter(
+            Q(**{f"{field}__lt": timestamp}) | Q(pk__lt=pk)
+        )
+    return queryset
+
+
+def keyset_page(queryset, field, cursor=None, page_size=DEFAULT_PAGE_SIZE):
+    """
+    Return one newest-first page of ``queryset`` ordered by (``field``, pk).
+
+    Instead of OFFSET, the cursor carries the last row's (timestamp, pk), so
+    every page is a bounded range scan on the (user, ``field``) index no matter
+    how deep the reader pages. Returns ``(rows, next_cursor)``; ``next_cursor``
+    is ``None`` on the last page.
+    """
+    queryset = keyset_queryset(queryset, field, cursor)
+    rows = list(queryset[:page_size + 1])
+    next_cursor = None
+    if len(rows) > page_size:
+        rows = rows[:page_size]
+        last = rows[-1]
+        next_cursor = encode_cursor(getattr(last, field), last.pk)
+    return rows, next_cursor
+
+
+def page_size_from(request):
+    try:
+        size = int(request.GET.get("page_size", DEFAULT_PAGE_SIZE))
+    except ValueError:
+        size = DEFAULT_PAGE_SIZE
+    return max(1, min(size, MAX_PAGE_SIZE))
@@ -0,0 +1,74 @@
+import hashlib
+import logging
+import re
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.base import InvalidCacheBackendError
+
+from .openai_client import build_conversation_context
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_ALIAS = "chat_responses"
+KEY_PREFIX = "chat-response"
+STATS_KEYS = {"hits": f"{KEY_PREFIX}:stats:hits", "misses": f"{KEY_PREFIX}:stats:misses"}
+
+
+def _cache():
+    alias = getattr(settings, "CHAT_RESPONSE_CACHE_ALIAS", DEFAULT_ALIAS)
+    try:
+        return caches[alias]
+    except InvalidCacheBackendError:
+        return caches["default"]
+
+
+def normalize_message(user_message):
+    """Lowercase, drop punctuation and collapse whitespace so near-identical prompts share a key."""
+    message = re.sub(r"[^\w\s]", "", (user_message or "").lower())
+    return " ".join(message.split())
+
+
+def cache_key(user_message, history_messages=None):
+    # history is hashed in the same shape the model sees it
+    history_text = build_conversation_context("", history_messages)
+    digest = hashlib.sha256()
+    digest.update(normalize_message(user_message).encode())
+    digest.update(b"\0")
+    digest.update(history_text.encode())
+    return f"{KEY_PREFIX}:{digest.hexdigest()}"
+
+
+def _count(stat):
+    cache = _cache()
+    key = STATS_KEYS[stat]
+    try:
+        cache.add(key, 0, timeout=None)
+        cache.incr(key)
+    except ValueError:
+        # key evicted between add and incr; losing one count is fine
+        pass
+
+
+def get(user_message, history_messages=None):
+    response = _cache().get(cache_key(user_message, history_messages))
+    _count("hits" if response is not None else "misses")
+    return response
+
+
+def store(user_message, history_messages, response, timeout=None):
+    """Store ``response``; ``timeout=None`` uses the cache alias' configured TIMEOUT."""
+    kwargs = {} if timeout is None else {"timeout": timeout}
+    _cache().set(cache_key(user_message, history_messages), response, **kwargs)
+
+
+def stats():
+    values = _cache().get_many(STATS_KEYS.values())
+    hits = values.get(STATS_KEYS["hits"], 0)
+    misses = values.get(STATS_KEYS["misses"], 0)
+    total = hits + misses
+    return {"hits": hits, "misses": misses, "hit_ratio": round(hits / total, 3) if total else 0.0}
+
+
+def reset_stats():
+    _cache().delete_many(STATS_KEYS.values())
@@ -0,0 +1,84 @@
+"""
+Chat retention: ChatMessage rows older than the hot window are packed into
+compressed ChatArchiveSegment rows, and the chat page reads them back on
+"load older", a CHAT_PAGE_SIZE page of one segment at a time.
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from ..models import ChatArchiveSegment, ChatMessage
+
+DEFAULTS = {
+    "HOT_DAYS": 90,  # chats younger than this stay in ChatMessage
+    "SEGMENT_SIZE": 500,  # messages per archive segment
+}
+
+
+def retention_settings():
+    return {**DEFAULTS, **getattr(settings, "CHAT_RETENTION", {})}
+
+
+def archive_user(user_id, cutoff, segment_size):
+    """Move the user's chats older than ``cutoff`` into segments; returns messages archived."""
+    archived = 0
+    while True:
+        rows = list(
+            ChatMessage.objects.filter(user_id=user_id, timestamp__lt=cutoff)
+            .order_by("timestamp", "pk")
+            .values_list("pk", "timestamp", "message", "response")[:segment_size]
+        )
+        if not rows:
+            return archived
+        with transaction.atomic():
+            ChatArchiveSegment.pack(user_id, rows).save()
+            ChatMessage.objects.filter(pk__in=[row[0] for row in rows]).delete()
+        archived += len(rows)
+
+
+def archive_old_chats(older_than_days=None, segment_size=None, on_user=None):
+    config = retention_settings()
+    days = config["HOT_DAYS"] if older_than_days is None else older_than_days
+    segment_size = segment_size or config["SEGMENT_SIZE"]
+    cutoff = timezone.now() - timedelta(days=days)
+
+    total = 0
+    user_ids = (
+        ChatMessage.objects.filter(timestamp__lt=cutoff)
+        .order_by("user_id").values_list("user_id", flat=True).distinct()
+    )
+    for user_id in user_ids.iterator():
+        archived = archive_user(user_id, cutoff, segment_size)
+        total += archived
+        if on_user:
+            on_user(user_id, archived)
+    return total
+
+
+def latest_segment_id(user, before=None):
+    """Newest archive segment for ``user`` (older than segment ``before`` if given), or None."""
+    segments = ChatArchiveSegment.objects.filter(user=user)
+    if before is not None:
+        segments = segments.filter(pk__lt=before)
+    return segments.order_by("-last_timestamp", "-pk").values_list("pk", flat=True).first()
+
+
+def archived_page(user, segment_id, before=None, page_size=30):
+    """
+    One page of a user's segment: ``(chats oldest first, older)``. The page is
+    the ``page_size`` messages ending just before index ``before`` (the
+    segment's end when None). ``older`` is the ``(segment_id, before)`` of the
+    next older page, or None at the start of the archive.
+    """
+    segment = ChatArchiveSegment.objects.filter(user=user, pk=segment_id).first()
+    if segment is None:
+        return [], None
+    chats = segment.messages()
+    end = len(chats) if before is None else max(0, min(before, len(chats)))
+    start = max(0, end - page_size)
+    if start > 0:
+        return chats[start:end], (segment.pk, start)
+    older_segment = latest_segment_id(user, before=segment.pk)
+    return chats[start:end], (older_segment, None) if older_segment is not None else None
@@ -0,0 +1,128 @@
+"""
+Incremental daily rollups of screenings and moods for population reports.
+
+Each run folds only source rows above the stored primary-key watermark into
+the rollup tables, grouping in the database one pk range at a time and
+advancing the watermark in the same transaction, so the cost tracks the
+number of new rows rather than the size of the raw tables.
+
+Primary keys are handed out at insert but become visible at commit, so a
+lower pk can still be uncommitted when a higher one is already readable.
+Folding up to the current maximum would move the watermark past it for good.
+Each run therefore folds only up to the maximum pk an earlier run saw at least
+``settle_seconds`` ago; any transaction that held a lower pk then has committed
+since. New rows reach the report one run after they settle.
+"""
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import Count, F, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from ..models import DailyMoodRollup, DailyScreeningRollup, MoodEntry, RollupWatermark, Screening
+
+DEFAULT_CHUNK_SIZE = 50_000
+DEFAULT_SETTLE_SECONDS = 5 * 60  # far longer than any transaction inserting into the source tables
+
+# name -> (source model, timestamp field, group-by fields, rollup model)
+ROLLUPS = {
+    "screening_daily": (Screening, "date_taken", ["screening_type", "severity"], DailyScreeningRollup),
+    "mood_daily": (MoodEntry, "date_logged", ["mood"], DailyMoodRollup),
+}
+
+
+def _fold_chunk(source, ts_field, keys, rollup, low, high):
+    groups = (
+        source.objects.filter(pk__gt=low, pk__lte=high)
+        .annotate(day=TruncDate(ts_field))
+        .values("day", *keys)
+        .annotate(n=Count("pk"), total=Sum("score"))
+        .order_by()
+    )
+    for group in groups:
+        lookup = {"day": group["day"], **{key: group[key] for key in keys}}
+        updated = rollup.objects.filter(**lookup).update(
+            count=F("count") + group["n"], score_sum=F("score_sum") + group["total"]
+        )
+        if not updated:
+            rollup.objects.create(**lookup, count=group["n"], score_sum=group["total"])
+
+
+def update_rollup(name, chunk_size=DEFAULT_CHUNK_SIZE, rebuild=False, settle_seconds=DEFAULT_SETTLE_SECONDS):
+    """
+    Fold settled new rows into rollup ``name``; returns the number of source
+    rows processed. ``settle_seconds=0`` folds up to the current maximum pk,
+    which is only safe while nothing else writes to the source table.
+    """
+    source, ts_field, keys, rollup = ROLLUPS[name]
+    watermark, _ = RollupWatermark.objects.get_or_create(name=name)
+    # rows up to the watermark had settled before they were folded, so a rebuild may refold them at once
+    folded_pk = watermark.last_pk
+    if rebuild:
+        with transaction.atomic():
+            rollup.objects.all().delete()
+            watermark.last_pk = 0
+            watermark.save()
+
+    now = timezone.now()
+    max_pk = source.objects.order_by("-pk").values_list("pk", flat=True).first() or 0
+    settled = watermark.seen_at is not None and watermark.seen_at <= now - timedelta(seconds=settle_seconds)
+    if settle_seconds <= 0:
+        high_mark = max_pk
+    elif settled:
+        high_mark = watermark.seen_pk
+    else:
+        high_mark = folded_pk
+
+    processed = 0
+    while watermark.last_pk < high_mark:
+        high = min(watermark.last_pk + chunk_size, high_mark)
+        with transaction.atomic():
+            rows = source.objects.filter(pk__gt=watermark.last_pk, pk__lte=high).count()
+            _fold_chunk(source, ts_field, keys, rollup, watermark.last_pk, high)
+            watermark.last_pk = high
+            watermark.save()
+        processed += rows
+
+    # a mark that has not settled yet stays pending so frequent runs cannot keep postponing it
+    if watermark.seen_at is None or settled or settle_seconds <= 0:
+        watermark.seen_pk, watermark.seen_at = max_pk, now
+        watermark.save()
+    return processed
+
+
+def update_all(chunk_size=DEFAULT_CHUNK_SIZE, rebuild=False, settle_seconds=DEFAULT_SETTLE_SECONDS):
+    return {name: update_rollup(name, chunk_size, rebuild, settle_seconds) for name in ROLLUPS}
+
+
+def report(start, end):
+    """Aggregates between two dates (inclusive), read only from the rollup tables."""
+    screenings = DailyScreeningRollup.objects.filter(day__range=(start, end))
+    moods = DailyMoodRollup.objects.filter(day__range=(start, end))
+
+    def with_mean(rows):
+        rows = list(rows)
+        for row in rows:
+            row["mean"] = round(row["score_sum"] / row["count"], 2) if row["count"] else None
+        return rows
+
+    return {
+        "screening_by_type": with_mean(
+            screenings.values("screening_type").annotate(count=Sum("count"), score_sum=Sum("score_sum")).order_by("screening_type")
+        ),
+        "screening_by_severity": with_mean(
+            screenings.values("screening_type", "severity").annotate(count=Sum("count"), score_sum=Sum("score_sum"))
+            .order_by("screening_type", "-count")
+        ),
+        "screening_by_day": with_mean(
+            screenings.values("day", "screening_type").annotate(count=Sum("count"), score_sum=Sum("score_sum"))
+            .order_by("-day", "screening_type")
+        ),
+        "mood_by_mood": with_mean(
+            moods.values("mood").annotate(count=Sum("count"), score_sum=Sum("score_sum")).order_by("-count")
+        ),
+        "mood_by_day": with_mean(
+            moods.values("day").annotate(count=Sum("count"), score_sum=Sum("score_sum")).order_by("-day")
+        ),
+    }
@@ -0,0 +1,156 @@
+"""
+Screening instruments declared as data and compiled into lookup tables.
+
+Each instrument lists its item count, answer range, reverse-scored items and
+severity bands. ``compile_instrument`` turns that into a per-item score table
+(reverse scoring baked in) and a sorted list of band upper edges, so scoring
+is a table lookup per item and severity is one ``bisect`` instead of an
+if/elif ladder. The same compiled instruments score form posts, imports and
+bulk re-scoring of stored results.
+"""
+from bisect import bisect_left
+from collections import namedtuple
+
+Band = namedtuple("Band", ["max_score", "severity", "recommendations"])
+
+INSTRUMENTS = {
+    "PHQ9": {
+        "items": 9,
+        "max_answer": 3,
+        "reverse_items": (),
+        "form_template": "pages/PHQ9.html",
+        "result_template": "pages/PHQ9_result.html",
+        "bands": [
+            Band(4, "Minimal", [
+                "Maintain your healthy lifestyle habits",
+                "Stay socially connected",
+                "Keep monitoring your mood",
+            ]),
+            Band(9, "Mild", [
+                "Practice self-care and relaxation techniques",
+                "Track your mood daily",
+                "Seek support if symptoms persist",
+            ]),
+            Band(14, "Moderate", [
+                "Consider speaking with a counselor",
+                "Use our mood tracker regularly",
+                "Explore mindfulness or breathing exercises",
+            ]),
+            Band(19, "Moderately Severe", [
+                "Consider speaking with a mental health professional",
+                "Track your mood daily using our mood tracker",
+                "Explore our wellness resources for self-care tips",
+            ]),
+            Band(27, "Severe", [
+                "Seek professional help as soon as possible",
+                "Reach out to supportive friends/family",
+                "Use wellness and crisis resources available",
+            ]),
+        ],
+    },
+    "GAD7": {
+        "items": 7,
+        "max_answer": 3,
+        "reverse_items": (),
+        "form_template": "pages/GAD7.html",
+        "result_template": "pages/GAD7_result.html",
+        "bands": [
+            Band(4, "Minimal Anxiety", [
+                "Maintain healthy routines like sleep and exercise",
+                "Practice daily relaxation techniques",
+                "Stay socially engaged",
+            ]),
+            Band(9, "Mild Anxiety", [
+                "Use mindfulness or breathing exercises",
+                "Track triggers in a journal",
+                "Talk with friends/family for support",
+            ]),
+            Band(14, "Moderate Anxiety", [
+                "Consider seeking therapy or counseling",
+                "Practice stress management strategies",
+                "Incorporate regular physical activity",
+            ]),
+            Band(21, "Severe Anxiety", [
+                "Reach out to a mental health professional promptly",
+                "Use crisis hotlines if needed",
+                "Build a strong support system with trusted people",
+            ]),
+        ],
+    },
+    "PSS10": {
+        "items": 10,
+        "max_answer": 4,
+        "reverse_items": (4, 5, 7, 8),
+        "form_template": "pages/PSS10.html",
+        "result_template": "pages/PSS10_result.html",
+        "bands": [
+            Band(13, "Low", [
+                "Maintain healthy daily routines (sleep, diet, exercise).",
+                "Practice brief daily relaxation (deep breathing, progressive muscle relaxation).",
+                "Keep social connections and monitor stress regularly.",
+            ]),
+            Band(26, "Moderate", [
+                "Use stress reduction practices (mindfulness, scheduled breaks).",
+                "Establish a consistent sleep and exercise routine.",
+                "Consider talking with a counselor or trusted person about stressors.",
+            ]),
+            Band(40, "High", [
+                "Reach out to a mental health professional for assessment and support.",
+                "Talk to supportive friends/family and reduce high-demand tasks if possible.",
+                "If you feel overwhelmed or unsafe, contact local crisis services or emergency help immediately.",
+            ]),
+        ],
+    },
+}
+
+
+class Instrument:
+    def __init__(self, code, items, max_answer, reverse_items, bands, form_template, result_template):
+        self.code = code
+        self.items = items
+        self.max_answer = max_answer
+        self.form_template = form_template
+        self.result_template = result_template
+        reverse = set(reverse_items)
+        # item_scores[i][answer] -> points, reverse scoring included
+        self.item_scores = tuple(
+            tuple((max_answer - answer) if item in reverse else answer for answer in range(max_answer + 1))
+            for item in range(1, items + 1)
+        )
+        self.max_score = sum(max(row) for row in self.item_scores)
+        self.band_edges = [band.max_score for band in bands]
+        self.bands = tuple(bands)
+
+    def parse_answer(self, raw):
+        """Form value -> answer index; blank or invalid counts as 0, out of range is clamped."""
+        try:
+            answer = int(raw or 0)
+        except (TypeError, ValueError):
+            return 0
+        return min(max(answer, 0), self.max_answer)
+
+    def score(self, answers):
+        """Total score for a sequence of ``items`` answers (already parsed)."""
+        return sum(row[answer] for row, answer in zip(self.item_scores, answers))
+
+    def score_form(self, data):
+        return self.score([self.parse_answer(data.get(f"q{i}")) for i in range(1, self.items + 1)])
+
+    def band(self, score):
+        index = bisect_left(self.band_edges, score)
+        return self.bands[min(index, len(self.bands) - 1)]
+
+    def severity(self, score):
+        return self.band(score).severity
+
+
+def compile_instrument(code, spec):
+    return Instrument(code, **spec)
+
+
+COMPILED = {code: compile_instrument(code, spec) for code, spec in INSTRUMENTS.items()}
+
+
+def get_instrument(code):
+    """Compiled instrument for ``code`` (e.g. "PHQ9"); raises KeyError if unknown."""
+    return COMPILED[code.upper()]
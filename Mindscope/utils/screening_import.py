@@ -0,0 +1,224 @@
+"""
+Streaming import and re-scoring of screening results.
+
+Records are read lazily from CSV or JSONL, validated and scored in chunks with
+the same compiled instruments the screening views use, and written with
+``bulk_create`` one transaction per chunk. ``last_line`` is reported after every
+committed chunk so an interrupted import can resume with ``skip``.
+"""
+import csv
+import json
+import logging
+import time
+from datetime import datetime
+from itertools import islice
+
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.utils import timezone
+
+from ..models import Screening, WellnessSummary
+from . import rollups
+from .screening_engine import get_instrument
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CHUNK_SIZE = 1000
+MAX_REPORTED_ERRORS = 50
+
+
+class InvalidRecord(ValueError):
+    pass
+
+
+def iter_records(lines, fmt):
+    """Yield ``(line_number, record_dict)`` from an iterable of text lines."""
+    if fmt == "csv":
+        reader = csv.DictReader(lines)
+        for record in reader:
+            yield reader.line_num, record
+    elif fmt == "jsonl":
+        for line_number, line in enumerate(lines, start=1):
+            if line.strip():
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError as e:
+                    record = {"_error": f"invalid JSON: {e}"}
+                if not isinstance(record, dict):
+                    record = {"_error": f"expected a JSON object, got {type(record).__name__}"}
+                yield line_number, record
+    else:
+        raise ValueError(f"Unsupported format {fmt!r}; use csv or jsonl")
+
+
+def _parse_date(value):
+    if not value:
+        return timezone.now()
+    parsed = datetime.fromisoformat(str(value))
+    if timezone.is_naive(parsed):
+        parsed = timezone.make_aware(parsed)
+    return parsed
+
+
+def _answers(record, instrument):
+    """Answers from a JSON "answers" list or q1..qN columns; None when absent."""
+    answers = record.get("answers")
+    if answers is None:
+        columns = [record.get(f"q{i}") for i in range(1, instrument.items + 1)]
+        if all(value in (None, "") for value in columns):
+            return None
+        answers = columns
+    if not isinstance(answers, list):
+        raise InvalidRecord(f"answers must be a list, got {type(answers).__name__}")
+    if len(answers) != instrument.items:
+        raise InvalidRecord(f"expected {instrument.items} answers, got {len(answers)}")
+    try:
+        answers = [int(value) for value in answers]
+    except (TypeError, ValueError):
+        raise InvalidRecord("answers must be integers")
+    if any(not 0 <= value <= instrument.max_answer for value in answers):
+        raise InvalidRecord(f"answers must be between 0 and {instrument.max_answer}")
+    return answers
+
+
+def build_screening(record, user_ids):
+    """Validate one record and return an unsaved, scored Screening."""
+    if not isinstance(record, dict):
+        raise InvalidRecord(f"expected a record object, got {type(record).__name__}")
+    if "_error" in record:
+        raise InvalidRecord(record["_error"])
+    username = record.get("username")
+    user_id = user_ids.get(username) if isinstance(username, str) else None
+    if user_id is None:
+        raise InvalidRecord(f"unknown user {username!r}")
+    screening_type = record.get("screening_type")
+    if not isinstance(screening_type, str):
+        raise InvalidRecord(f"unknown screening type {screening_type!r}")
+    try:
+        instrument = get_instrument(screening_type)
+    except KeyError:
+        raise InvalidRecord(f"unknown screening type {record.get('screening_type')!r}")
+
+    answers = _answers(record, instrument)
+    if answers is not None:
+        score = instrument.score(answers)
+    else:
+        try:
+            score = int(record.get("score"))
+        except (TypeError, ValueError):
+            raise InvalidRecord("record needs answers or an integer score")
+        if not 0 <= score <= instrument.max_score:
+            raise InvalidRecord(f"score must be between 0 and {instrument.max_score}")
+
+    try:
+        date_taken = _parse_date(record.get("date_taken"))
+    except ValueError:
+        raise InvalidRecord(f"invalid date_taken {record.get('date_taken')!r}")
+
+    return Screening(
+        user_id=user_id,
+        screening_type=instrument.code,
+        score=score,
+        severity=instrument.severity(score),
+        date_taken=date_taken,
+    )
+
+
+def import_screenings(records, chunk_size=DEFAULT_CHUNK_SIZE, skip=0, dry_run=False, on_chunk=None):
+    """
+    Import ``(line_number, record)`` pairs, skipping lines up to ``skip``.
+
+    Returns a stats dict; ``on_chunk(stats)`` is called after each committed
+    chunk so callers can checkpoint ``stats["last_line"]``.
+    """
+    stats = {"read": 0, "imported": 0, "invalid": 0, "errors": [], "last_line": skip, "rows_per_sec": 0.0}
+    touched_users = set()
+    started = time.perf_counter()
+    records = ((line, record) for line, record in records if line > skip)
+
+    while True:
+        chunk = list(islice(records, chunk_size))
+        if not chunk:
+            break
+
+        usernames = {
+            record.get("username") for _line, record in chunk
+            if isinstance(record, dict) and isinstance(record.get("username"), str)
+        }
+        user_ids = dict(User.objects.filter(username__in=usernames).values_list("username", "id"))
+
+        screenings = []
+        for line, record in chunk:
+            try:
+                screenings.append(build_screening(record, user_ids))
+            except InvalidRecord as e:
+                stats["invalid"] += 1
+                if len(stats["errors"]) < MAX_REPORTED_ERRORS:
+                    stats["errors"].append({"line": line, "error": str(e)})
+
+        if screenings and not dry_run:
+            with transaction.atomic():
+                Screening.objects.bulk_create(screenings, batch_size=chunk_size)
+            touched_users.update(screening.user_id for screening in screenings)
+
+        stats["read"] += len(chunk)
+        stats["imported"] += len(screenings)
+        stats["last_line"] = chunk[-1][0]
+        stats["rows_per_sec"] = round(stats["read"] / max(time.perf_counter() - started, 1e-9), 1)
+        if on_chunk:
+            on_chunk(stats)
+
+    # bulk_create skips Screening.save, so refresh the dashboard summaries here
+    for user in User.objects.filter(pk__in=touched_users).iterator():
+        WellnessSummary.rebuild(user)
+    return stats
+
+
+def rescore_screenings(chunk_size=DEFAULT_CHUNK_SIZE, dry_run=False, on_chunk=None):
+    """
+    Recompute ``severity`` for every stored screening from its score and the
+    current bands. Walks the table in primary-key order one chunk at a time,
+    so memory stays flat however large the table is. The screening rollup
+    groups by severity, so it is rebuilt afterwards when anything changed.
+    """
+    stats = {"scanned": 0, "updated": 0, "rows_per_sec": 0.0}
+    touched_users = set()
+    started = time.perf_counter()
+    last_pk = 0
+
+    while True:
+        rows = list(
+            Screening.objects.filter(pk__gt=last_pk)
+            .order_by("pk")
+            .values_list("pk", "user_id", "screening_type", "score", "severity")[:chunk_size]
+        )
+        if not rows:
+            break
+        last_pk = rows[-1][0]
+
+        changed = []
+        for pk, user_id, screening_type, score, severity in rows:
+            try:
+                new_severity = get_instrument(screening_type).severity(score)
+            except KeyError:
+                continue
+            if new_severity != severity:
+                changed.append(Screening(pk=pk, severity=new_severity, updated_at=timezone.now()))
+                touched_users.add(user_id)
+
+        if changed and not dry_run:
+            with transaction.atomic():
+                Screening.objects.bulk_update(changed, ["severity", "updated_at"], batch_size=chunk_size)
+
+        stats["scanned"] += len(rows)
+        stats["updated"] += len(changed)
+        stats["rows_per_sec"] = round(stats["scanned"] / max(time.perf_counter() - started, 1e-9), 1)
+        if on_chunk:
+            on_chunk(stats)
+
+    if not dry_run:
+        for user in User.objects.filter(pk__in=touched_users).iterator():
+            WellnessSummary.rebuild(user)
+        if stats["updated"]:
+            rollups.update_rollup("screening_daily", rebuild=True)
+    return stats
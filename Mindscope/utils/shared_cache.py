@@ -0,0 +1,22 @@
+"""
+The cache for state every process has to agree on: prompt history, crisis
+flags, mood analytics and the response catalog version.
+
+``settings.SHARED_CACHE_ALIAS`` names it. The stock settings make it a
+DatabaseCache in the main database (its table comes from migration 0013), or
+Redis when CACHE_REDIS_URL is set. The per-process LocMemCache behind
+"default" would let web processes and chat workers drift apart.
+"""
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.base import InvalidCacheBackendError
+
+DEFAULT_ALIAS = "shared"
+
+
+def shared_cache():
+    alias = getattr(settings, "SHARED_CACHE_ALIAS", DEFAULT_ALIAS)
+    try:
+        return caches[alias]
+    except InvalidCacheBackendError:
+        return caches["default"]
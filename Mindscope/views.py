@@ -1,23 +1,39 @@
 from django.shortcuts import render, redirect
 from django.contrib.auth import authenticate, login, logout
 from django.contrib.auth.decorators import login_required
+from django.contrib.admin.views.decorators import staff_member_required
 from django.contrib.auth.models import User
 from django.contrib import messages
-from django.http import HttpResponse
+from django.db import transaction
+from django.db.models import Count, F, Max
+from django.http import Http404, HttpResponse, HttpResponseNotAllowed, JsonResponse, StreamingHttpResponse
+from django.utils import translation
+import hmac
+import io
 import logging
 import json
+from asgiref.sync import sync_to_async
 
-from .models import Screening, MoodEntry, ChatMessage, WellnessTip
+from .models import Screening, MoodEntry, ChatMessage, WellnessTip, WellnessSummary
+from .middleware import metrics_settings
+from .routers import replica_reads
 from .utils.openai_client import generate_chat_response
 from .utils.fallback_responses import get_fallback_response
+from .utils import catalog, chat_queue, conversation, crisis, export, fulltext, mood_analytics, mood_history
+from .utils import metrics, page_cache, response_cache, retention, screening_import
+from .utils.page_cache import cached_page, conditional_page
+from .utils.screening_engine import get_instrument
+from .utils.pagination import InvalidCursor, keyset_page, page_size_from
 
 logger = logging.getLogger(__name__)
 
 
+@cached_page
 def LandingPage(request):
     return render(request, "pages/LandingPage.html")
 
 
+@cached_page
 def home(request):
     return render(request, "pages/home.html")
 
@@ -73,220 +89,155 @@ def logout_view(request):
 from django.shortcuts import render
 from django.contrib.auth.decorators import login_required
 from .models import MoodEntry, Screening
-from datetime import datetime
+from datetime import datetime, timedelta
+from django.urls import reverse
+from django.utils import timezone
+
+# how many rows the dashboard / mood tracker list inline; charts load via mood_history_api
+RECENT_ENTRIES_LIMIT = 10
 
 import json
-@login_required
-def dashboard(request):
-    moods = MoodEntry.objects.filter(user=request.user).order_by('-date_logged')
-    screenings = Screening.objects.filter(user=request.user).order_by('-date_taken')
 
-    # ✅ Chart Data
-    mood_dates = [m.date_logged.strftime('%b %d') for m in moods]
-    mood_scores = [m.score for m in moods]
 
-    # ✅ Calculate Wellness Score
-    wellness_score = None
-    if moods.exists():
-        avg_mood = sum(mood_scores) / len(mood_scores)
-    else:
-        avg_mood = 5  # neutral baseline
+def _timeline_state(user, model, field):
+    # updated_at catches edits, which change neither the count nor the latest date
+    stats = model.objects.filter(user=user).aggregate(
+        latest=Max(field), count=Count("pk"), edited=Max("updated_at"),
+    )
+    return stats["latest"], stats["count"], stats["edited"]
+
+
+def _dashboard_state(request):
+    summary_updated = WellnessSummary.objects.filter(user=request.user).values_list("updated_at", flat=True).first()
+    return (
+        *_timeline_state(request.user, MoodEntry, "date_logged"),
+        *_timeline_state(request.user, Screening, "date_taken"),
+        summary_updated,
+    )
+
 
-    if screenings.exists():
-        last_screening = screenings.first()
-        # Inverse scaling: higher screening score = lower wellness
-        screening_factor = max(0, 10 - (last_screening.score / 3))  
-    else:
-        screening_factor = 5  # baseline
+def _mood_tracker_state(request):
+    return _timeline_state(request.user, MoodEntry, "date_logged")
 
-    wellness_score = round((avg_mood * 0.6) + (screening_factor * 0.4), 1)
+
+@login_required
+@replica_reads
+@conditional_page(_dashboard_state)
+def dashboard(request):
+    moods = MoodEntry.objects.filter(user=request.user).order_by('-date_logged')[:RECENT_ENTRIES_LIMIT]
+    screenings = Screening.objects.filter(user=request.user).order_by('-date_taken')[:RECENT_ENTRIES_LIMIT]
+
+    # ✅ Wellness score comes from the incrementally maintained summary row
+    summary = WellnessSummary.for_user(request.user)
+    wellness_score = summary.wellness_score
 
     return render(request, "pages/Dashboard.html", {
         "moods": moods,
         "screenings": screenings,
-        "mood_dates_json": json.dumps(mood_dates),
-        "mood_scores_json": json.dumps(mood_scores),
+        "mood_history_url": reverse("mood_history_api"),
         "wellness_score": wellness_score,
     })
 
 
+@login_required
+def mood_history_api(request):
+    """
+    JSON mood chart data: ?start=YYYY-MM-DD&end=YYYY-MM-DD&bucket=day|week|month&max_points=N
+    """
+    today = timezone.localdate()
+    try:
+        end = datetime.strptime(request.GET["end"], "%Y-%m-%d").date() if request.GET.get("end") else today
+        start = (
+            datetime.strptime(request.GET["start"], "%Y-%m-%d").date()
+            if request.GET.get("start")
+            else end - timedelta(days=mood_history.DEFAULT_RANGE_DAYS)
+        )
+        max_points = int(request.GET.get("max_points", mood_history.DEFAULT_MAX_POINTS))
+    except ValueError:
+        return JsonResponse({"error": "Invalid date or max_points."}, status=400)
+
+    bucket = request.GET.get("bucket", "day")
+    if bucket not in mood_history.BUCKETS:
+        return JsonResponse({"error": "bucket must be day, week or month."}, status=400)
+    if start > end:
+        return JsonResponse({"error": "start must not be after end."}, status=400)
+    max_points = max(1, min(max_points, mood_history.MAX_POINTS_LIMIT))
+
+    return JsonResponse(mood_history.get_mood_history(request.user, start, end, bucket, max_points))
+
+
 
 @login_required
+@cached_page
 def screening_tests(request):
     return render(request, "pages/ScreeningTests.html")
 
 
-# ---------------- PHQ-9 ----------------
 @login_required
-def phq9_view(request):
-    if request.method == "POST":
-        score = sum(int(request.POST.get(f"q{i}", 0)) for i in range(1, 10))
-
-        if score <= 4:
-            severity = "Minimal"
-            recommendations = [
-                "Maintain your healthy lifestyle habits",
-                "Stay socially connected",
-                "Keep monitoring your mood",
-            ]
-        elif score <= 9:
-            severity = "Mild"
-            recommendations = [
-                "Practice self-care and relaxation techniques",
-                "Track your mood daily",
-                "Seek support if symptoms persist",
-            ]
-        elif score <= 14:
-            severity = "Moderate"
-            recommendations = [
-                "Consider speaking with a counselor",
-                "Use our mood tracker regularly",
-                "Explore mindfulness or breathing exercises",
-            ]
-        elif score <= 19:
-            severity = "Moderately Severe"
-            recommendations = [
-                "Consider speaking with a mental health professional",
-                "Track your mood daily using our mood tracker",
-                "Explore our wellness resources for self-care tips",
-            ]
-        else:
-            severity = "Severe"
-            recommendations = [
-                "Seek professional help as soon as possible",
-                "Reach out to supportive friends/family",
-                "Use wellness and crisis resources available",
-            ]
+def mood_analytics_api(request):
+    return JsonResponse(mood_analytics.get_analytics(request.user))
 
-        Screening.objects.create(
-            user=request.user,
-            screening_type="PHQ9",
-            score=score,
-            severity=severity,
-        )
 
-        return render(request, "pages/PHQ9_result.html", {
-            "score": score,
-            "severity": severity,
-            "recommendations": recommendations,
-        })
-
-    return render(request, "pages/PHQ9.html")
-
-
-# ---------------- GAD-7 ----------------
+# ---------------- Screenings (PHQ-9, GAD-7, PSS-10) ----------------
 @login_required
-def gad7_view(request):
+def screening_view(request, code):
+    try:
+        instrument = get_instrument(code)
+    except KeyError:
+        raise Http404("Unknown screening")
+
     if request.method == "POST":
-        score = sum(int(request.POST.get(f"q{i}", 0) or 0) for i in range(1, 8))
-
-        if score <= 4:
-            severity = "Minimal Anxiety"
-            recommendations = [
-                "Maintain healthy routines like sleep and exercise",
-                "Practice daily relaxation techniques",
-                "Stay socially engaged",
-            ]
-        elif score <= 9:
-            severity = "Mild Anxiety"
-            recommendations = [
-                "Use mindfulness or breathing exercises",
-                "Track triggers in a journal",
-                "Talk with friends/family for support",
-            ]
-        elif score <= 14:
-            severity = "Moderate Anxiety"
-            recommendations = [
-                "Consider seeking therapy or counseling",
-                "Practice stress management strategies",
-                "Incorporate regular physical activity",
-            ]
-        else:
-            severity = "Severe Anxiety"
-            recommendations = [
-                "Reach out to a mental health professional promptly",
-                "Use crisis hotlines if needed",
-                "Build a strong support system with trusted people",
-            ]
+        score = instrument.score_form(request.POST)
+        band = instrument.band(score)
 
         Screening.objects.create(
             user=request.user,
-            screening_type="GAD7",
+            screening_type=instrument.code,
             score=score,
-            severity=severity,
+            severity=band.severity,
         )
 
-        return render(request, "pages/GAD7_result.html", {
+        return render(request, instrument.result_template, {
             "score": score,
-            "severity": severity,
-            "recommendations": recommendations,
+            "severity": band.severity,
+            "recommendations": band.recommendations,
         })
 
-    return render(request, "pages/GAD7.html")
+    return render(request, instrument.form_template)
 
 
-# ---------------- PSS-10 ----------------
-@login_required
-def pss10_view(request):
-    if request.method == "POST":
-        answers = {}
-        for i in range(1, 11):
-            try:
-                answers[i] = int(request.POST.get(f"q{i}", 0) or 0)
-            except ValueError:
-                answers[i] = 0
-
-        reverse_items = {4, 5, 7, 8}
-        total = 0
-        for i in range(1, 11):
-            v = answers[i]
-            total += (4 - v) if i in reverse_items else v
-
-        if total <= 13:
-            severity = "Low"
-            recommendations = [
-                "Maintain healthy daily routines (sleep, diet, exercise).",
-                "Practice brief daily relaxation (deep breathing, progressive muscle relaxation).",
-                "Keep social connections and monitor stress regularly.",
-            ]
-        elif total <= 26:
-            severity = "Moderate"
-            recommendations = [
-                "Use stress reduction practices (mindfulness, scheduled breaks).",
-                "Establish a consistent sleep and exercise routine.",
-                "Consider talking with a counselor or trusted person about stressors.",
-            ]
-        else:
-            severity = "High"
-            recommendations = [
-                "Reach out to a mental health professional for assessment and support.",
-                "Talk to supportive friends/family and reduce high-demand tasks if possible.",
-                "If you feel overwhelmed or unsafe, contact local crisis services or emergency help immediately.",
-            ]
+@staff_member_required
+def screening_import_api(request):
+    """
+    POST a CSV/JSONL file as ``file`` (optional ``format``, ``chunk_size``, ``skip``).
+    Responds with the import stats; resend with ``skip=<last_line>`` to resume.
+    """
+    if request.method != "POST":
+        return HttpResponseNotAllowed(["POST"])
+    upload = request.FILES.get("file")
+    if upload is None:
+        return JsonResponse({"error": "Upload the records as 'file'."}, status=400)
 
-        Screening.objects.create(
-            user=request.user,
-            screening_type="PSS10",
-            score=total,
-            severity=severity,
-        )
+    fmt = request.POST.get("format") or upload.name.rsplit(".", 1)[-1].lower()
+    try:
+        chunk_size = int(request.POST.get("chunk_size", screening_import.DEFAULT_CHUNK_SIZE))
+        skip = int(request.POST.get("skip", 0))
+    except ValueError:
+        return JsonResponse({"error": "chunk_size and skip must be integers."}, status=400)
+    if fmt not in ("csv", "jsonl") or chunk_size < 1:
+        return JsonResponse({"error": "format must be csv or jsonl and chunk_size positive."}, status=400)
 
-        return render(request, "pages/PSS10_result.html", {
-            "score": total,
-            "severity": severity,
-            "recommendations": recommendations,
-        })
-
-    return render(request, "pages/PSS10.html")
+    lines = io.TextIOWrapper(upload.file, encoding="utf-8", newline="")
+    stats = screening_import.import_screenings(screening_import.iter_records(lines, fmt), chunk_size, skip)
+    return JsonResponse(stats)
 
 
 # ---------------- Mood Tracker ----------------
 @login_required
+@replica_reads
+@conditional_page(_mood_tracker_state)
 def mood_tracker(request):
-    influencers = [
-        "Work", "Family", "Exercise", "Sleep", "Social",
-        "Health", "Weather", "Money", "Travel", "Learning"
-    ]
+    influencers = MoodEntry.INFLUENCERS
 
     if request.method == "POST":
         mood = request.POST["mood"]
@@ -302,61 +253,337 @@ def mood_tracker(request):
         messages.success(request, "Mood logged successfully!")
         return redirect("mood_tracker")
 
-    # fetch user’s past entries
-    entries = MoodEntry.objects.filter(user=request.user).order_by("date_logged")
-
-    dates = [entry.date_logged.strftime("%b %d") for entry in entries]
-    scores = [entry.score for entry in entries]
+    # fetch one page of the user’s entries; the chart pulls its series from mood_history_api
+    try:
+        entries, next_cursor = keyset_page(
+            MoodEntry.objects.filter(user=request.user), "date_logged",
+            request.GET.get("cursor"), RECENT_ENTRIES_LIMIT,
+        )
+    except InvalidCursor:
+        return redirect("mood_tracker")
 
     return render(request, "pages/mood_tracker.html", {
         "entries": entries,
+        "next_cursor": next_cursor,
         "mood_choices": MoodEntry.MOOD_CHOICES,
         "influencers": influencers,   # ✅ pass influencers here
-        "dates": json.dumps(dates),
-        "scores": json.dumps(scores),
+        "mood_history_url": reverse("mood_history_api"),
     })
 
 
 
 # ---------------- AI Chatbot ----------------
+CHAT_PAGE_SIZE = 30
+
+
+def _wants_json(request):
+    return request.headers.get("Accept", "").startswith("application/json")
+
+
+def _chat_stream_url():
+    # inline replies stream over SSE; queued ones are polled through chat_status_api instead
+    return None if chat_queue.queue_settings()["ENABLED"] else reverse("chat_stream")
+
+
+def _chat_status_payload(chat_id, user):
+    payload = chat_queue.status(chat_id, user)
+    payload["status_url"] = reverse("chat_status_api", args=[chat_id])
+    return payload
+
+
 @login_required
 def chat_view(request):
     if request.method == "POST":
         user_msg = request.POST.get("message", "").strip()
         if not user_msg:
+            if _wants_json(request):
+                return JsonResponse({"error": "Please enter a message."}, status=400)
             messages.error(request, "Please enter a message.")
             return redirect("chat")
 
-        recent_messages = ChatMessage.objects.filter(
-            user=request.user
-        ).order_by("-timestamp")[:6]
-        
-        history = []
-        for msg in reversed(recent_messages):
-            history.append({"role": "user", "content": msg.message})
-            if msg.response:
-                history.append({"role": "assistant", "content": msg.response})
+        if crisis.detect(user_msg):
+            # answered inline below with the crisis resources (no network call);
+            # the user's follow-up messages jump the queue for a while
+            crisis.flag_user(request.user)
+        elif chat_queue.queue_settings()["ENABLED"]:
+            # answered by run_chat_workers; the page polls chat_status_api
+            with transaction.atomic():
+                chat = ChatMessage.objects.create(user=request.user, message=user_msg)
+                chat_queue.enqueue(chat, priority=crisis.priority_for(request.user))
+            if _wants_json(request):
+                return JsonResponse(_chat_status_payload(chat.pk, request.user), status=202)
+            return redirect("chat")
+
+        # cached rolling history; build_conversation_context trims it to the token budget
+        history = conversation.get_history(request.user)
 
         try:
             from .utils.chat_engine import generate_intelligent_response
-            ai_response = generate_intelligent_response(user_msg, history_messages=history)
+            ai_response = generate_intelligent_response(
+                user_msg, history_messages=history, urgent=bool(crisis.priority_for(request.user)),
+            )
         except Exception as e:
             logger.error(f"Error generating AI response: {e}")
             from .utils.fallback_responses import get_fallback_response
             ai_response = get_fallback_response(user_msg)
             messages.info(request, "Using fallback responses due to technical issues.")
 
-        ChatMessage.objects.create(
+        chat = ChatMessage.objects.create(
             user=request.user, 
             message=user_msg, 
             response=ai_response
         )
-        
+        conversation.append_turn(request.user, user_msg, ai_response)
+        if _wants_json(request):
+            return JsonResponse(_chat_status_payload(chat.pk, request.user))
+        return redirect("chat")
+
+    # "load older" past the hot table continues into the compressed archive
+    if request.GET.get("archive", "").isdigit():
+        before = request.GET.get("before", "")
+        chats, older = retention.archived_page(
+            request.user, int(request.GET["archive"]), int(before) if before.isdigit() else None, CHAT_PAGE_SIZE,
+        )
+        older_archive, older_archive_before = older or (None, None)
+        return render(request, "pages/AIChatbot.html", {
+            "chats": chats,
+            "older_archive": older_archive,
+            "older_archive_before": older_archive_before,
+            "stream_url": _chat_stream_url(),
+        })
+
+    try:
+        recent, older_cursor = keyset_page(
+            ChatMessage.objects.filter(user=request.user).annotate(job_status=F("job__status")), "timestamp",
+            request.GET.get("cursor"), CHAT_PAGE_SIZE,
+        )
+    except InvalidCursor:
         return redirect("chat")
+    older_archive = None if older_cursor else retention.latest_segment_id(request.user)
+    # oldest first, as the template expects
+    chats = list(reversed(recent))
+    return render(request, "pages/AIChatbot.html", {
+        "chats": chats,
+        "older_cursor": older_cursor,
+        "older_archive": older_archive,
+        "stream_url": _chat_stream_url(),
+    })
+
+
+@login_required
+def chat_status_api(request, pk):
+    """Polled by the chat page until a queued reply is done (or dead-lettered)."""
+    payload = chat_queue.status(pk, request.user)
+    if payload is None:
+        raise Http404("No such message.")
+    return JsonResponse(payload)
+
+
+def _sse(data, event=None):
+    prefix = f"event: {event}\n" if event else ""
+    return f"{prefix}data: {json.dumps(data)}\n\n"
+
+
+@login_required
+async def chat_stream_view(request):
+    """
+    Streaming variant of chat_view for the ASGI server: replies are sent as
+    server-sent events while they are generated, so slow upstream calls hold
+    an event-loop task rather than a whole worker. The ChatMessage is saved
+    once the stream completes.
+    """
+    if request.method != "POST":
+        return HttpResponseNotAllowed(["POST"])
+
+    user = await request.auser()
+    user_msg = request.POST.get("message", "").strip()
+    if not user_msg:
+        return JsonResponse({"error": "Please enter a message."}, status=400)
+
+    if crisis.detect(user_msg):
+        await sync_to_async(crisis.flag_user)(user)
+    urgent = bool(await sync_to_async(crisis.priority_for)(user))
+    history = await sync_to_async(conversation.get_history)(user)
+
+    async def event_stream():
+        from .utils.async_chat import stream_intelligent_response
+
+        chunks = []
+        async for chunk in stream_intelligent_response(user_msg, history_messages=history, urgent=urgent):
+            chunks.append(chunk)
+            yield _sse({"token": chunk})
+
+        reply = "".join(chunks).strip()
+        chat = await ChatMessage.objects.acreate(user=user, message=user_msg, response=reply)
+        await sync_to_async(conversation.append_turn)(user, user_msg, reply)
+        yield _sse({"id": chat.pk, "timestamp": chat.timestamp.isoformat()}, event="done")
+
+    response = StreamingHttpResponse(event_stream(), content_type="text/event-stream")
+    response["Cache-Control"] = "no-cache"
+    response["X-Accel-Buffering"] = "no"
+    return response
+
+
+# ---------------- Data export ----------------
+@login_required
+def export_data(request):
+    """Download all of the user's moods, screenings and chats (?format=ndjson|csv&gzip=1)."""
+    fmt = request.GET.get("format", "ndjson")
+    if fmt not in ("ndjson", "csv"):
+        return JsonResponse({"error": "format must be ndjson or csv."}, status=400)
+    compress = request.GET.get("gzip") == "1"
+
+    response = StreamingHttpResponse(
+        export.response_body(request, export.iter_export([request.user], fmt, compress)),
+        content_type=export.content_type(fmt, compress),
+    )
+    name = export.filename(f"mindscope-{request.user.pk}", fmt, compress)
+    response["Content-Disposition"] = f'attachment; filename="{name}"'
+    return response
+
+
+# ---------------- Timeline APIs (keyset paginated) ----------------
+def _keyset_json(request, queryset, field, serialize):
+    try:
+        rows, next_cursor = keyset_page(queryset, field, request.GET.get("cursor"), page_size_from(request))
+    except InvalidCursor:
+        return JsonResponse({"error": "Invalid cursor."}, status=400)
+    return JsonResponse({"results": [serialize(row) for row in rows], "next_cursor": next_cursor})
+
+
+@login_required
+def mood_list_api(request):
+    return _keyset_json(
+        request, MoodEntry.objects.filter(user=request.user), "date_logged",
+        lambda m: {
+            "id": m.pk,
+            "mood": m.mood,
+            "score": m.score,
+            "influencers": m.influencers,
+            "notes": m.notes,
+            "date_logged": m.date_logged.isoformat(),
+        },
+    )
 
-    chats = ChatMessage.objects.filter(user=request.user).order_by("timestamp")
-    return render(request, "pages/AIChatbot.html", {"chats": chats})
+
+@login_required
+def screening_list_api(request):
+    return _keyset_json(
+        request, Screening.objects.filter(user=request.user), "date_taken",
+        lambda s: {
+            "id": s.pk,
+            "screening_type": s.screening_type,
+            "score": s.score,
+            "severity": s.severity,
+            "date_taken": s.date_taken.isoformat(),
+        },
+    )
+
+
+@login_required
+def chat_history_api(request):
+    return _keyset_json(
+        request, ChatMessage.objects.filter(user=request.user), "timestamp",
+        lambda c: {
+            "id": c.pk,
+            "message": c.message,
+            "response": c.response,
+            "timestamp": c.timestamp.isoformat(),
+        },
+    )
+
+
+SEARCH_KINDS = {"all": ("chat", "mood"), "chat": ("chat",), "mood": ("mood",)}
+
+
+def _search_params(request):
+    """(term, kinds, page, page_size) from the query string; ValueError on bad input."""
+    kinds = SEARCH_KINDS.get(request.GET.get("in", "all"))
+    if kinds is None:
+        raise ValueError("in must be one of: " + ", ".join(SEARCH_KINDS))
+    page = int(request.GET.get("page", 1))
+    if page < 1:
+        raise ValueError("page must be positive")
+    return request.GET.get("q", "")[:200], kinds, page, page_size_from(request)
+
+
+@login_required
+def search_view(request):
+    try:
+        term, kinds, page, page_size = _search_params(request)
+    except ValueError:
+        term, kinds, page, page_size = request.GET.get("q", "")[:200], SEARCH_KINDS["all"], 1, page_size_from(request)
+    hits, has_next = fulltext.search(request.user, term, kinds, page, page_size)
+    return render(request, "pages/search.html", {
+        "query": term,
+        "scope": request.GET.get("in", "all"),
+        "hits": hits,
+        "page": page,
+        "has_next": has_next,
+    })
+
+
+@login_required
+def search_api(request):
+    """``?q=<words>&in=all|chat|mood&page=N&page_size=M``; snippets are HTML with ``<mark>`` tags."""
+    try:
+        term, kinds, page, page_size = _search_params(request)
+    except ValueError as e:
+        return JsonResponse({"error": str(e)}, status=400)
+    hits, has_next = fulltext.search(request.user, term, kinds, page, page_size)
+    return JsonResponse({
+        "results": [
+            {"type": hit.kind, "id": hit.id, "timestamp": hit.timestamp.isoformat(), "snippet": hit.snippet}
+            for hit in hits
+        ],
+        "next_page": page + 1 if has_next else None,
+    })
+
+
+@staff_member_required
+def cache_stats_api(request):
+    return JsonResponse({
+        "pages": page_cache.stats(),
+        "chat_responses": response_cache.stats(),
+    })
+
+
+def metrics_view(request):
+    """Prometheus text format; bearer METRICS_TOKEN, or a staff session when no token is set."""
+    token = metrics_settings()["TOKEN"]
+    if token:
+        supplied = request.headers.get("Authorization", "").removeprefix("Bearer ").strip()
+        if not hmac.compare_digest(supplied, token):
+            return HttpResponse("Unauthorized", status=401)
+    elif not (request.user.is_authenticated and request.user.is_staff):
+        return HttpResponse("Unauthorized", status=401)
+
+    pages, chat = page_cache.stats(), response_cache.stats()
+    counters = {
+        "mindscope_cache_requests_total": ("Cache lookups by cache and outcome.", {
+            (("cache", "pages"), ("outcome", "hit")): pages["page_hits"],
+            (("cache", "pages"), ("outcome", "miss")): pages["page_misses"],
+            (("cache", "conditional"), ("outcome", "not_modified")): pages["not_modified"],
+            (("cache", "conditional"), ("outcome", "modified")): pages["modified"],
+            (("cache", "chat_responses"), ("outcome", "hit")): chat["hits"],
+            (("cache", "chat_responses"), ("outcome", "miss")): chat["misses"],
+        }),
+    }
+    return HttpResponse(metrics.render_prometheus(counters), content_type="text/plain; version=0.0.4; charset=utf-8")
+
+
+# ---------------- Wellness tips (in-memory catalog, active language) ----------------
+def tips_view(request):
+    return render(request, "pages/tips.html", {"tips": catalog.tips()})
+
+
+def tips_api(request):
+    return JsonResponse({
+        "language": translation.get_language(),
+        "results": [{"id": tip.id, "title": tip.title, "content": tip.content} for tip in catalog.tips()],
+    })
 
 
+@cached_page
 def learn_more(request):
     return render(request, "pages/learn_more.html")
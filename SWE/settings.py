@@ -21,6 +21,17 @@ load_dotenv(BASE_DIR / ".env")
 # Store API key securely
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
 
+# Per-backend overrides for Mindscope/utils/inference_client.py, e.g.
+# {"hf_small": {"url": "http://127.0.0.1:8001/", "timeout": 2, "cooldown": 10}}
+INFERENCE_BACKENDS = {}
+
+# Shared local DialoGPT process (`manage.py run_local_ai_worker`); see
+# Mindscope/utils/local_worker.py for the remaining keys and defaults.
+LOCAL_AI_WORKER = {
+    "ENABLED": os.getenv("LOCAL_AI_WORKER_ENABLED", "") == "1",
+    "ADDRESS": ("127.0.0.1", 6011),
+}
+
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -52,6 +63,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    # first, so its totals include the rest of the stack; see PERFORMANCE_METRICS
+    'Mindscope.middleware.PerformanceMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -66,7 +79,8 @@ ROOT_URLCONF = 'SWE.urls'
 
 TEMPLATES = [
     {
-        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        # DjangoTemplates plus render timing for Mindscope.middleware.PerformanceMiddleware
+        'BACKEND': 'Mindscope.template_backends.TimedDjangoTemplates',
         'DIRS': [BASE_DIR / 'templates'],
         'APP_DIRS': True,
         'OPTIONS': {
@@ -81,15 +95,177 @@ TEMPLATES = [
 
 WSGI_APPLICATION = 'SWE.wsgi.application'
 
+# Serve with an ASGI server (e.g. `uvicorn SWE.asgi:application`) so chat/stream/
+# can stream replies without tying up a worker per request.
+ASGI_APPLICATION = 'SWE.asgi.application'
+
 
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
+#
+# MINDSCOPE_DB_PROFILE picks the profile:
+#   "sqlite" (default) - single-node installs. WAL lets readers run alongside the
+#       one writer, IMMEDIATE transactions take the write lock up front and
+#       busy_timeout makes writers queue instead of failing with "database is
+#       locked". SQLITE_WAL=0 restores the stock rollback-journal settings.
+#   "postgres" - production. POSTGRES_DB/USER/PASSWORD/HOST/PORT; connections
+#       persist for DB_CONN_MAX_AGE seconds, or POSTGRES_POOL=1 uses psycopg's
+#       pool instead (POSTGRES_POOL_MIN/MAX). POSTGRES_REPLICA_HOST adds a
+#       "replica" alias that Mindscope.routers sends dashboard/mood-tracker
+#       reads to (see DATABASE_REPLICA).
+
+DB_PROFILE = os.getenv("MINDSCOPE_DB_PROFILE", "sqlite")
+DB_CONN_MAX_AGE = int(os.getenv("DB_CONN_MAX_AGE", "60"))
+
+if DB_PROFILE == "postgres":
+    _primary = {
+        'ENGINE': 'django.db.backends.postgresql',
+        'NAME': os.getenv("POSTGRES_DB", "mindscope"),
+        'USER': os.getenv("POSTGRES_USER", "mindscope"),
+        'PASSWORD': os.getenv("POSTGRES_PASSWORD", ""),
+        'HOST': os.getenv("POSTGRES_HOST", "localhost"),
+        'PORT': os.getenv("POSTGRES_PORT", "5432"),
+        'CONN_MAX_AGE': DB_CONN_MAX_AGE,
+        'CONN_HEALTH_CHECKS': True,
+        'OPTIONS': {},
+    }
+    if os.getenv("POSTGRES_POOL", "") == "1":
+        # psycopg 3 pool; Django requires CONN_MAX_AGE = 0 alongside it
+        _primary['CONN_MAX_AGE'] = 0
+        _primary['OPTIONS']['pool'] = {
+            "min_size": int(os.getenv("POSTGRES_POOL_MIN", "2")),
+            "max_size": int(os.getenv("POSTGRES_POOL_MAX", "10")),
+        }
+    DATABASES = {'default': _primary}
+    if os.getenv("POSTGRES_REPLICA_HOST"):
+        DATABASES['replica'] = {
+            **_primary,
+            'HOST': os.getenv("POSTGRES_REPLICA_HOST"),
+            'PORT': os.getenv("POSTGRES_REPLICA_PORT", _primary['PORT']),
+            'TEST': {'MIRROR': 'default'},
+        }
+else:
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': os.getenv("SQLITE_PATH", BASE_DIR / 'db.sqlite3'),
+            'CONN_MAX_AGE': DB_CONN_MAX_AGE,
+        }
+    }
+    if os.getenv("SQLITE_WAL", "1") == "1":
+        DATABASES['default']['OPTIONS'] = {
+            'timeout': 20,  # busy timeout in seconds
+            'transaction_mode': 'IMMEDIATE',
+            'init_command': (
+                "PRAGMA journal_mode=WAL;"
+                "PRAGMA synchronous=NORMAL;"
+                "PRAGMA cache_size=-20000;"
+                "PRAGMA temp_store=MEMORY"
+            ),
+        }
+
+DATABASE_ROUTERS = ['Mindscope.routers.ReplicaRouter']
+
+# Reads routed to the replica alias (when configured) for views decorated with
+# Mindscope.routers.replica_reads; a session that just wrote stays on the
+# primary for PIN_SECONDS so it reads its own writes.
+DATABASE_REPLICA = {
+    "ALIAS": "replica",
+    "PIN_SECONDS": 5,
+}
+
+
+# Caches
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+#
+# "chat_responses" holds generated chatbot replies (see utils/response_cache.py).
+# LocMemCache evicts least-recently-used entries past MAX_ENTRIES; in production
+# point it at a shared FileBasedCache/DatabaseCache so all workers reuse replies.
 
-DATABASES = {
+CACHES = {
     'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'chat_responses': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'mindscope-chat-responses',
+        'TIMEOUT': 60 * 60 * 6,
+        'OPTIONS': {'MAX_ENTRIES': 2000},
+    },
+}
+
+CHAT_RESPONSE_CACHE_ALIAS = 'chat_responses'
+
+# "shared" holds state every web process and chat worker must agree on (prompt
+# history, crisis flags, mood analytics, the response catalog version), so it
+# is never per-process: a table in the main database (created by migrate), or
+# Redis when CACHE_REDIS_URL is set.
+if os.getenv("CACHE_REDIS_URL"):
+    CACHES['shared'] = {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': os.getenv("CACHE_REDIS_URL"),
+    }
+else:
+    CACHES['shared'] = {
+        'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
+        'LOCATION': 'mindscope_shared_cache',
+        'OPTIONS': {'MAX_ENTRIES': 50000},
     }
+
+SHARED_CACHE_ALIAS = 'shared'
+
+# Rendered static pages and 304 bookkeeping; see Mindscope/utils/page_cache.py.
+# Bump VERSION when a deploy changes templates.
+PAGE_CACHE = {
+    "TIMEOUT": 60 * 10,
+    "VERSION": 1,
+}
+
+
+# Chat prompt budget; see Mindscope/utils/conversation.py for all keys.
+# TOKENIZER (e.g. "microsoft/DialoGPT-large") counts tokens exactly; it is
+# downloaded and loaded at server/worker start-up, not on the first request.
+CHAT_CONTEXT = {
+    "TOKENIZER": os.getenv("CHAT_TOKENIZER") or None,
+    "TOKEN_BUDGET": 600,
+    "MAX_TURN_TOKENS": 200,
+}
+
+
+# Chats older than HOT_DAYS are packed into ChatArchiveSegment rows by
+# `manage.py archive_chat_history`; see Mindscope/utils/retention.py.
+CHAT_RETENTION = {
+    "HOT_DAYS": 90,
+    "SEGMENT_SIZE": 500,
+}
+
+
+# CHAT_QUEUE_ENABLED=1 moves chat reply generation out of the request into a
+# DB-backed queue served by `manage.py run_chat_workers`, which must then run
+# alongside the web server (see README.md and Mindscope/utils/chat_queue.py).
+# Off by default: replies are generated inline in the request.
+CHAT_QUEUE = {
+    "ENABLED": os.getenv("CHAT_QUEUE_ENABLED", "") == "1",
+    "WORKERS": 4,
+    "MAX_ATTEMPTS": 3,
+}
+
+
+# Crisis pre-classifier (Mindscope/utils/crisis.py): flagged chat messages get
+# the crisis-resource reply at once, and that user's next messages jump the
+# chat queue for WINDOW seconds.
+CRISIS_DETECTION = {
+    "ENABLED": True,
+    "WINDOW": 60 * 60,
+}
+
+
+# Request timing (Mindscope/middleware.py): Server-Timing headers on every
+# response and Prometheus histograms at /metrics/. Scrapers authenticate with
+# "Authorization: Bearer $METRICS_TOKEN"; without a token only staff can read it.
+PERFORMANCE_METRICS = {
+    "SERVER_TIMING": True,
+    "TOKEN": os.getenv("METRICS_TOKEN"),
 }
 
 
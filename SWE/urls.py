@@ -28,11 +28,27 @@ urlpatterns = [
     path("logout/", views.logout_view, name="logout"),
     path("dashboard/", views.dashboard, name="dashboard"),
     path("screening-tests/", views.screening_tests, name="screening_tests"),
-    path("screening/phq9/", views.phq9_view, name="phq9"),
-    path("screening/gad7/", views.gad7_view, name="gad7"),
-    path("screening/pss10/", views.pss10_view, name="pss10"),
+    path("screening/phq9/", views.screening_view, {"code": "PHQ9"}, name="phq9"),
+    path("screening/gad7/", views.screening_view, {"code": "GAD7"}, name="gad7"),
+    path("screening/pss10/", views.screening_view, {"code": "PSS10"}, name="pss10"),
+    path("screening/<str:code>/", views.screening_view, name="screening"),
+    path("api/screenings/import/", views.screening_import_api, name="screening_import_api"),
     path("mood-tracker/", views.mood_tracker, name="mood_tracker"),
+    path("api/mood-history/", views.mood_history_api, name="mood_history_api"),
+    path("api/mood-analytics/", views.mood_analytics_api, name="mood_analytics_api"),
     path("chat/", views.chat_view, name="chat"),
+    path("chat/stream/", views.chat_stream_view, name="chat_stream"),
+    path("api/chat/<int:pk>/status/", views.chat_status_api, name="chat_status_api"),
+    path("export/", views.export_data, name="export_data"),
+    path("api/moods/", views.mood_list_api, name="mood_list_api"),
+    path("api/screenings/", views.screening_list_api, name="screening_list_api"),
+    path("api/chats/", views.chat_history_api, name="chat_history_api"),
+    path("search/", views.search_view, name="search"),
+    path("api/search/", views.search_api, name="search_api"),
+    path("api/cache-stats/", views.cache_stats_api, name="cache_stats_api"),
+    path("metrics/", views.metrics_view, name="metrics"),
+    path("tips/", views.tips_view, name="tips"),
+    path("api/tips/", views.tips_api, name="tips_api"),
     path("learn-more/", views.learn_more, name="learn_more"),
 ]
 
@@ -14,3 +14,15 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'SWE.settings')
 
 application = get_wsgi_application()
+
+# load the localized response/tip catalog and the tokenizer (if configured)
+# before the first request needs them
+from django.db import connections  # noqa: E402
+
+from Mindscope.utils import catalog, conversation  # noqa: E402
+
+catalog.preload()
+conversation.preload()
+# the preload ran outside any request: don't keep its connection (a pre-forking
+# server would share it between workers)
+connections.close_all()